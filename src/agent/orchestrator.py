@@ -9,18 +9,28 @@ This is the heart of the agentic system, implementing the observe-think-act loop
 """
 
 import asyncio
+import time
+import uuid
+from collections import deque
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any
 
 from src.agent.planner import ResearchPlanner, ActionType, AgentAction, generate_initial_queries
-from src.agent.prompts import SYSTEM_PROMPT, SYNTHESIS_PROMPT
-from src.memory.session import SessionMemory
+from src.agent.prompts import (
+    DUPLICATE_QUERY_SYSTEM,
+    SYSTEM_PROMPT,
+    SYNTHESIS_PROMPT,
+    render_duplicate_query_prompt,
+)
+from src.memory.semantic_cache import SemanticCache
+from src.memory.kv_cache import KeyValueCache
+from src.memory.session import SessionMemory, canonicalize_url
 from src.memory.vector_store import VectorStore
 from src.synthesis.citations import CitationManager, Citation
 from src.synthesis.report import ReportGenerator, Report
 from src.tools.search import WebSearchTool
-from src.tools.fetch import ContentFetchTool
+from src.tools.fetch import ContentFetchTool, create_http_client
 from src.tools.analyze import DocumentAnalyzer
 from src.utils.config import Settings
 from src.utils.logging import get_logger
@@ -30,17 +40,105 @@ from src.utils.quality import validate_research_quality
 
 logger = get_logger(__name__)
 
+# Common words ignored when matching facts to follow-up questions
+_STOPWORDS = frozenset({
+    "the", "a", "an", "is", "are", "was", "were", "what", "how", "why", "when", "where"
+})
 
-@dataclass
+
+def _tokenize(text: str) -> frozenset[str]:
+    """Lowercase word set of a text, minus stopwords."""
+    return frozenset(text.lower().split()) - _STOPWORDS
+
+
+def _bloom64(tokens: frozenset[str]) -> int:
+    """64-bit bloom signature of a token set (one bit per token)."""
+    bloom = 0
+    for token in tokens:
+        bloom |= 1 << (hash(token) & 63)
+    return bloom
+
+
+# Fetched documents waiting for analysis; once full, fetches wait for an
+# analyze worker, so bodies of up to MAX_CONTENT_SIZE don't pile up
+_MAX_QUEUED_DOCUMENTS = 16
+
+# Embedding similarity above which a query is treated as an earlier
+# search, and below which it is treated as new; in between, the LLM decides
+_DUPLICATE_QUERY_SIMILARITY = 0.92
+_DISTINCT_QUERY_SIMILARITY = 0.75
+
+
+@dataclass(slots=True)
 class ResearchState:
-    """Current state of the research session."""
+    """Current state of the research session.
+    
+    The ordered lists are mirrored by sets so membership checks stay O(1)
+    as the session grows; use the helper methods to keep them in sync.
+    URL sets (including fetches_in_flight) hold canonicalized URLs.
+    """
     question: str
     searches_performed: list[str] = field(default_factory=list)
     urls_fetched: list[str] = field(default_factory=list)
     pending_urls: list[str] = field(default_factory=list)  # URLs to fetch
+    fetches_in_flight: set[str] = field(default_factory=set)  # URLs being fetched
     facts_extracted: list[dict[str, Any]] = field(default_factory=list)
+    fact_tokens: list[frozenset[str]] = field(default_factory=list)  # Parallel to facts_extracted
+    fact_blooms: list[int] = field(default_factory=list)  # Bloom signatures of fact_tokens
+    recent_fact_lines: deque[str] = field(default_factory=lambda: deque(maxlen=10))  # For summaries
     iteration: int = 0
-    started_at: datetime = field(default_factory=datetime.now)
+    started_at_monotonic: float = field(default_factory=time.monotonic)
+    searches_performed_lower: set[str] = field(default_factory=set)
+    urls_fetched_set: set[str] = field(default_factory=set)
+    pending_urls_set: set[str] = field(default_factory=set)
+    
+    @property
+    def elapsed_seconds(self) -> float:
+        """Seconds since the research session started."""
+        return time.monotonic() - self.started_at_monotonic
+    
+    @property
+    def started_at(self) -> datetime:
+        """Wall-clock start time, derived for display and logging."""
+        return datetime.now() - timedelta(seconds=self.elapsed_seconds)
+    
+    def has_searched(self, query: str) -> bool:
+        """Check if a query was already searched (case-insensitive)."""
+        return query.lower() in self.searches_performed_lower
+    
+    def add_search(self, query: str) -> None:
+        """Record a performed search."""
+        self.searches_performed.append(query)
+        self.searches_performed_lower.add(query.lower())
+    
+    def is_known_url(self, url: str) -> bool:
+        """Check if a URL (or an equivalent spelling) is fetched, being fetched, or queued."""
+        key = canonicalize_url(url)
+        return (
+            key in self.urls_fetched_set
+            or key in self.pending_urls_set
+            or key in self.fetches_in_flight
+        )
+    
+    def add_pending_url(self, url: str) -> None:
+        """Queue a URL for fetching."""
+        self.pending_urls.append(url)
+        self.pending_urls_set.add(canonicalize_url(url))
+    
+    def remove_pending_url(self, url: str) -> None:
+        """Remove a URL (or an equivalent spelling) from the fetch queue if present."""
+        key = canonicalize_url(url)
+        if key in self.pending_urls_set:
+            self.pending_urls_set.discard(key)
+            for i, pending in enumerate(self.pending_urls):
+                if canonicalize_url(pending) == key:
+                    del self.pending_urls[i]
+                    break
+    
+    def add_fetched_url(self, url: str) -> None:
+        """Record a successfully fetched URL."""
+        self.urls_fetched.append(url)
+        self.urls_fetched_set.add(canonicalize_url(url))
 
 
 class ResearchOrchestrator:
@@ -57,26 +155,80 @@ class ResearchOrchestrator:
     def __init__(self, settings: Settings):
         self.settings = settings
         self.llm = get_llm_client(settings)
-        self.cost_tracker = CostTracker()
-        
-        # Initialize tools
-        self.search_tool = WebSearchTool(settings)
-        self.fetch_tool = ContentFetchTool()
-        self.analyzer = DocumentAnalyzer(self.llm)
-        
+        self.cost_tracker = CostTracker(max_cost=settings.max_cost_per_request)
+        
+        # Initialize tools (fetches share one pooled HTTP client)
+        self.http_client = create_http_client()
+        self.search_tool = WebSearchTool(settings, cost_tracker=self.cost_tracker)
+        self.fetch_tool = ContentFetchTool(
+            client=self.http_client,
+            cache=KeyValueCache(
+                name="page_cache",
+                persist_directory=settings.cache_directory or None
+            ),
+            cache_ttl=settings.fetch_cache_ttl
+        )
+        self.analyzer = DocumentAnalyzer(
+            self.llm,
+            max_concurrency=settings.extraction_concurrency,
+            cache=KeyValueCache(
+                name="extraction_cache",
+                persist_directory=settings.cache_directory or None
+            ),
+            cost_tracker=self.cost_tracker,
+            provider=settings.llm_provider,
+            model=settings.llm_model,
+            max_chunks=settings.max_analyze_chunks
+        )
+
+        # Bound concurrent searches/fetches to respect rate limits
+        self._search_semaphore = asyncio.Semaphore(settings.search_concurrency)
+        self._fetch_semaphore = asyncio.Semaphore(settings.fetch_concurrency)
+
+        # Fetched content is handed to analyze workers so LLM analysis
+        # overlaps with further network fetches
+        self._analyze_queue: asyncio.Queue | None = None
+        self._analyze_workers: list[asyncio.Task] = []
+        
+        # Fetches started speculatively while the planner is deciding
+        self._speculative_fetches: set[asyncio.Task] = set()
+        
+        # Duplicate-query checks waiting to be batched, and the tasks
+        # answering them
+        self._paraphrase_checks: list[tuple[str, asyncio.Future]] = []
+        self._background_tasks: set[asyncio.Task] = set()
+
         # Initialize memory systems
-        self.session_memory = SessionMemory()
+        # In-memory Chroma collections are shared process-wide, so each
+        # orchestrator indexes its queries in a collection of its own
+        self.session_memory = SessionMemory(
+            query_index=SemanticCache(collection_name=f"session_queries_{uuid.uuid4().hex}")
+        )
         self.vector_store = VectorStore()
+        # Fetched documents waiting to be embedded in one batch
+        self._pending_documents: list[tuple[str, dict[str, Any]]] = []
         
         # Initialize synthesis components
         self.citation_manager = CitationManager()
         self.report_generator = ReportGenerator(self.llm)
         
-        # Planner
-        self.planner = ResearchPlanner(self.llm)
+        # Planner, with caches for its LLM calls (exact for plan decisions,
+        # semantic for initial query generation)
+        self.plan_cache = KeyValueCache(name="planner_cache")
+        self.query_cache = SemanticCache(
+            collection_name="query_cache",
+            similarity_threshold=0.95,
+            persist_directory=settings.cache_directory or None
+        )
+        self.planner = ResearchPlanner(self.llm, cache=self.plan_cache)
         
-        # State
+        # State, and the planner context kept in sync with it
         self.state: ResearchState | None = None
+        self._context: dict[str, Any] = {}
+        
+        # Follow-up corpus block, keyed on the fact and source counts
+        self._corpus = ""
+        self._corpus_key: tuple[int, int] | None = None
     
     async def research(self, question: str) -> Report:
         """
@@ -92,38 +244,71 @@ class ResearchOrchestrator:
         
         # Initialize state
         self.state = ResearchState(question=question)
+        self._context = self._new_context()
+        self._corpus_key = None
         self.session_memory.start_session(question)
         
-        # Phase 1: Initial multi-query search
-        await self._initial_search_phase(question)
-        
-        # Phase 2: Fetch and analyze top results
-        await self._fetch_phase()
-        
-        # Phase 3: Iterative refinement
-        while self.state.iteration < self.settings.max_iterations:
-            self.state.iteration += 1
-            logger.info(f"Iteration {self.state.iteration}/{self.settings.max_iterations}")
-            
-            # Check cost limits
-            if self.cost_tracker.total_cost >= self.settings.max_cost_per_request:
-                logger.warning("Cost limit reached, stopping research")
-                break
-            
-            # OBSERVE: Gather current context
-            context = self._build_context()
-            
-            # THINK: Plan next action
-            action = await self.planner.plan_next_action(context)
-            logger.info(f"Planned action: {action.type.value} - {action.reasoning}")
-            
-            # Check if complete
-            if action.type == ActionType.COMPLETE:
-                logger.info("Research complete signal received")
-                break
-            
-            # ACT: Execute the action
-            await self._execute_action(action)
+        self._start_analyze_workers()
+        try:
+            # Phase 1: Initial multi-query search
+            await self._initial_search_phase(question)
+
+            # Phase 2: Fetch and analyze top results
+            await self._fetch_phase()
+            self._flush_documents()
+
+            # Phase 3: Iterative refinement
+            while self.state.iteration < self.settings.max_iterations:
+                self.state.iteration += 1
+                logger.info(f"Iteration {self.state.iteration}/{self.settings.max_iterations}")
+                
+                # Embed documents fetched during the previous iteration
+                self._flush_documents()
+                
+                # Check cost limits
+                if self.cost_tracker.total_cost >= self.settings.max_cost_per_request:
+                    logger.warning("Cost limit reached, stopping research")
+                    break
+                
+                # OBSERVE: Gather current context
+                context = self._build_context()
+                
+                # Speculatively fetch the top pending URL while planning,
+                # since the planner usually picks it next
+                spec_url, spec_task = self._start_speculative_fetch()
+                
+                # THINK: Plan next action(s)
+                actions = await self.planner.plan_next_actions(context)
+                for action in actions:
+                    logger.info(f"Planned action: {action.type.value} - {action.reasoning}")
+                
+                # Check if complete
+                if actions[0].type == ActionType.COMPLETE:
+                    logger.info("Research complete signal received")
+                    break
+                
+                # ACT: Execute independent actions concurrently (reusing the
+                # speculative fetch if one matches); the search and fetch
+                # semaphores bound load on the providers
+                await asyncio.gather(*(
+                    spec_task
+                    if (
+                        spec_task is not None
+                        and action.type == ActionType.FETCH
+                        and action.parameters.get("url") == spec_url
+                    )
+                    else self._execute_action(action)
+                    for action in self._unique_actions(actions)
+                ), return_exceptions=True)
+
+            # Wait for speculative fetches and queued analysis before synthesizing
+            await asyncio.gather(*self._speculative_fetches, return_exceptions=True)
+            await self._analyze_queue.join()
+        finally:
+            for task in self._speculative_fetches:
+                task.cancel()
+            await self._stop_analyze_workers()
+            self._flush_documents()
         
         # Synthesize report
         report = await self._synthesize_report()
@@ -140,7 +325,7 @@ class ResearchOrchestrator:
         report.quality_score = quality_report.overall_score
         report.quality_level = quality_report.overall_level.value
         
-        logger.info(f"Research complete. Sources: {len(report.citations)}, Quality: {quality_report.overall_level.value}, Cost: ${report.total_cost:.4f}")
+        logger.info(f"Research complete in {self.state.elapsed_seconds:.1f}s. Sources: {len(report.citations)}, Quality: {quality_report.overall_level.value}, Cost: ${report.total_cost:.4f}")
         
         return report
     
@@ -149,14 +334,27 @@ class ResearchOrchestrator:
         logger.info("Phase 1: Initial search phase")
         
         # Generate diverse initial queries
-        queries = await generate_initial_queries(self.llm, question, count=3)
-        
-        # Execute searches
+        queries = await generate_initial_queries(
+            self.llm, question, count=3, cache=self.query_cache
+        )
+
+        # Drop case-insensitive duplicates so concurrent searches don't race
+        seen = set()
+        unique_queries = []
         for query in queries:
-            await self._execute_search({"query": query})
-            
-            # Small delay to be nice to APIs
-            await asyncio.sleep(0.5)
+            if query.lower() not in seen:
+                seen.add(query.lower())
+                unique_queries.append(query)
+
+        # Execute searches concurrently (bounded by the search semaphore)
+        results = await asyncio.gather(
+            *(self._execute_search({"query": query}) for query in unique_queries),
+            return_exceptions=True
+        )
+
+        for query, result in zip(unique_queries, results):
+            if isinstance(result, Exception):
+                logger.error(f"Initial search failed for '{query}': {result}")
     
     async def _fetch_phase(self) -> None:
         """Fetch content from top-ranked URLs."""
@@ -164,11 +362,18 @@ class ResearchOrchestrator:
         
         # Get top URLs to fetch (limit to avoid too many requests)
         urls_to_fetch = self.state.pending_urls[:5]
-        
-        for url in urls_to_fetch:
-            await self._execute_fetch({"url": url})
-            await asyncio.sleep(0.3)
-    
+
+        # Fetch concurrently (bounded by the fetch semaphore); each URL still
+        # runs its own fetch -> analyze chain in order
+        results = await asyncio.gather(
+            *(self._execute_fetch({"url": url}) for url in urls_to_fetch),
+            return_exceptions=True
+        )
+
+        for url, result in zip(urls_to_fetch, results):
+            if isinstance(result, Exception):
+                logger.error(f"Fetch failed for {url}: {result}")
+
     async def follow_up(self, question: str) -> Report:
         """
         Handle a follow-up question in the same session.
@@ -189,10 +394,11 @@ class ResearchOrchestrator:
         self.session_memory.add_follow_up(question)
         
         # Search for relevant existing content
-        relevant_content = self.vector_store.search(question, top_k=5)
+        self._flush_documents()
+        relevant_content = await self.vector_store.asearch(question, top_k=5)
         
         # Determine if new searches needed
-        context = self._build_context()
+        context = dict(self._build_context())
         context["follow_up"] = question
         context["relevant_existing"] = relevant_content
         
@@ -204,32 +410,61 @@ class ResearchOrchestrator:
         # Generate focused response
         return await self._synthesize_follow_up_response(question)
     
-    def _build_context(self) -> dict[str, Any]:
-        """Build the current context for the planner."""
+    async def aclose(self) -> None:
+        """Release network resources held by the orchestrator."""
+        await self.fetch_tool.close()
+        await self.http_client.aclose()
+        await self.llm.aclose()
+        # Drop this orchestrator's query collection
+        self.session_memory.query_index.clear()
+    
+    def _new_context(self) -> dict[str, Any]:
+        """Create the planner context for a fresh research state."""
         return {
             "original_question": self.state.question,
+            # Lists are shared with the state, so they never need rebuilding
             "searches_performed": self.state.searches_performed,
             "urls_fetched": self.state.urls_fetched,
             "pending_urls": self.state.pending_urls,
-            "facts_count": len(self.state.facts_extracted),
+            "facts_count": 0,
             "facts_summary": self._summarize_facts(),
             "iteration": self.state.iteration,
             "max_iterations": self.settings.max_iterations,
             "sources_count": len(self.citation_manager.citations),
         }
     
+    def _build_context(self) -> dict[str, Any]:
+        """
+        Return the current context for the planner.
+        
+        Fact fields are updated incrementally as facts arrive; only the
+        cheap counters are refreshed here.
+        """
+        self._context["iteration"] = self.state.iteration
+        self._context["sources_count"] = len(self.citation_manager.citations)
+        return self._context
+    
     def _summarize_facts(self) -> str:
         """Create a summary of extracted facts for context."""
-        if not self.state.facts_extracted:
+        if not self.state.recent_fact_lines:
             return "No facts extracted yet."
         
-        # Group by topic/theme - show diverse sample
-        summary_parts = []
-        for fact in self.state.facts_extracted[-10:]:  # Last 10 facts
-            content = fact.get('content', '')[:150]
-            summary_parts.append(f"- {content}...")
-        
-        return "\n".join(summary_parts)
+        # Last 10 facts, pre-formatted as they were extracted
+        return "\n".join(self.state.recent_fact_lines)
+    
+    @staticmethod
+    def _unique_actions(actions: list[AgentAction]) -> list[AgentAction]:
+        """Drop completion signals and repeated actions from a planned turn."""
+        seen = set()
+        unique = []
+        for action in actions:
+            if action.type == ActionType.COMPLETE:
+                continue
+            key = (action.type, action.parameters.get("query"), action.parameters.get("url"))
+            if key not in seen:
+                seen.add(key)
+                unique.append(action)
+        return unique
     
     async def _execute_action(self, action: AgentAction) -> None:
         """Execute a planned action."""
@@ -248,20 +483,19 @@ class ResearchOrchestrator:
         """Execute a web search."""
         query = params.get("query", self.state.question)
         
-        # Skip if already searched
-        if query.lower() in [q.lower() for q in self.state.searches_performed]:
+        # Skip if already searched, or a paraphrase of an earlier search
+        if self.state.has_searched(query) or await self._is_paraphrased_search(query):
             logger.info(f"Skipping duplicate search: {query}")
             return
         
         logger.info(f"Searching: {query}")
         
-        # Track cost
-        self.cost_tracker.record_search_usage("tavily", 1)
-        
-        results = await self.search_tool.execute(query=query)
-        
+        # The search tool checks and records its own cost
+        async with self._search_semaphore:
+            results = await self.search_tool.execute(query=query)
+
         if results.success:
-            self.state.searches_performed.append(query)
+            self.state.add_search(query)
             self.session_memory.add_search(query, results.data)
             
             # Store search results and queue URLs for fetching
@@ -270,14 +504,79 @@ class ResearchOrchestrator:
                 title = result.get("title", "")
                 snippet = result.get("snippet", "")
                 
-                if url and url not in self.state.urls_fetched and url not in self.state.pending_urls:
-                    self.state.pending_urls.append(url)
+                if url and not self.state.is_known_url(url):
+                    self.state.add_pending_url(url)
                     self.citation_manager.add_potential_source(
                         url=url,
                         title=title,
                         snippet=snippet
                     )
     
+    async def _is_paraphrased_search(self, query: str) -> bool:
+        """
+        Check if a query means the same as an earlier search.
+        
+        Clearly similar or dissimilar queries are decided by embedding
+        similarity alone; only the gray zone between the two thresholds
+        is confirmed with the LLM.
+        """
+        match = self.session_memory.find_similar_search(query)
+        if match is None:
+            return False
+        
+        previous, similarity = match
+        if similarity >= _DUPLICATE_QUERY_SIMILARITY:
+            return True
+        if similarity < _DISTINCT_QUERY_SIMILARITY:
+            return False
+        
+        try:
+            answer = await self._confirm_paraphrase(
+                render_duplicate_query_prompt(previous=previous, query=query)
+            )
+            return answer.strip().lower().startswith("yes")
+        except Exception as e:
+            logger.warning(f"Duplicate query check failed: {e}")
+            return False
+    
+    def _confirm_paraphrase(self, prompt: str) -> asyncio.Future:
+        """
+        Queue a duplicate-query check for the LLM.
+        
+        Searches planned together reach their checks in the same pass of
+        the event loop; the checks queued in one pass are sent as a single
+        generate_many() request.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._paraphrase_checks:
+            loop.call_soon(self._flush_paraphrase_checks)
+        self._paraphrase_checks.append((prompt, future))
+        return future
+    
+    def _flush_paraphrase_checks(self) -> None:
+        """Send the queued duplicate-query checks as one batch."""
+        checks, self._paraphrase_checks = self._paraphrase_checks, []
+        task = asyncio.create_task(self._run_paraphrase_checks(checks))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _run_paraphrase_checks(self, checks: list[tuple[str, asyncio.Future]]) -> None:
+        """Answer a batch of duplicate-query checks."""
+        try:
+            answers = await self.llm.generate_many(
+                DUPLICATE_QUERY_SYSTEM, [prompt for prompt, _ in checks]
+            )
+        except Exception as e:
+            for _, future in checks:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), answer in zip(checks, answers):
+            if not future.done():
+                future.set_result(answer)
+    
     async def _execute_fetch(self, params: dict[str, Any]) -> None:
         """Fetch and process webpage content."""
         url = params.get("url")
@@ -285,28 +584,30 @@ class ResearchOrchestrator:
         if not url:
             return
             
-        # Skip if already fetched
-        if url in self.state.urls_fetched:
+        # Skip if already fetched or currently being fetched
+        key = canonicalize_url(url)
+        if key in self.state.urls_fetched_set or key in self.state.fetches_in_flight:
             return
         
         # Remove from pending if present
-        if url in self.state.pending_urls:
-            self.state.pending_urls.remove(url)
+        self.state.remove_pending_url(url)
         
         logger.info(f"Fetching: {url}")
-        result = await self.fetch_tool.execute(url=url)
+        self.state.fetches_in_flight.add(key)
+        try:
+            async with self._fetch_semaphore:
+                result = await self.fetch_tool.execute(url=url)
+        finally:
+            self.state.fetches_in_flight.discard(key)
         
         if result.success:
-            self.state.urls_fetched.append(url)
+            self.state.add_fetched_url(url)
             content = result.data.get("content", "")
             title = result.data.get("title", "")
             
             if content:
-                # Store in vector database for semantic search
-                self.vector_store.add_document(
-                    content=content,
-                    metadata={"url": url, "title": title}
-                )
+                # Queue for batched storage in the vector database
+                self._pending_documents.append((content, {"url": url, "title": title}))
                 
                 # Update citation with full content
                 self.citation_manager.update_source_content(url, content)
@@ -315,7 +616,61 @@ class ResearchOrchestrator:
                 self.citation_manager.mark_used(url)
                 
                 # Extract facts from content
-                await self._execute_analyze({"content": content, "url": url})
+                item = {"content": content, "url": url}
+                if self._analyze_queue is not None:
+                    await self._analyze_queue.put(item)
+                else:
+                    await self._execute_analyze(item)
+    
+    def _start_speculative_fetch(self) -> tuple[str | None, asyncio.Task | None]:
+        """Start fetching the top pending URL in the background."""
+        if not self.state.pending_urls:
+            return None, None
+        
+        url = self.state.pending_urls[0]
+        task = asyncio.create_task(self._execute_action(
+            AgentAction(type=ActionType.FETCH, parameters={"url": url})
+        ))
+        self._speculative_fetches.add(task)
+        task.add_done_callback(self._speculative_fetches.discard)
+        return url, task
+    
+    def _flush_documents(self) -> None:
+        """Embed and store all queued documents in a single batch."""
+        if not self._pending_documents:
+            return
+        
+        contents = [content for content, _ in self._pending_documents]
+        metadatas = [metadata for _, metadata in self._pending_documents]
+        self._pending_documents = []
+        self.vector_store.add_documents(contents, metadatas)
+    
+    def _start_analyze_workers(self) -> None:
+        """Start background workers that consume the analyze queue."""
+        self._analyze_queue = asyncio.Queue(maxsize=_MAX_QUEUED_DOCUMENTS)
+        self._analyze_workers = [
+            asyncio.create_task(self._analyze_worker())
+            for _ in range(self.settings.analyze_concurrency)
+        ]
+    
+    async def _stop_analyze_workers(self) -> None:
+        """Cancel analyze workers and fall back to inline analysis."""
+        for worker in self._analyze_workers:
+            worker.cancel()
+        await asyncio.gather(*self._analyze_workers, return_exceptions=True)
+        self._analyze_workers = []
+        self._analyze_queue = None
+    
+    async def _analyze_worker(self) -> None:
+        """Consume fetched content from the queue and extract facts."""
+        while True:
+            item = await self._analyze_queue.get()
+            try:
+                await self._execute_analyze(item)
+            except Exception as e:
+                logger.error(f"Analysis failed for {item.get('url', '')}: {e}")
+            finally:
+                self._analyze_queue.task_done()
     
     async def _execute_analyze(self, params: dict[str, Any]) -> None:
         """Analyze document content to extract facts."""
@@ -335,8 +690,18 @@ class ResearchOrchestrator:
             facts = result.data.get("facts", [])
             for fact in facts:
                 fact["source_url"] = url
-                self.state.facts_extracted.append(fact)
-                self.session_memory.add_fact(fact)
+            
+            self.state.facts_extracted.extend(facts)
+            tokens = [_tokenize(f.get("content", "")) for f in facts]
+            self.state.fact_tokens.extend(tokens)
+            self.state.fact_blooms.extend(_bloom64(t) for t in tokens)
+            self.session_memory.add_facts(facts)
+            
+            self.state.recent_fact_lines.extend(
+                f"- {f.get('content', '')[:150]}..." for f in facts
+            )
+            self._context["facts_count"] = len(self.state.facts_extracted)
+            self._context["facts_summary"] = self._summarize_facts()
             
             logger.info(f"Extracted {len(facts)} facts from {url[:30]}...")
     
@@ -364,25 +729,39 @@ class ResearchOrchestrator:
         return report
     
     async def _synthesize_follow_up_response(self, question: str) -> Report:
-        """Generate a focused response to a follow-up question."""
-        # Get relevant facts for follow-up
-        relevant_facts = [
-            f for f in self.state.facts_extracted
-            if self._is_relevant(f, question)
+        """
+        Generate a focused response to a follow-up question.
+        
+        The session's facts and sources are sent as one corpus block that
+        is rebuilt only when new facts or sources arrive, so it stays a
+        stable, cacheable prompt prefix across follow-ups.
+        """
+        citations = self.citation_manager.get_used_citations()
+        corpus_key = (len(self.state.facts_extracted), len(citations))
+        if corpus_key != self._corpus_key:
+            self._corpus_key = corpus_key
+            self._corpus = self.report_generator.build_corpus(self.state.facts_extracted, citations)
+        
+        # Point out the facts relevant to the follow-up (question tokenized
+        # once). Facts whose bloom signature shares no bit with the question
+        # cannot overlap it, so only the rest need an exact set intersection.
+        question_tokens = _tokenize(question)
+        question_bloom = _bloom64(question_tokens)
+        relevant_numbers = [
+            number
+            for number, (tokens, bloom) in enumerate(
+                zip(self.state.fact_tokens, self.state.fact_blooms), 1
+            )
+            if bloom & question_bloom and self._is_relevant(tokens, question_tokens)
         ]
         
         return await self.report_generator.generate_follow_up(
             original_question=self.state.question,
             follow_up=question,
-            relevant_facts=relevant_facts
+            corpus=self._corpus,
+            relevant_fact_numbers=relevant_numbers
         )
     
-    def _is_relevant(self, fact: dict, question: str) -> bool:
+    def _is_relevant(self, fact_tokens: frozenset[str], question_tokens: frozenset[str]) -> bool:
         """Check if a fact is relevant to a question (simple heuristic)."""
-        question_words = set(question.lower().split())
-        fact_words = set(fact.get("content", "").lower().split())
-        # Remove common words
-        stopwords = {"the", "a", "an", "is", "are", "was", "were", "what", "how", "why", "when", "where"}
-        question_words -= stopwords
-        overlap = question_words & fact_words
-        return len(overlap) >= 2
+        return len(fact_tokens & question_tokens) >= 2
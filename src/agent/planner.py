@@ -6,16 +6,67 @@ next step: search for more information, fetch specific URLs, analyze content,
 or conclude that research is complete.
 """
 
+import hashlib
 import json
+import re
+from contextlib import aclosing
 from enum import Enum
 from dataclasses import dataclass, field
 from typing import Any
 
-from src.agent.prompts import PLANNER_PROMPT, QUERY_GENERATION_PROMPT
+from src.agent.prompts import (
+    PLANNER_STATE_HEADER,
+    PLANNER_SYSTEM,
+    QUERY_GENERATION_SYSTEM,
+    render_query_generation_prompt,
+)
 from src.utils.logging import get_logger
+from src.utils.serialization import json_dumpb, json_loads
 
 logger = get_logger(__name__)
 
+# Fallback detection of a completion decision in non-JSON responses
+_COMPLETE_RE = re.compile(r"\bcomplete\b", re.IGNORECASE)
+
+# Fields decoded from a partially streamed planning response
+_ACTION_RE = re.compile(r'"action"\s*:\s*"(\w+)"')
+_ACTIONS_RE = re.compile(r'"actions"\s*:')
+_PARAMETERS_RE = re.compile(r'"parameters"\s*:\s*(\{[^{}]*\})')
+_REASONING_RE = re.compile(r'"reasoning"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+def _decode_partial_plan(buffer: str) -> str | None:
+    """
+    Decode a planning decision from a partial JSON response.
+    
+    Returns a complete JSON response once the action (and, for anything
+    but "complete", its parameters) has been streamed, or None if more
+    output is needed. Multi-action responses are never cut short.
+    """
+    if _ACTIONS_RE.search(buffer):
+        return None
+    
+    action = _ACTION_RE.search(buffer)
+    if not action:
+        return None
+    
+    action_str = action.group(1).lower()
+    parameters = {}
+    if action_str != "complete":
+        match = _PARAMETERS_RE.search(buffer)
+        if not match:
+            return None
+        try:
+            parameters = json_loads(match.group(1))
+        except json.JSONDecodeError:
+            return None
+    
+    reasoning = _REASONING_RE.search(buffer)
+    return json_dumpb({
+        "action": action_str,
+        "parameters": parameters,
+        "reasoning": json_loads(reasoning.group(1)) if reasoning else ""
+    }).decode("utf-8")
+
 
 class ActionType(Enum):
     """Types of actions the agent can take."""
@@ -25,7 +76,7 @@ class ActionType(Enum):
     COMPLETE = "complete"
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentAction:
     """Represents a planned action."""
     type: ActionType
@@ -38,11 +89,29 @@ class ResearchPlanner:
     Plans the next action for the research agent.
     
     The planner uses the LLM to analyze the current research context and
-    decide what action would be most valuable to take next.
+    decide what action would be most valuable to take next. An optional
+    key-value cache lets an identical planning state reuse an earlier
+    decision instead of calling the LLM again. The key is exact: states
+    from consecutive iterations differ only in a few counters and list
+    entries, so a similarity match would replay a stale decision.
     """
     
-    def __init__(self, llm):
+    def __init__(self, llm, cache=None):
         self.llm = llm
+        self.cache = cache
+        
+        # Prompt fragments reused across iterations
+        self._header_question: str | None = None
+        self._header = ""
+        self._last_searches: list | None = None
+        self._last_searches_len = 0
+        self._searches_block = ""
+        self._last_pending: tuple | None = None
+        self._pending_block = ""
+        
+        # Last stopping-condition decision
+        self._last_complete_key: tuple | None = None
+        self._last_complete_result = False
     
     async def plan_next_action(self, context: dict[str, Any]) -> AgentAction:
         """
@@ -63,107 +132,165 @@ class ResearchPlanner:
         Returns:
             AgentAction with type and parameters
         """
+        actions = await self.plan_next_actions(context)
+        return actions[0]
+    
+    async def plan_next_actions(self, context: dict[str, Any]) -> list[AgentAction]:
+        """
+        Determine the next actions based on current research state.
+        
+        The planner may return several independent searches or fetches
+        for one turn, which the caller can execute concurrently.
+        
+        Args:
+            context: Research state, as for plan_next_action
+        
+        Returns:
+            Non-empty list of AgentActions
+        """
         # Check stopping conditions first
         if self._should_complete(context):
-            return AgentAction(
+            return [AgentAction(
                 type=ActionType.COMPLETE,
                 reasoning="Sufficient sources and facts gathered"
-            )
+            )]
         
         # Check if we have pending URLs to fetch
         pending_urls = context.get("pending_urls", [])
         if pending_urls and len(context.get("urls_fetched", [])) < 5:
             # Prioritize fetching top URLs first
             url_to_fetch = pending_urls[0]
-            return AgentAction(
+            return [AgentAction(
                 type=ActionType.FETCH,
                 parameters={"url": url_to_fetch},
                 reasoning=f"Fetching high-relevance URL: {url_to_fetch}"
-            )
+            )]
         
         # Build the prompt
         prompt = self._build_planner_prompt(context)
         
         try:
-            # Call LLM for planning decision
-            response = await self.llm.generate(
-                system=PLANNER_PROMPT,
-                user=prompt,
-                response_format="json"
-            )
+            # Reuse a cached decision for exactly this state; the prompt
+            # renders every field the decision depends on
+            cache_key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+            cached = self.cache.get(cache_key) if self.cache else None
+            response = cached.decode("utf-8") if cached is not None else None
+            
+            if response is None:
+                # Call LLM for planning decision
+                response = await self._generate_plan(prompt)
+                self._cache_response(cache_key, response)
             
             # Parse the response
-            action = self._parse_planning_response(response, context)
-            return action
+            return self._parse_planning_actions(response, context)
             
         except Exception as e:
             logger.error(f"Planning failed: {e}")
             # Default to search if planning fails
-            return await self._generate_search_query(context)
+            return [await self._generate_search_query(context)]
+    
+    async def _generate_plan(self, prompt: str) -> str:
+        """
+        Get a planning response from the LLM.
+        
+        The response is streamed and generation is abandoned as soon as
+        the decision can be decoded, skipping the remaining tokens.
+        """
+        buffer = ""
+        stream = self.llm.stream(system=PLANNER_SYSTEM, user=prompt, response_format="json")
+        async with aclosing(stream) as chunks:
+            async for chunk in chunks:
+                buffer += chunk
+                decided = _decode_partial_plan(buffer)
+                if decided is not None:
+                    return decided
+        
+        return buffer
+    
+    def _cache_response(self, key: str, response: str) -> None:
+        """Store a planning response if it is valid JSON."""
+        if self.cache is None:
+            return
+        try:
+            json_loads(response)
+        except json.JSONDecodeError:
+            return
+        self.cache.set(key, response.encode("utf-8"))
     
     def _should_complete(self, context: dict[str, Any]) -> bool:
-        """Check if research should be completed."""
+        """
+        Check if research should be completed.
+        
+        The decision is memoized on the counters it depends on, which
+        often don't change between consecutive planner calls.
+        """
         facts_count = context.get("facts_count", 0)
         sources_count = context.get("sources_count", 0)
         urls_fetched = len(context.get("urls_fetched", []))
         iteration = context.get("iteration", 0)
         max_iterations = context.get("max_iterations", 10)
         
-        # Complete if we have enough sources and facts
-        if urls_fetched >= 5 and facts_count >= 10:
-            return True
-        
-        # Complete if we're near max iterations
-        if iteration >= max_iterations - 1:
-            return True
+        key = (facts_count, sources_count, urls_fetched, iteration, max_iterations)
+        if key == self._last_complete_key:
+            return self._last_complete_result
         
-        # Complete if we have good coverage
-        if sources_count >= 8 and facts_count >= 15:
-            return True
+        # Complete if we're near max iterations (cheapest check first)
+        result = (
+            iteration >= max_iterations - 1
+            # Complete if we have enough sources and facts
+            or (urls_fetched >= 5 and facts_count >= 10)
+            # Complete if we have good coverage
+            or (sources_count >= 8 and facts_count >= 15)
+        )
         
-        return False
+        self._last_complete_key = key
+        self._last_complete_result = result
+        return result
     
     def _build_planner_prompt(self, context: dict[str, Any]) -> str:
-        """Build the prompt for the planner."""
+        """
+        Build the prompt for the planner.
+        
+        The question header and the formatted search/pending lists are
+        cached between iterations and only re-rendered when they change.
+        """
+        question = context.get('original_question', 'Unknown')
+        if question != self._header_question:
+            self._header_question = question
+            self._header = PLANNER_STATE_HEADER.format(question=question)
+        
         searches = context.get('searches_performed', [])
-        pending = context.get('pending_urls', [])[:5]  # Show top 5
+        if searches is not self._last_searches or len(searches) != self._last_searches_len:
+            self._last_searches = searches
+            self._last_searches_len = len(searches)
+            self._searches_block = self._format_list(searches)
         
-        return f"""
-Current Research State:
-=======================
-Original Question: {context.get('original_question', 'Unknown')}
-
-Progress:
-- Iteration: {context.get('iteration', 0)} of {context.get('max_iterations', 10)}
+        pending = tuple(context.get('pending_urls', [])[:5])  # Show top 5
+        if pending != self._last_pending:
+            self._last_pending = pending
+            self._pending_block = self._format_list(pending)
+        
+        return "".join((
+            self._header,
+            f"""{context.get('iteration', 0)} of {context.get('max_iterations', 10)}
 - Searches performed: {len(searches)}
 - URLs fetched: {len(context.get('urls_fetched', []))}
 - Facts extracted: {context.get('facts_count', 0)}
 - Sources collected: {context.get('sources_count', 0)}
 
 Previous Searches:
-{self._format_list(searches)}
+{self._searches_block}
 
 Pending URLs to fetch:
-{self._format_list(pending)}
+{self._pending_block}
 
 Summary of Findings:
 {context.get('facts_summary', 'No facts yet.')}
 
 Follow-up Context (if any):
 {context.get('follow_up', 'None')}
-
-Based on this state, what should the agent do next?
-Respond with a JSON object containing:
-- action: one of "search", "fetch", "analyze", or "complete"
-- parameters: action-specific parameters (query for search, url for fetch)
-- reasoning: brief explanation of why this action was chosen
-
-Consider:
-1. Have we gathered enough diverse sources? (aim for 5-15)
-2. Are there gaps in our understanding?
-3. Have we explored multiple perspectives?
-4. Is more depth needed on any subtopic?
-"""
+""",
+        ))
     
     def _format_list(self, items: list) -> str:
         """Format a list for display in prompt."""
@@ -173,40 +300,55 @@ Consider:
     
     def _parse_planning_response(self, response: str, context: dict) -> AgentAction:
         """Parse the LLM response into an AgentAction."""
+        return self._parse_planning_actions(response, context)[0]
+    
+    def _parse_planning_actions(self, response: str, context: dict) -> list[AgentAction]:
+        """Parse the LLM response into one or more AgentActions."""
         try:
             # Try to parse as JSON
-            data = json.loads(response)
+            data = json_loads(response)
             
-            action_str = data.get("action", "search").lower()
-            parameters = data.get("parameters", {})
-            reasoning = data.get("reasoning", "")
+            # Several independent actions may be planned for one turn
+            items = data.get("actions")
+            if isinstance(items, list):
+                actions = [self._action_from_data(item) for item in items if isinstance(item, dict)]
+                if actions:
+                    return actions
             
-            # Map string to ActionType
-            action_map = {
-                "search": ActionType.SEARCH,
-                "fetch": ActionType.FETCH,
-                "analyze": ActionType.ANALYZE,
-                "complete": ActionType.COMPLETE,
-            }
-            
-            action_type = action_map.get(action_str, ActionType.SEARCH)
-            
-            return AgentAction(
-                type=action_type,
-                parameters=parameters,
-                reasoning=reasoning
-            )
+            return [self._action_from_data(data)]
             
         except json.JSONDecodeError:
             logger.warning(f"Failed to parse planning response: {response[:200]}")
             # Try to extract action from text
-            if "complete" in response.lower():
-                return AgentAction(type=ActionType.COMPLETE, reasoning="Parsed from text")
-            return AgentAction(
+            if _COMPLETE_RE.search(response):
+                return [AgentAction(type=ActionType.COMPLETE, reasoning="Parsed from text")]
+            return [AgentAction(
                 type=ActionType.SEARCH,
                 parameters={"query": context.get("original_question", "")},
                 reasoning="Failed to parse, defaulting to search"
-            )
+            )]
+    
+    def _action_from_data(self, data: dict[str, Any]) -> AgentAction:
+        """Build an AgentAction from a decoded JSON action."""
+        action_str = data.get("action", "search").lower()
+        parameters = data.get("parameters") or {}
+        reasoning = data.get("reasoning", "")
+        
+        # Map string to ActionType
+        action_map = {
+            "search": ActionType.SEARCH,
+            "fetch": ActionType.FETCH,
+            "analyze": ActionType.ANALYZE,
+            "complete": ActionType.COMPLETE,
+        }
+        
+        action_type = action_map.get(action_str, ActionType.SEARCH)
+        
+        return AgentAction(
+            type=action_type,
+            parameters=parameters,
+            reasoning=reasoning
+        )
     
     async def _generate_search_query(self, context: dict[str, Any]) -> AgentAction:
         """Generate a new search query based on current context."""
@@ -223,18 +365,18 @@ Consider:
         
         # Generate a new query using LLM
         try:
-            prompt = QUERY_GENERATION_PROMPT.format(
+            prompt = render_query_generation_prompt(
                 question=question,
                 previous_searches="\n".join(f"- {q}" for q in previous)
             )
             
             response = await self.llm.generate(
-                system="Generate search queries to explore this topic more deeply.",
+                system=QUERY_GENERATION_SYSTEM,
                 user=prompt,
                 response_format="json"
             )
             
-            data = json.loads(response)
+            data = json_loads(response)
             queries = data.get("queries", [])
             
             if queries:
@@ -265,7 +407,7 @@ Consider:
         )
 
 
-async def generate_initial_queries(llm, question: str, count: int = 3) -> list[str]:
+async def generate_initial_queries(llm, question: str, count: int = 3, cache=None) -> list[str]:
     """
     Generate multiple initial search queries for a research question.
     
@@ -273,6 +415,7 @@ async def generate_initial_queries(llm, question: str, count: int = 3) -> list[s
         llm: LLM client
         question: The research question
         count: Number of queries to generate
+        cache: Optional SemanticCache mapping questions to generated queries
         
     Returns:
         List of search queries
@@ -290,13 +433,22 @@ Create queries that:
 Respond with JSON:
 {{"queries": ["query1", "query2", "query3"]}}
 """
-        response = await llm.generate(
-            system="Generate search queries for comprehensive research.",
-            user=prompt,
-            response_format="json"
-        )
+        # Keyed on the question alone: the surrounding prompt text is
+        # identical for every question and would dominate the similarity
+        response = cache.lookup(question) if cache else None
+        
+        if response is None:
+            response = await llm.generate(
+                system="Generate search queries for comprehensive research.",
+                user=prompt,
+                response_format="json"
+            )
+            data = json_loads(response)
+            if cache and len(data.get("queries", [])) >= count:
+                cache.insert(question, response)
+        else:
+            data = json_loads(response)
         
-        data = json.loads(response)
         return data.get("queries", [question])[:count]
         
     except Exception:
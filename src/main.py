@@ -8,55 +8,98 @@ Usage:
 """
 
 import asyncio
-import json
+import re
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import typer
-from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
-from rich.table import Table
-from rich.markdown import Markdown
+from rich.console import Console, Group
+from rich.text import Text
 
-from src.agent.orchestrator import ResearchOrchestrator
+# Heavy modules (the orchestrator pulls in LLM SDKs, httpx and ChromaDB;
+# rich's Markdown/Table/Progress) are imported inside the commands that
+# use them, so "check" and "version" start quickly
 from src.utils.config import get_settings
 from src.utils.logging import setup_logging, get_logger
+from src.utils.serialization import json_dumpb
+
+if TYPE_CHECKING:
+    from src.agent.orchestrator import ResearchOrchestrator
+
+# libuv's event loop, when installed (not supported on Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 app = typer.Typer(help="Automated Research Assistant - AI-powered research agent")
 console = Console()
 logger = get_logger(__name__)
 
 
-def print_banner() -> None:
-    """Display the application banner."""
-    banner = """
+_BANNER = Text("""
 ╔═══════════════════════════════════════════════════════════╗
 ║           🔍 Automated Research Assistant 🔍              ║
 ║                                                           ║
 ║     Autonomous AI-powered market & competitor research    ║
 ╚═══════════════════════════════════════════════════════════╝
+    """, style="bold blue")
+
+_QUALITY_BADGES = {
+    "excellent": "🟢 Excellent",
+    "good": "🟢 Good", 
+    "acceptable": "🟡 Acceptable",
+    "needs_improvement": "🟠 Needs Improvement",
+    "poor": "🔴 Poor"
+}
+
+
+def run_async(coro):
+    """Run a coroutine to completion, on uvloop when it is available."""
+    if uvloop is not None:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
+
+def print_banner() -> None:
+    """Display the application banner."""
+    console.print(_BANNER)
+
+
+# Splits Markdown before each top-level "## " section heading
+_SECTION_RE = re.compile(r"(?m)^(?=## )")
+
+
+def render_markdown(content: str) -> Group:
+    """
+    Render Markdown one top-level section at a time.
+    
+    Parsing each "## " section separately keeps rich from building a
+    single token tree for the whole of a long report.
     """
-    console.print(banner, style="bold blue")
+    from rich.markdown import Markdown
+    
+    return Group(*(Markdown(section) for section in _SECTION_RE.split(content) if section.strip()))
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Shorten text to limit characters, marking the cut with an ellipsis."""
+    return text if len(text) <= limit else text[:limit] + "..."
 
 
 def display_quality_badge(quality_level: str, quality_score: float) -> str:
     """Generate a quality badge based on quality level."""
-    badges = {
-        "excellent": "🟢 Excellent",
-        "good": "🟢 Good", 
-        "acceptable": "🟡 Acceptable",
-        "needs_improvement": "🟠 Needs Improvement",
-        "poor": "🔴 Poor"
-    }
-    badge = badges.get(quality_level, "⚪ Unknown")
+    badge = _QUALITY_BADGES.get(quality_level, "⚪ Unknown")
     return f"{badge} ({quality_score:.0%})"
 
 
 def display_report(report, show_quality: bool = True) -> None:
     """Display the research report with formatting."""
+    from rich.panel import Panel
+    from rich.table import Table
+    
     console.print("\n")
     
     # Quality badge header
@@ -66,7 +109,7 @@ def display_report(report, show_quality: bool = True) -> None:
     
     # Main content
     console.print(Panel(
-        Markdown(report.content), 
+        render_markdown(report.content), 
         title="📋 Research Report", 
         border_style="green",
         padding=(1, 2)
@@ -80,12 +123,12 @@ def display_report(report, show_quality: bool = True) -> None:
         table.add_column("Title", width=40)
         table.add_column("URL", style="blue")
         
-        for citation in report.citations:
-            table.add_row(
-                str(citation.citation_number or "?"),
-                citation.title[:40] + "..." if len(citation.title) > 40 else citation.title,
-                citation.url[:50] + "..." if len(citation.url) > 50 else citation.url
-            )
+        rows = [
+            (str(c.citation_number or "?"), _truncate(c.title, 40), _truncate(c.url, 50))
+            for c in report.citations
+        ]
+        for row in rows:
+            table.add_row(*row)
         
         console.print(table)
     
@@ -99,8 +142,13 @@ def display_report(report, show_quality: bool = True) -> None:
     console.print(f"\n[dim]💰 Cost: ${report.total_cost:.4f}[/dim]")
 
 
-def save_report(report, filepath: str, format: str = "markdown") -> None:
-    """Save report to file."""
+async def save_report(report, filepath: str, format: str = "markdown") -> None:
+    """
+    Save report to file.
+    
+    The write runs in a worker thread so large reports don't stall the
+    event loop (e.g. during interactive follow-ups).
+    """
     path = Path(filepath)
     
     if format == "json":
@@ -115,12 +163,14 @@ def save_report(report, filepath: str, format: str = "markdown") -> None:
             "quality_score": report.quality_score,
             "quality_level": report.quality_level,
             "total_cost": report.total_cost,
-            "generated_at": datetime.now().isoformat()
+            "generated_at": datetime.now()
         }
-        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        payload = json_dumpb(data, indent=True)
     else:
         # Markdown format
-        path.write_text(report.to_markdown(), encoding="utf-8")
+        payload = report.to_markdown().encode("utf-8")
+    
+    await asyncio.to_thread(path.write_bytes, payload)
     
     console.print(f"\n[green]✅ Report saved to:[/green] {path.absolute()}")
 
@@ -132,6 +182,10 @@ async def run_research(
     output_format: str = "markdown"
 ) -> None:
     """Execute the research pipeline."""
+    from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn
+    
+    from src.agent.orchestrator import ResearchOrchestrator
+    
     settings = get_settings()
     
     # Validate configuration
@@ -149,46 +203,61 @@ async def run_research(
     # Initialize orchestrator
     orchestrator = ResearchOrchestrator(settings)
     
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(bar_width=20),
-        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-        console=console,
-    ) as progress:
-        task = progress.add_task("Initializing...", total=100)
-        
-        try:
-            progress.update(task, advance=10, description="🔍 Searching...")
-            
-            # Run research (the orchestrator has its own phases)
-            report = await orchestrator.research(question)
-            
-            progress.update(task, advance=90, description="✅ Complete!")
+    try:
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(bar_width=20),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            console=console,
+        ) as progress:
+            task = progress.add_task("Initializing...", total=100)
             
-        except Exception as e:
-            logger.exception("Research failed")
-            console.print(f"\n[bold red]❌ Error:[/bold red] {e}")
-            raise typer.Exit(code=1)
-    
-    # Display report
-    display_report(report)
-    
-    # Save if requested
-    if output_file:
-        save_report(report, output_file, output_format)
-    
-    # Interactive follow-up
-    if interactive:
-        await interactive_session(orchestrator)
+            try:
+                progress.update(task, advance=10, description="🔍 Searching...")
+                
+                # Run research (the orchestrator has its own phases)
+                report = await orchestrator.research(question)
+                
+                progress.update(task, advance=90, description="✅ Complete!")
+                
+            except Exception as e:
+                logger.exception("Research failed")
+                console.print(f"\n[bold red]❌ Error:[/bold red] {e}")
+                raise typer.Exit(code=1)
+        
+        # Display report
+        display_report(report)
+        
+        # Save if requested
+        if output_file:
+            await save_report(report, output_file, output_format)
+        
+        # Interactive follow-up
+        if interactive:
+            await interactive_session(orchestrator)
+    finally:
+        await orchestrator.aclose()
 
 
-async def interactive_session(orchestrator: ResearchOrchestrator) -> None:
+async def interactive_session(orchestrator: "ResearchOrchestrator") -> None:
     """Handle follow-up questions in interactive mode."""
+    from rich.panel import Panel
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    
     console.print("\n" + "─" * 50)
     console.print("[bold cyan]💬 Interactive Mode[/bold cyan]")
     console.print("Ask follow-up questions or type 'exit' to quit.\n")
     
+    # One progress display for the whole session, shown only while a
+    # follow-up runs so it doesn't redraw over the input prompt
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+        transient=True,
+    )
+    
     while True:
         try:
             question = console.input("[bold cyan]You:[/bold cyan] ")
@@ -200,17 +269,15 @@ async def interactive_session(orchestrator: ResearchOrchestrator) -> None:
             if not question.strip():
                 continue
             
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console,
-            ) as progress:
+            with progress:
                 task = progress.add_task("Processing...", total=None)
-                response = await orchestrator.follow_up(question)
-                progress.update(task, description="Done!")
+                try:
+                    response = await orchestrator.follow_up(question)
+                finally:
+                    progress.remove_task(task)
             
             console.print(Panel(
-                Markdown(response.content), 
+                render_markdown(response.content), 
                 title="🤖 Response",
                 border_style="blue"
             ))
@@ -252,7 +319,7 @@ def research_cmd(
     
     # Run async research
     try:
-        asyncio.run(run_research(question, interactive, output, format))
+        run_async(run_research(question, interactive, output, format))
     except KeyboardInterrupt:
         console.print("\n[yellow]⚠️ Research cancelled by user.[/yellow]")
         raise typer.Exit(code=130)
@@ -270,22 +337,22 @@ def version():
 def check_config():
     """Check configuration and API key status."""
     settings = get_settings()
-    
+        
     console.print("[bold]Configuration Check[/bold]\n")
-    
+        
     # Check LLM
     llm_key = settings.get_active_llm_key()
     if llm_key:
         console.print(f"✅ LLM Provider: {settings.llm_provider}")
     else:
         console.print(f"❌ LLM Provider: {settings.llm_provider} - [red]API key missing[/red]")
-    
+        
     # Check Search
     if settings.tavily_api_key:
         console.print("✅ Search: Tavily API configured")
     else:
         console.print("❌ Search: Tavily API - [red]API key missing[/red]")
-    
+        
     # Settings summary
     console.print(f"\n[dim]Max iterations: {settings.max_iterations}[/dim]")
     console.print(f"[dim]Max cost: ${settings.max_cost_per_request}[/dim]")
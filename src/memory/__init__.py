@@ -2,5 +2,7 @@
 
 from src.memory.session import SessionMemory
 from src.memory.vector_store import VectorStore, DocumentChunk
+from src.memory.semantic_cache import SemanticCache
+from src.memory.kv_cache import KeyValueCache
 
-__all__ = ["SessionMemory", "VectorStore", "DocumentChunk"]
+__all__ = ["SessionMemory", "VectorStore", "DocumentChunk", "SemanticCache", "KeyValueCache"]
@@ -0,0 +1,27 @@
+"""
+Embeddings
+
+Shared embedding model for the ChromaDB-backed stores.
+"""
+
+from functools import lru_cache
+from typing import Any
+
+
+@lru_cache
+def get_embedding_function() -> Any:
+    """
+    Get the process-wide embedding function.
+    
+    ChromaDB's DefaultEmbeddingFunction constructs a fresh ONNX MiniLM
+    model on every call. A single long-lived instance keeps the loaded
+    inference session and tokenizer, and one copy of the model serves
+    every store. It produces the same embeddings as the default, so
+    existing collections stay compatible.
+    """
+    try:
+        from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+    except ImportError:
+        raise ImportError("chromadb is required. Install with: pip install chromadb")
+    
+    return ONNXMiniLM_L6_V2()
@@ -0,0 +1,137 @@
+"""
+Key-Value Cache
+
+Exact-match cache for values that are looked up by a precise key (content
+hashes, URLs), kept apart from the embedding-backed SemanticCache.
+"""
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class KeyValueCache:
+    """
+    Exact-match byte cache with an in-memory LRU in front.
+    
+    With a persist_directory, entries are also written to a SQLite file
+    named after the cache and survive across sessions; without one the
+    cache lives in memory only. Nothing is embedded, so lookups and
+    inserts cost a dict access and at most one indexed SQLite query.
+    Methods are thread-safe, so large values can be read and written
+    from a worker thread.
+    """
+    
+    def __init__(
+        self,
+        name: str = "kv_cache",
+        max_memory_entries: int = 256,
+        persist_directory: str = None
+    ):
+        self.name = name
+        self.max_memory_entries = max_memory_entries
+        self.persist_directory = persist_directory
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self._db_failed = False
+    
+    def _get_db(self) -> sqlite3.Connection | None:
+        """Lazily open the SQLite file; None when not persisting."""
+        if self._db is None and self.persist_directory and not self._db_failed:
+            try:
+                path = Path(self.persist_directory)
+                path.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(path / f"{self.name}.sqlite3", check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Key-value cache {self.name} unavailable: {e}")
+                self._db_failed = True
+                self._db = None
+        return self._db
+    
+    def _remember(self, key: str, value: bytes) -> None:
+        """Insert into the in-memory LRU, evicting the oldest entry."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+    
+    def get(self, key: str) -> bytes | None:
+        """
+        Find the value stored for exactly this key.
+        
+        Args:
+            key: The cache key
+        
+        Returns:
+            The stored value, or None on a miss
+        """
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                return value
+            
+            db = self._get_db()
+            if db is None:
+                return None
+            try:
+                row = db.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Key-value cache lookup failed: {e}")
+                return None
+            if row is None:
+                return None
+            
+            value = bytes(row[0])
+            self._remember(key, value)
+            return value
+    
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Store a value, replacing any previous value for the key.
+        
+        Args:
+            key: The cache key
+            value: The value to store
+        """
+        with self._lock:
+            self._remember(key, value)
+            
+            db = self._get_db()
+            if db is None:
+                return
+            try:
+                db.execute("INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", (key, value))
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Key-value cache insert failed: {e}")
+    
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self._memory.clear()
+            db = self._get_db()
+            if db is None:
+                return
+            try:
+                db.execute("DELETE FROM cache")
+                db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to clear key-value cache: {e}")
+    
+    def close(self) -> None:
+        """Close the SQLite file, if one is open."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,234 @@
+"""
+Semantic Cache
+
+Caches LLM responses keyed by the meaning of their prompts, so that
+near-duplicate prompts can skip the LLM call entirely.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Any
+
+from src.memory.embeddings import get_embedding_function
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class SemanticCache:
+    """
+    Two-level cache for LLM responses.
+    
+    Lookups first check an in-memory LRU of exact prompts, then fall back
+    to a ChromaDB similarity search over previously seen prompts. A cached
+    response is returned when the closest prompt meets the similarity
+    threshold. With a persist_directory the cache survives across sessions.
+    """
+    
+    def __init__(
+        self,
+        collection_name: str = "semantic_cache",
+        similarity_threshold: float = 0.92,
+        max_exact_entries: int = 256,
+        persist_directory: str = None
+    ):
+        self.collection_name = collection_name
+        self.similarity_threshold = similarity_threshold
+        self.max_exact_entries = max_exact_entries
+        self.persist_directory = persist_directory
+        self._exact: OrderedDict[str, str] = OrderedDict()
+        # Recent key embeddings: a missed lookup is usually followed by an
+        # insert of the same key, which then needs no second model pass
+        self._embeddings: OrderedDict[str, Any] = OrderedDict()
+        self._embedding_function = None
+        self._client = None
+        self._collection = None
+        self.hits = 0
+        self.misses = 0
+    
+    def _get_collection(self):
+        """Lazy initialization of the ChromaDB collection."""
+        if self._collection is None:
+            try:
+                import chromadb
+                from chromadb.config import Settings
+                
+                settings_dict = {
+                    "anonymized_telemetry": False,
+                    "allow_reset": True
+                }
+                
+                if self.persist_directory:
+                    settings_dict["persist_directory"] = self.persist_directory
+                    settings_dict["is_persistent"] = True
+                
+                self._client = chromadb.Client(Settings(**settings_dict))
+                self._embedding_function = get_embedding_function()
+                # Embeddings are always passed explicitly, so the collection
+                # keeps ChromaDB's default embedding configuration
+                self._collection = self._client.get_or_create_collection(
+                    name=self.collection_name,
+                    metadata={"hnsw:space": "cosine"}
+                )
+            
+            except ImportError:
+                raise ImportError("chromadb is required. Install with: pip install chromadb")
+        
+        return self._collection
+    
+    @staticmethod
+    def _key_id(key: str) -> str:
+        """Stable ID for a cache key."""
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+    
+    def _embed(self, key: str) -> Any:
+        """Embed a key, reusing the embedding from a recent call."""
+        embedding = self._embeddings.get(key)
+        if embedding is not None:
+            self._embeddings.move_to_end(key)
+            return embedding
+        
+        embedding = self._embedding_function([key])[0]
+        self._embeddings[key] = embedding
+        if len(self._embeddings) > self.max_exact_entries:
+            self._embeddings.popitem(last=False)
+        return embedding
+    
+    def _remember_exact(self, key: str, value: str) -> None:
+        """Insert into the exact-match LRU, evicting the oldest entry."""
+        self._exact[key] = value
+        self._exact.move_to_end(key)
+        if len(self._exact) > self.max_exact_entries:
+            self._exact.popitem(last=False)
+    
+    def lookup(self, key: str) -> str | None:
+        """
+        Find a cached response for a prompt.
+        
+        Args:
+            key: The prompt (or other text) the response was generated from
+        
+        Returns:
+            The cached response, or None on a miss
+        """
+        if not key:
+            return None
+        
+        value = self.lookup_exact(key)
+        if value is None:
+            match = self.nearest(key)
+            if match is not None and match[1] >= self.similarity_threshold:
+                value, similarity = match
+                self._remember_exact(key, value)
+                logger.debug(f"Semantic cache hit (similarity {similarity:.3f})")
+        
+        if value is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return value
+    
+    def lookup_exact(self, key: str) -> str | None:
+        """
+        Find a response cached for exactly this key, without embedding it.
+        
+        Args:
+            key: The prompt (or other text) the response was generated from
+        
+        Returns:
+            The cached response, or None if this exact key isn't cached
+        """
+        if not key:
+            return None
+        
+        if key in self._exact:
+            self._exact.move_to_end(key)
+            return self._exact[key]
+        
+        try:
+            collection = self._get_collection()
+            if collection.count() == 0:
+                return None
+            
+            # Exact match from a previous session
+            stored = collection.get(ids=[self._key_id(key)], include=["metadatas"])
+            if stored.get("metadatas"):
+                value = stored["metadatas"][0].get("response", "")
+                self._remember_exact(key, value)
+                return value
+        
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+        
+        return None
+    
+    def nearest(self, key: str) -> tuple[str, float] | None:
+        """
+        Find the most similar cached entry, regardless of the threshold.
+        
+        Args:
+            key: The prompt (or other text) to compare against
+        
+        Returns:
+            Tuple of (cached response, cosine similarity), or None if the
+            cache is empty or unavailable
+        """
+        if not key:
+            return None
+        
+        try:
+            collection = self._get_collection()
+            if collection.count() == 0:
+                return None
+            
+            results = collection.query(
+                query_embeddings=[self._embed(key)],
+                n_results=1,
+                include=["metadatas", "distances"]
+            )
+            metadatas = results.get("metadatas", [[]])[0]
+            distances = results.get("distances", [[]])[0]
+            
+            if metadatas and distances:
+                return metadatas[0].get("response", ""), 1.0 - distances[0]
+        
+        except Exception as e:
+            logger.warning(f"Semantic cache query failed: {e}")
+        
+        return None
+    
+    def insert(self, key: str, value: str) -> None:
+        """
+        Store a response for a prompt.
+        
+        Args:
+            key: The prompt the response was generated from
+            value: The response to cache
+        """
+        if not key:
+            return
+        
+        self._remember_exact(key, value)
+        
+        try:
+            collection = self._get_collection()
+            collection.upsert(
+                documents=[key],
+                embeddings=[self._embed(key)],
+                metadatas=[{"response": value}],
+                ids=[self._key_id(key)]
+            )
+        except Exception as e:
+            logger.warning(f"Semantic cache insert failed: {e}")
+    
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        self._exact.clear()
+        self._embeddings.clear()
+        try:
+            if self._client:
+                self._client.delete_collection(self.collection_name)
+                self._collection = None
+        except Exception as e:
+            logger.error(f"Failed to clear semantic cache: {e}")
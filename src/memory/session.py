@@ -5,36 +5,122 @@ Maintains short-term memory for the current research session,
 tracking searches, fetched content, and extracted facts.
 """
 
+import time
+from collections.abc import Sequence
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
+from src.memory.semantic_cache import SemanticCache
 
-@dataclass
+
+# Query parameters that only track the referrer and never change the page
+_TRACKING_PARAMS = frozenset({"fbclid", "gclid", "msclkid"})
+
+# Monotonic and wall clock readings taken together, for converting record
+# timestamps to datetimes
+_MONOTONIC_EPOCH_NS = time.monotonic_ns()
+_WALL_EPOCH_NS = time.time_ns()
+
+
+def _monotonic_to_datetime(timestamp_ns: int) -> datetime:
+    """Convert a time.monotonic_ns() reading to local wall-clock time."""
+    return datetime.fromtimestamp((_WALL_EPOCH_NS + timestamp_ns - _MONOTONIC_EPOCH_NS) / 10**9)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so trivially different spellings compare equal.
+    
+    Lowercases the scheme and host, drops a leading "www.", the fragment,
+    any trailing slash on the path and tracking query parameters
+    (utm_*, fbclid, ...).
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/")
+    query = parts.query
+    if query:
+        query = urlencode([
+            (key, value)
+            for key, value in parse_qsl(query, keep_blank_values=True)
+            if not key.startswith("utm_") and key not in _TRACKING_PARAMS
+        ])
+    return urlunsplit((parts.scheme.lower(), host, path, query, ""))
+
+
+@dataclass(slots=True, frozen=True)
 class SearchRecord:
     """Record of a search operation."""
     query: str
     results: list[dict[str, Any]]
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp_ns: int = field(default_factory=time.monotonic_ns)
+    
+    @property
+    def timestamp(self) -> datetime:
+        """When the record was made, as wall-clock time."""
+        return _monotonic_to_datetime(self.timestamp_ns)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FetchRecord:
     """Record of a content fetch operation."""
     url: str
     title: str
     content_preview: str  # First 500 chars
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp_ns: int = field(default_factory=time.monotonic_ns)
+    
+    @property
+    def timestamp(self) -> datetime:
+        """When the record was made, as wall-clock time."""
+        return _monotonic_to_datetime(self.timestamp_ns)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FactRecord:
     """Record of an extracted fact."""
     content: str
     source_url: str
     fact_type: str
     confidence: str
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp_ns: int = field(default_factory=time.monotonic_ns)
+    
+    @property
+    def timestamp(self) -> datetime:
+        """When the record was made, as wall-clock time."""
+        return _monotonic_to_datetime(self.timestamp_ns)
+
+
+class FactView(Sequence[FactRecord]):
+    """
+    Read-only view of a session's facts, stored column-wise.
+    
+    Records are built only for the items accessed; len() and indexing
+    are O(1). Facts are written through SessionMemory.add_fact(s) only.
+    """
+    
+    __slots__ = ("_cols",)
+    
+    def __init__(self, cols: dict[str, list]):
+        self._cols = cols
+    
+    def __len__(self) -> int:
+        return len(self._cols["content"])
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        cols = self._cols
+        return FactRecord(
+            cols["content"][index],
+            cols["source_url"][index],
+            cols["fact_type"][index],
+            cols["confidence"][index],
+            cols["timestamp_ns"][index],
+        )
 
 
 class SessionMemory:
@@ -48,18 +134,26 @@ class SessionMemory:
     - Extracted facts
     
     This enables the agent to:
-    - Avoid duplicate searches
+    - Avoid duplicate searches, including paraphrased ones when a
+      query_index is provided
     - Track what sources have been visited
     - Maintain context for synthesis
     """
     
-    def __init__(self):
+    def __init__(self, query_index: SemanticCache | None = None):
         self.question: str = ""
         self.follow_ups: list[str] = []
         self.searches: list[SearchRecord] = []
         self.fetches: list[FetchRecord] = []
-        self.facts: list[FactRecord] = []
+        # Facts are stored column-wise, one list per FactRecord field
+        self._fact_cols: dict[str, list] = self._empty_fact_columns()
         self.started_at: datetime | None = None
+        self._start_ns = 0  # Monotonic clock reading at started_at
+        # Mirrors of searches/fetches for O(1) membership checks
+        self._query_set: set[str] = set()
+        self._url_set: set[str] = set()
+        # Embedding index of searched queries, for paraphrase detection
+        self.query_index = query_index
     
     def start_session(self, question: str) -> None:
         """Initialize a new research session."""
@@ -67,8 +161,13 @@ class SessionMemory:
         self.follow_ups = []
         self.searches = []
         self.fetches = []
-        self.facts = []
+        self._fact_cols = self._empty_fact_columns()
         self.started_at = datetime.now()
+        self._start_ns = time.monotonic_ns()
+        self._query_set = set()
+        self._url_set = set()
+        if self.query_index is not None:
+            self.query_index.clear()
     
     def add_follow_up(self, question: str) -> None:
         """Add a follow-up question to the session."""
@@ -77,20 +176,43 @@ class SessionMemory:
     def add_search(self, query: str, results: list[dict[str, Any]]) -> None:
         """Record a search operation."""
         self.searches.append(SearchRecord(query=query, results=results))
+        self._query_set.add(query.casefold())
+        if self.query_index is not None:
+            self.query_index.insert(query, query)
     
     def add_fetch(self, url: str, title: str, content: str) -> None:
         """Record a content fetch operation."""
-        preview = content[:500] + "..." if len(content) > 500 else content
+        # Slice one character past the limit to detect truncation
+        preview = content[:501]
+        if len(preview) > 500:
+            preview = preview[:500] + "..."
         self.fetches.append(FetchRecord(url=url, title=title, content_preview=preview))
+        self._url_set.add(canonicalize_url(url))
+    
+    @staticmethod
+    def _empty_fact_columns() -> dict[str, list]:
+        """Create empty fact columns, keyed like FactRecord's fields."""
+        return {"content": [], "source_url": [], "fact_type": [], "confidence": [], "timestamp_ns": []}
+    
+    @property
+    def facts(self) -> FactView:
+        """Extracted facts, read-only; add them with add_fact(s)."""
+        return FactView(self._fact_cols)
     
     def add_fact(self, fact: dict[str, Any]) -> None:
         """Record an extracted fact."""
-        self.facts.append(FactRecord(
-            content=fact.get("content", ""),
-            source_url=fact.get("source_url", ""),
-            fact_type=fact.get("type", "unknown"),
-            confidence=fact.get("confidence", "medium")
-        ))
+        self.add_facts([fact])
+    
+    def add_facts(self, facts: list[dict[str, Any]]) -> None:
+        """Record several extracted facts at once."""
+        cols = self._fact_cols
+        now = time.monotonic_ns()
+        for fact in facts:
+            cols["content"].append(fact.get("content", ""))
+            cols["source_url"].append(fact.get("source_url", ""))
+            cols["fact_type"].append(fact.get("type", "unknown"))
+            cols["confidence"].append(fact.get("confidence", "medium"))
+            cols["timestamp_ns"].append(now)
     
     def get_searched_queries(self) -> list[str]:
         """Get list of all searched queries."""
@@ -102,11 +224,23 @@ class SessionMemory:
     
     def has_searched(self, query: str) -> bool:
         """Check if a query has already been searched."""
-        return query.lower() in [s.query.lower() for s in self.searches]
+        return query.casefold() in self._query_set
+    
+    def find_similar_search(self, query: str) -> tuple[str, float] | None:
+        """
+        Find the previously searched query closest in meaning to a query.
+        
+        Returns:
+            Tuple of (previous query, cosine similarity), or None without a
+            query_index or earlier searches
+        """
+        if self.query_index is None or not self.searches:
+            return None
+        return self.query_index.nearest(query)
     
     def has_fetched(self, url: str) -> bool:
-        """Check if a URL has already been fetched."""
-        return url in self.get_fetched_urls()
+        """Check if a URL (or an equivalent spelling of it) has been fetched."""
+        return canonicalize_url(url) in self._url_set
     
     def get_context_summary(self) -> str:
         """Generate a summary of current session state."""
@@ -116,7 +250,7 @@ Session Summary:
 - Follow-ups: {len(self.follow_ups)}
 - Searches: {len(self.searches)}
 - Sources fetched: {len(self.fetches)}
-- Facts extracted: {len(self.facts)}
+- Facts extracted: {len(self._fact_cols["content"])}
 - Duration: {self._get_duration()}
 """
     
@@ -124,19 +258,23 @@ Session Summary:
         """Calculate session duration."""
         if not self.started_at:
             return "N/A"
-        delta = datetime.now() - self.started_at
-        minutes = delta.seconds // 60
-        seconds = delta.seconds % 60
+        elapsed = (time.monotonic_ns() - self._start_ns) // 10**9
+        minutes = elapsed // 60
+        seconds = elapsed % 60
         return f"{minutes}m {seconds}s"
     
+    def to_datetime(self, timestamp_ns: int) -> datetime | None:
+        """Convert a record's monotonic timestamp to wall-clock time."""
+        if not self.started_at:
+            return None
+        return self.started_at + timedelta(microseconds=(timestamp_ns - self._start_ns) / 1000)
+    
     def get_all_facts(self) -> list[dict[str, Any]]:
         """Get all facts as dictionaries."""
+        cols = self._fact_cols
         return [
-            {
-                "content": f.content,
-                "source_url": f.source_url,
-                "type": f.fact_type,
-                "confidence": f.confidence
-            }
-            for f in self.facts
+            {"content": content, "source_url": source_url, "type": fact_type, "confidence": confidence}
+            for content, source_url, fact_type, confidence in zip(
+                cols["content"], cols["source_url"], cols["fact_type"], cols["confidence"]
+            )
         ]
@@ -5,15 +5,60 @@ Provides semantic search over fetched content using ChromaDB.
 Enables finding relevant information across all research materials.
 """
 
+import asyncio
+import sys
 from typing import Any
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime
 
+from src.memory.embeddings import get_embedding_function
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Above this many chunks, the HNSW graph is built denser for recall
+_LARGE_INDEX_ITEMS = 100_000
+
+
+def _hnsw_params(expected_items: int) -> dict[str, Any]:
+    """
+    Choose HNSW index parameters for the expected collection size.
+    
+    ChromaDB's defaults (M=16, construction_ef=100, search_ef=10) trade
+    too much recall for speed at query time; a research session's index
+    is small enough to afford a wider search. Small indexes keep the
+    default graph, large ones get a denser one.
+    """
+    if expected_items < _LARGE_INDEX_ITEMS:
+        return {"hnsw:M": 16, "hnsw:construction_ef": 100, "hnsw:search_ef": 40}
+    return {"hnsw:M": 24, "hnsw:construction_ef": 128, "hnsw:search_ef": 100}
+
+
+def _cosine_topk(queries: Any, matrix: Any, k: int) -> tuple[Any, Any]:
+    """
+    Find the k most similar rows of matrix for each query.
+    
+    Both arguments hold unit-normalized float32 vectors, so one matrix
+    product gives every cosine similarity. Selection is vectorized across
+    all queries: a partial partition, then a sort of only the k winners.
+    
+    Returns:
+        (indices, similarities), each of shape (len(queries), k), best first
+    """
+    import numpy as np
+    
+    similarities = np.asarray(queries, dtype=np.float32) @ matrix.T
+    k = min(k, matrix.shape[0])
+    if k < matrix.shape[0]:
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(k), (similarities.shape[0], k))
+    top_similarities = np.take_along_axis(similarities, top, axis=1)
+    order = np.argsort(-top_similarities, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_similarities, order, axis=1)
+
 
 @dataclass
 class DocumentChunk:
@@ -36,14 +81,55 @@ class VectorStore:
     - Retrieving related facts across sources
     - Avoiding redundant information in reports
     - Supporting context-aware conversations
+    
+    Search results are cached by query embedding, so a repeated or
+    paraphrased query (cosine similarity at or above the threshold)
+    skips the index probe. The cached query embeddings live in one
+    preallocated matrix, so a lookup is a single matrix-vector product.
+    The cache is dropped whenever content is added.
+    
+    ChromaDB remains the durable store, but unfiltered searches run
+    against an in-process mirror of its embeddings: one numpy matrix
+    product per batch of queries, with no per-query database overhead.
     """
     
-    def __init__(self, collection_name: str = "research_content", persist_directory: str = None):
+    def __init__(
+        self,
+        collection_name: str = "research_content",
+        persist_directory: str = None,
+        expected_items: int = 10_000,
+        similarity_threshold: float = 0.92,
+        max_cached_queries: int = 1024
+    ):
         self.collection_name = collection_name
         self.persist_directory = persist_directory
+        self.expected_items = expected_items
+        self.similarity_threshold = similarity_threshold
+        self.max_cached_queries = max_cached_queries
         self._client = None
         self._collection = None
         self._document_count = 0
+        # (query, filter) -> (matrix slot, top_k, results), in LRU order.
+        # Slots 0..len-1 are in use; row i of the matrix holds the query
+        # embedding cached in slot i, with its top_k and filter id
+        self._result_cache: OrderedDict[tuple[str, str], tuple[int, int, list[DocumentChunk]]] = OrderedDict()
+        self._cache_matrix = None
+        self._cache_top_k = None
+        self._cache_filters = None
+        self._cache_slot_keys: list[tuple[str, str] | None] = [None] * max_cached_queries
+        self._filter_ids: dict[str, int] = {}
+        # The most recent plain search, reused without even embedding
+        # the query (synthesis and follow-ups often repeat the question)
+        self._last_search: tuple[str, int, list[DocumentChunk]] | None = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # In-process mirror of the collection, used for unfiltered searches
+        # once it has been loaded from the collection
+        self._index_ready = False
+        self._index_embeddings: list[Any] = []
+        self._index_documents: list[str] = []
+        self._index_metadatas: list[dict[str, Any]] = []
+        self._index_matrix = None
     
     def _get_collection(self):
         """Lazy initialization of ChromaDB collection."""
@@ -64,17 +150,78 @@ class VectorStore:
                 
                 self._client = chromadb.Client(Settings(**settings_dict))
                 
-                # Get or create collection with cosine similarity
+                # Get or create collection with cosine similarity, with
+                # the HNSW index sized for the expected number of chunks
                 self._collection = self._client.get_or_create_collection(
                     name=self.collection_name,
-                    metadata={"hnsw:space": "cosine"}
+                    metadata={"hnsw:space": "cosine", **_hnsw_params(self.expected_items)}
                 )
+                self._load_index(self._collection)
                 
             except ImportError:
                 raise ImportError("chromadb is required. Install with: pip install chromadb")
         
         return self._collection
     
+    def _load_index(self, collection) -> None:
+        """Mirror the collection's stored embeddings in process."""
+        try:
+            stored = collection.get(include=["embeddings", "documents", "metadatas"])
+        except Exception as e:
+            logger.warning(f"Searching through ChromaDB, could not mirror collection: {e}")
+            return
+        
+        embeddings = stored.get("embeddings")
+        self._index_embeddings = list(embeddings) if embeddings is not None else []
+        self._index_documents = list(stored.get("documents") or [])
+        self._index_metadatas = [metadata or {} for metadata in stored.get("metadatas") or []]
+        self._index_matrix = None
+        self._index_ready = True
+    
+    def _index_add(
+        self,
+        documents: list[str],
+        embeddings: list[Any],
+        metadatas: list[dict[str, Any]]
+    ) -> None:
+        """Mirror newly added items."""
+        if not self._index_ready:
+            return
+        
+        self._index_embeddings.extend(embeddings)
+        self._index_documents.extend(documents)
+        self._index_metadatas.extend(metadatas)
+        self._index_matrix = None
+    
+    def _index_search(self, embeddings: list[Any], top_k: int) -> list[list[DocumentChunk]]:
+        """Exact cosine search of the in-process mirror."""
+        if not self._index_embeddings:
+            return [[] for _ in embeddings]
+        
+        import numpy as np
+        
+        if self._index_matrix is None:
+            self._index_matrix = np.asarray(self._index_embeddings, dtype=np.float32)
+        
+        indices, similarities = _cosine_topk(embeddings, self._index_matrix, top_k)
+        return [
+            self._to_chunks(
+                [self._index_documents[j] for j in row_indices],
+                [self._index_metadatas[j] for j in row_indices],
+                (1.0 - row_similarities).tolist()
+            )
+            for row_indices, row_similarities in zip(indices.tolist(), similarities)
+        ]
+    
+    def _invalidate_search_cache(self) -> None:
+        """Forget cached search results once the collection changes."""
+        self._result_cache.clear()
+        self._last_search = None
+    
+    def _embed(self, texts: list[str]) -> list[Any]:
+        """Embed texts with the shared model in one batched pass."""
+        return get_embedding_function()(texts)
+    
     def add_document(
         self, 
         content: str, 
@@ -90,39 +237,84 @@ class VectorStore:
         Returns:
             The document ID
         """
-        if not content or len(content.strip()) < 50:
-            return ""
+        # All chunks go in with a single batched insert
+        return self.add_documents([content], [metadata or {}])[0]
+    
+    def add_documents(
+        self,
+        contents: list[str],
+        metadatas: list[dict[str, Any]] | None = None
+    ) -> list[str]:
+        """
+        Add several documents to the vector store in one batch.
+        
+        All chunks are inserted with a single collection call so the
+        embedding model runs one batched forward pass instead of one
+        per chunk.
+        
+        Args:
+            contents: The text contents to store
+            metadatas: Metadata for each content (url, title, etc.)
+            
+        Returns:
+            The document IDs, with "" for documents that were skipped
+        """
+        metadatas = metadatas or [{} for _ in contents]
+        timestamp = datetime.now().isoformat()
+        doc_ids = []
+        batch_documents = []
+        batch_metadatas = []
+        batch_ids = []
+        
+        for content, metadata in zip(contents, metadatas):
+            # Skip near-empty content; only padded content needs a stripped copy
+            padded = content and (content[0].isspace() or content[-1].isspace())
+            if not content or len(content) < 50 or (padded and len(content.strip()) < 50):
+                doc_ids.append("")
+                continue
+            
+            doc_id = str(uuid.uuid4())
+            # Short documents are a single chunk; skip splitting them into words
+            chunks = [content] if len(content) <= 800 else self._chunk_content(content, chunk_size=800, overlap=100)
+            
+            # Fields shared by every chunk of the document
+            base_metadata = {
+                **(metadata or {}),
+                "total_chunks": len(chunks),
+                "doc_id": doc_id,
+                "timestamp": timestamp
+            }
+            
+            batch_documents.extend(chunks)
+            batch_metadatas.extend({**base_metadata, "chunk_index": i} for i in range(len(chunks)))
+            batch_ids.extend(f"{doc_id}_{i}" for i in range(len(chunks)))
+            
+            doc_ids.append(doc_id)
+        
+        if not batch_documents:
+            return doc_ids
         
         collection = self._get_collection()
-        doc_id = str(uuid.uuid4())
         
         try:
-            # Chunk long content with overlap for better context
-            chunks = self._chunk_content(content, chunk_size=800, overlap=100)
-            
-            for i, chunk in enumerate(chunks):
-                chunk_id = f"{doc_id}_{i}"
-                chunk_metadata = {
-                    **(metadata or {}), 
-                    "chunk_index": i,
-                    "total_chunks": len(chunks),
-                    "doc_id": doc_id,
-                    "timestamp": datetime.now().isoformat()
-                }
-                
-                collection.add(
-                    documents=[chunk],
-                    metadatas=[chunk_metadata],
-                    ids=[chunk_id]
-                )
+            embeddings = self._embed(batch_documents)
+            collection.add(
+                documents=batch_documents,
+                embeddings=embeddings,
+                metadatas=batch_metadatas,
+                ids=batch_ids
+            )
             
-            self._document_count += 1
-            logger.info(f"Added document {doc_id} with {len(chunks)} chunks")
-            return doc_id
+            self._index_add(batch_documents, embeddings, batch_metadatas)
+            self._invalidate_search_cache()
+            added = sum(1 for doc_id in doc_ids if doc_id)
+            self._document_count += added
+            logger.info(f"Added {added} documents with {len(batch_documents)} chunks")
+            return doc_ids
             
         except Exception as e:
-            logger.error(f"Failed to add document: {e}")
-            return ""
+            logger.error(f"Failed to add documents: {e}")
+            return ["" for _ in doc_ids]
     
     def add_fact(self, fact: dict[str, Any]) -> str:
         """
@@ -144,18 +336,24 @@ class VectorStore:
         try:
             metadata = {
                 "type": "fact",
-                "fact_type": fact.get("type", "unknown"),
-                "confidence": fact.get("confidence", "medium"),
+                # A handful of distinct values repeat across every fact;
+                # interned, the mirrored metadata shares one copy of each
+                "fact_type": sys.intern(str(fact.get("type", "unknown"))),
+                "confidence": sys.intern(str(fact.get("confidence", "medium"))),
                 "source_url": fact.get("source_url", ""),
                 "timestamp": datetime.now().isoformat()
             }
             
+            embeddings = self._embed([content])
             collection.add(
                 documents=[content],
+                embeddings=embeddings,
                 metadatas=[metadata],
                 ids=[fact_id]
             )
             
+            self._index_add([content], embeddings, [metadata])
+            self._invalidate_search_cache()
             return fact_id
             
         except Exception as e:
@@ -184,42 +382,181 @@ class VectorStore:
         if not query:
             return []
         
+        if filter_metadata is None and self._last_search is not None:
+            last_query, last_top_k, last_chunks = self._last_search
+            if last_query == query and last_top_k == top_k:
+                self.cache_hits += 1
+                return list(last_chunks)
+        
+        chunks = self._multi_search([query], top_k, filter_metadata)[0]
+        # Empty results may be a failed query; don't hold on to those
+        if filter_metadata is None and chunks:
+            self._last_search = (query, top_k, chunks)
+        return list(chunks)
+    
+    async def asearch(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter_metadata: dict[str, Any] | None = None
+    ) -> list[DocumentChunk]:
+        """
+        Search without blocking the event loop.
+        
+        Embedding the query and probing the index run in a worker thread.
+        """
+        return await asyncio.to_thread(self.search, query, top_k, filter_metadata)
+    
+    def _multi_search(
+        self,
+        queries: list[str],
+        top_k: int,
+        filter_metadata: dict[str, Any] | None = None,
+        use_cache: bool = True
+    ) -> list[list[DocumentChunk]]:
+        """
+        Run several searches with a single index query.
+        
+        The queries are embedded in one batched forward pass.
+        
+        Args:
+            queries: The search queries
+            top_k: Number of results to return per query
+            filter_metadata: Optional metadata filters
+            use_cache: Whether to read and fill the similarity cache.
+                Queries that deliberately vary a shared prefix must not,
+                as they would be served each other's results
+            
+        Returns:
+            One list of matching DocumentChunks per query
+        """
         collection = self._get_collection()
+        filter_key = repr(filter_metadata)
         
         try:
-            results = collection.query(
-                query_texts=[query],
-                n_results=top_k,
-                where=filter_metadata,
-                include=["documents", "metadatas", "distances"]
-            )
+            embeddings = self._embed(queries)
+            if use_cache:
+                results = [self._cached_results(embedding, top_k, filter_key) for embedding in embeddings]
+            else:
+                results = [None] * len(queries)
+            missing = [i for i, chunks in enumerate(results) if chunks is None]
+            if use_cache:
+                self.cache_hits += len(queries) - len(missing)
+                self.cache_misses += len(missing)
             
-            chunks = []
-            documents = results.get("documents", [[]])[0]
-            metadatas = results.get("metadatas", [[]])[0]
-            distances = results.get("distances", [[]])[0]
+            if missing and filter_metadata is None and self._index_ready:
+                for i, chunks in zip(missing, self._index_search([embeddings[i] for i in missing], top_k)):
+                    results[i] = chunks
+                    if use_cache:
+                        self._cache_results(queries[i], embeddings[i], filter_key, top_k, chunks)
             
-            for i, doc in enumerate(documents):
-                metadata = metadatas[i] if i < len(metadatas) else {}
-                distance = distances[i] if i < len(distances) else 1.0
-                
-                # Convert distance to similarity (cosine distance to similarity)
-                similarity = 1.0 - distance
+            elif missing:
+                response = collection.query(
+                    query_embeddings=[embeddings[i] for i in missing],
+                    n_results=top_k,
+                    where=filter_metadata,
+                    include=["documents", "metadatas", "distances"]
+                )
                 
-                chunks.append(DocumentChunk(
-                    id=f"result_{i}",
-                    content=doc,
-                    url=metadata.get("url", ""),
-                    title=metadata.get("title", ""),
-                    chunk_index=metadata.get("chunk_index", 0),
-                    similarity_score=similarity
-                ))
+                for i, documents, metadatas, distances in zip(
+                    missing,
+                    response.get("documents") or [[] for _ in missing],
+                    response.get("metadatas") or [[] for _ in missing],
+                    response.get("distances") or [[] for _ in missing]
+                ):
+                    results[i] = self._to_chunks(documents, metadatas, distances)
+                    if use_cache:
+                        self._cache_results(queries[i], embeddings[i], filter_key, top_k, results[i])
             
-            return chunks
+            return results
             
         except Exception as e:
             logger.error(f"Search failed: {e}")
-            return []
+            return [[] for _ in queries]
+    
+    def _cached_results(
+        self,
+        embedding: Any,
+        top_k: int,
+        filter_key: str
+    ) -> list[DocumentChunk] | None:
+        """Find cached results for the most similar earlier query, if close enough."""
+        used = len(self._result_cache)
+        filter_id = self._filter_ids.get(filter_key)
+        if not used or filter_id is None:
+            return None
+        
+        import numpy as np
+        
+        similarities = self._cache_matrix[:used] @ np.asarray(embedding, dtype=np.float32)
+        eligible = (self._cache_filters[:used] == filter_id) & (self._cache_top_k[:used] >= top_k)
+        similarities = np.where(eligible, similarities, -np.inf)
+        slot = int(np.argmax(similarities))
+        if similarities[slot] < self.similarity_threshold:
+            return None
+        
+        key = self._cache_slot_keys[slot]
+        self._result_cache.move_to_end(key)
+        return self._result_cache[key][2][:top_k]
+    
+    def _cache_results(
+        self,
+        query: str,
+        embedding: Any,
+        filter_key: str,
+        top_k: int,
+        chunks: list[DocumentChunk]
+    ) -> None:
+        """Remember a query's results, evicting the least recently used."""
+        import numpy as np
+        
+        if self._cache_matrix is None:
+            self._cache_matrix = np.zeros((self.max_cached_queries, len(embedding)), dtype=np.float32)
+            self._cache_top_k = np.zeros(self.max_cached_queries, dtype=np.int64)
+            self._cache_filters = np.zeros(self.max_cached_queries, dtype=np.int64)
+        
+        key = (query, filter_key)
+        if key in self._result_cache:
+            slot = self._result_cache[key][0]
+        elif len(self._result_cache) < self.max_cached_queries:
+            slot = len(self._result_cache)
+        else:
+            # The evicted entry's slot is reused, so slots stay contiguous
+            _, (slot, _, _) = self._result_cache.popitem(last=False)
+        
+        self._cache_matrix[slot] = embedding
+        self._cache_top_k[slot] = top_k
+        self._cache_filters[slot] = self._filter_ids.setdefault(filter_key, len(self._filter_ids))
+        self._cache_slot_keys[slot] = key
+        self._result_cache[key] = (slot, top_k, chunks)
+        self._result_cache.move_to_end(key)
+    
+    def _to_chunks(
+        self,
+        documents: list[str],
+        metadatas: list[dict[str, Any]],
+        distances: list[float]
+    ) -> list[DocumentChunk]:
+        """Convert one query's ChromaDB results into DocumentChunks."""
+        chunks = []
+        
+        for i, doc in enumerate(documents):
+            metadata = metadatas[i] if i < len(metadatas) else {}
+            distance = distances[i] if i < len(distances) else 1.0
+            
+            # Convert distance to similarity (cosine distance to similarity)
+            similarity = 1.0 - distance
+            
+            chunks.append(DocumentChunk(
+                id=f"result_{i}",
+                content=doc,
+                url=metadata.get("url", ""),
+                title=metadata.get("title", ""),
+                chunk_index=metadata.get("chunk_index", 0),
+                similarity_score=similarity
+            ))
+        
+        return chunks
     
     def find_related_content(
         self,
@@ -240,25 +577,29 @@ class VectorStore:
         Returns:
             Relevant content chunks
         """
-        # Direct semantic search
-        direct_results = self.search(question, top_k=top_k)
-        
-        # If we have existing facts, also search based on fact content
-        fact_based_results = []
-        for fact in existing_facts[:3]:  # Use top 3 facts for context
-            fact_content = fact.get("content", "")
-            if fact_content:
-                # Combine question with fact for richer search
-                combined_query = f"{question} {fact_content[:100]}"
-                fact_results = self.search(combined_query, top_k=2)
-                fact_based_results.extend(fact_results)
-        
-        # Deduplicate and sort by similarity
-        seen_content = set()
+        if not question:
+            return []
+        
+        # Direct semantic search, plus the question combined with each of
+        # the top 3 facts for richer context, all in one batched query
+        fact_queries = [
+            f"{question} {content[:100]}"
+            for fact in existing_facts[:3]
+            if (content := fact.get("content"))
+        ]
+        # The fact queries share the question as a prefix and would be
+        # served its cached results, so this batch bypasses the cache
+        results = self._multi_search([question, *fact_queries], top_k=max(top_k, 2), use_cache=False)
+        
+        direct_results = results[0][:top_k]
+        fact_based_results = [chunk for fact_results in results[1:] for chunk in fact_results[:2]]
+        
+        # Deduplicate on a hash of the content prefix and sort by similarity
+        seen_content: set[int] = set()
         all_results = []
         
         for chunk in direct_results + fact_based_results:
-            content_key = chunk.content[:100]
+            content_key = hash(chunk.content[:100])
             if content_key not in seen_content:
                 seen_content.add(content_key)
                 all_results.append(chunk)
@@ -267,6 +608,21 @@ class VectorStore:
         all_results.sort(key=lambda x: x.similarity_score, reverse=True)
         return all_results[:top_k]
     
+    async def afind_related_content(
+        self,
+        question: str,
+        existing_facts: list[dict[str, Any]],
+        top_k: int = 5
+    ) -> list[DocumentChunk]:
+        """
+        Find content related to a follow-up question without blocking the
+        event loop.
+        
+        The searches are already batched into one query, so a single
+        worker thread runs them all.
+        """
+        return await asyncio.to_thread(self.find_related_content, question, existing_facts, top_k)
+    
     def get_context_for_synthesis(
         self,
         question: str,
@@ -321,23 +677,22 @@ class VectorStore:
         
         chunks = []
         words = content.split()
-        current_chunk = []
+        word_lens = [len(word) + 1 for word in words]
+        overlap_words = overlap // 10
+        # The current chunk is always the slice words[start:i]
+        start = 0
         current_length = 0
         
-        for word in words:
-            word_length = len(word) + 1
-            if current_length + word_length > chunk_size:
-                chunks.append(" ".join(current_chunk))
+        for i, word_length in enumerate(word_lens):
+            if current_length + word_length > chunk_size and i > start:
+                chunks.append(" ".join(words[start:i]))
                 # Keep overlap words for context continuity
-                overlap_words = current_chunk[-overlap//10:] if len(current_chunk) > overlap//10 else []
-                current_chunk = overlap_words + [word]
-                current_length = sum(len(w) + 1 for w in current_chunk)
-            else:
-                current_chunk.append(word)
-                current_length += word_length
+                start = i - overlap_words if overlap_words and i - start > overlap_words else i
+                current_length = sum(word_lens[start:i])
+            current_length += word_length
         
-        if current_chunk:
-            chunks.append(" ".join(current_chunk))
+        if start < len(words):
+            chunks.append(" ".join(words[start:]))
         
         return chunks
     
@@ -348,6 +703,12 @@ class VectorStore:
                 self._client.delete_collection(self.collection_name)
                 self._collection = None
                 self._document_count = 0
+                self._index_ready = False
+                self._index_embeddings = []
+                self._index_documents = []
+                self._index_metadatas = []
+                self._index_matrix = None
+                self._invalidate_search_cache()
                 logger.info(f"Cleared collection: {self.collection_name}")
         except Exception as e:
             logger.error(f"Failed to clear collection: {e}")
@@ -365,5 +726,7 @@ class VectorStore:
         return {
             "collection_name": self.collection_name,
             "item_count": self.count(),
-            "documents_added": self._document_count
+            "documents_added": self._document_count,
+            "search_cache_hits": self.cache_hits,
+            "search_cache_misses": self.cache_misses
         }
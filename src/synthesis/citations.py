@@ -6,9 +6,20 @@ Tracks sources and ensures every claim is properly attributed.
 
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import cached_property
 from typing import Any
 from urllib.parse import urlparse
 
+# Common words ignored when matching claims against source content
+_STOPWORDS = frozenset({
+    "the", "a", "an", "is", "are", "was", "were", "and", "or", "but", "in", "on", "at", "to", "for"
+})
+
+
+def _content_words(text: str) -> frozenset[str]:
+    """Lowercased words of text, without stopwords."""
+    return frozenset(word for word in text.lower().split() if word not in _STOPWORDS)
+
 
 @dataclass
 class Citation:
@@ -20,10 +31,12 @@ class Citation:
     accessed_at: datetime = field(default_factory=datetime.now)
     used_in_report: bool = False
     citation_number: int | None = None
+    # Word set of content, built once for claim validation
+    _content_tokens: frozenset[str] | None = field(default=None, repr=False, compare=False)
     
-    @property
+    @cached_property
     def domain(self) -> str:
-        """Extract domain from URL."""
+        """Extract domain from URL (parsed once per citation)."""
         try:
             parsed = urlparse(self.url)
             return parsed.netloc
@@ -54,6 +67,8 @@ class CitationManager:
     
     def __init__(self):
         self.citations: dict[str, Citation] = {}  # URL -> Citation
+        # Used citations in the order they were numbered
+        self._used_order: list[Citation] = []
         self._next_number = 1
     
     def add_potential_source(
@@ -87,7 +102,9 @@ class CitationManager:
         """Update a source with fully fetched content."""
         if url in self.citations:
             # Store first 5000 chars of content for validation
-            self.citations[url].content = content[:5000] if content else ""
+            citation = self.citations[url]
+            citation.content = content[:5000] if content else ""
+            citation._content_tokens = _content_words(citation.content)
     
     def mark_used(self, url: str) -> int | None:
         """
@@ -107,6 +124,7 @@ class CitationManager:
             citation.used_in_report = True
             citation.citation_number = self._next_number
             self._next_number += 1
+            self._used_order.append(citation)
         
         return citation.citation_number
     
@@ -117,8 +135,9 @@ class CitationManager:
     
     def get_used_citations(self) -> list[Citation]:
         """Get all citations that are used in the report."""
-        used = [c for c in self.citations.values() if c.used_in_report]
-        return sorted(used, key=lambda c: c.citation_number or 999)
+        # Already in citation-number order, since numbers are assigned
+        # as citations are marked used
+        return list(self._used_order)
     
     def get_all_citations(self) -> list[Citation]:
         """Get all citations (used and unused)."""
@@ -126,6 +145,8 @@ class CitationManager:
     
     def get_unused_citations(self) -> list[Citation]:
         """Get citations that haven't been used yet."""
+        if len(self._used_order) == len(self.citations):
+            return []
         return [c for c in self.citations.values() if not c.used_in_report]
     
     def format_references(self) -> str:
@@ -155,26 +176,22 @@ class CitationManager:
         if not citation or not citation.content:
             return False
         
-        # Simple keyword overlap check
-        claim_words = set(claim.lower().split())
-        content_words = set(citation.content.lower().split())
-        
-        # Remove common words
-        stopwords = {"the", "a", "an", "is", "are", "was", "were", "and", "or", "but", "in", "on", "at", "to", "for"}
-        claim_words -= stopwords
+        # Simple keyword overlap check, against the content's cached word set
+        if citation._content_tokens is None:
+            citation._content_tokens = _content_words(citation.content)
+        claim_words = _content_words(claim)
         
         if not claim_words:
             return True
         
         # Require at least 40% of claim words to appear in content
-        overlap = len(claim_words & content_words) / len(claim_words)
+        overlap = len(claim_words & citation._content_tokens) / len(claim_words)
         return overlap >= 0.4
     
     def get_source_diversity(self) -> dict[str, Any]:
         """Analyze source diversity."""
         used = self.get_used_citations()
-        domains = [c.domain for c in used]
-        unique_domains = set(domains)
+        unique_domains = {c.domain for c in used}
         
         return {
             "total_sources": len(used),
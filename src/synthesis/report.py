@@ -4,15 +4,36 @@ Report Generator
 Synthesizes research findings into structured, well-cited reports.
 """
 
+import re
+from collections.abc import Iterator
 from dataclasses import dataclass, field
 from typing import Any
 
-from src.agent.prompts import SYNTHESIS_PROMPT, FOLLOW_UP_PROMPT
+from src.agent.prompts import (
+    FOLLOW_UP_SYSTEM,
+    SYNTHESIS_SYSTEM,
+    render_follow_up_corpus,
+    render_follow_up_prompt,
+    render_synthesis_prompt,
+)
 from src.synthesis.citations import Citation
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# The heading that opens the knowledge gaps section: a "#" heading or a
+# line that is all bold, naming a gap term anywhere ("## 5. Knowledge
+# Gaps:", "**Limitations & Future Research**"). A mention of these terms
+# in prose or in a bullet doesn't open it
+_GAP_HEADING_RE = re.compile(
+    r"(?im)^[ \t]*(?:#{1,6}[ \t][^\n]*?(?:knowledge gap|limitation|further research|areas for)[^\n]*"
+    r"|\*\*[^\n*]*?(?:knowledge gap|limitation|further research|areas for)[^\n*]*\*\*:?[ \t]*)$"
+)
+# The next heading of either style, which ends it
+_SECTION_HEADING_RE = re.compile(r"(?m)^[ \t]*(?:#{1,6}\s|\*\*[^\n]*\*\*:?[ \t]*$)")
+# A bullet item's text
+_BULLET_RE = re.compile(r"(?m)^[ \t]*-[ \t]*(\S.*?)\s*$")
+
 
 @dataclass
 class Report:
@@ -27,38 +48,40 @@ class Report:
     
     def to_markdown(self) -> str:
         """Export report as Markdown."""
-        lines = [
-            f"# Research Report",
-            f"",
-            f"**Question:** {self.question}",
-            f"",
-            self.content,
-            f"",
-        ]
+        return "\n".join(self._iter_markdown())
+    
+    def _iter_markdown(self) -> Iterator[str]:
+        """Yield the Markdown export one line at a time (without newlines)."""
+        yield "# Research Report"
+        yield ""
+        yield f"**Question:** {self.question}"
+        yield ""
+        yield self.content
+        yield ""
         
         if self.knowledge_gaps:
-            lines.extend([
-                "## Knowledge Gaps",
-                "",
-            ])
+            yield "## Knowledge Gaps"
+            yield ""
             for gap in self.knowledge_gaps:
-                lines.append(f"- {gap}")
-            lines.append("")
+                yield f"- {gap}"
+            yield ""
         
         if self.citations:
-            lines.extend([
-                "## References",
-                "",
-            ])
+            yield "## References"
+            yield ""
             for citation in self.citations:
-                lines.append(citation.to_reference())
-        
-        return "\n".join(lines)
+                yield citation.to_reference()
     
     def save(self, filepath: str) -> None:
-        """Save report to a file."""
+        """
+        Save report to a file.
+        
+        Lines are streamed to the file rather than joined into one string.
+        """
+        lines = self._iter_markdown()
         with open(filepath, "w", encoding="utf-8") as f:
-            f.write(self.to_markdown())
+            f.write(next(lines))
+            f.writelines("\n" + line for line in lines)
 
 
 class ReportGenerator:
@@ -101,7 +124,7 @@ class ReportGenerator:
         sources_text = self._format_sources(citations)
         
         # Generate report via LLM
-        prompt = SYNTHESIS_PROMPT.format(
+        prompt = render_synthesis_prompt(
             question=question,
             facts=facts_text,
             sources=sources_text
@@ -109,7 +132,7 @@ class ReportGenerator:
         
         try:
             content = await self.llm.generate(
-                system="You are a research report writer. Create comprehensive, well-cited reports. Use [1], [2] style inline citations.",
+                system=SYNTHESIS_SYSTEM,
                 user=prompt
             )
             
@@ -155,11 +178,24 @@ class ReportGenerator:
             knowledge_gaps=["Report generation encountered an error - this is a simplified summary"]
         )
     
+    def build_corpus(self, facts: list[dict[str, Any]], citations: list[Citation]) -> str:
+        """
+        Render a session's facts and sources as a follow-up corpus block.
+        
+        The block is sent as part of the system prompt for every follow-up,
+        so providers can serve it from their prompt cache.
+        """
+        return render_follow_up_corpus(
+            facts=self._format_facts(facts, citations),
+            sources=self._format_sources(citations)
+        )
+    
     async def generate_follow_up(
         self,
         original_question: str,
         follow_up: str,
-        relevant_facts: list[dict[str, Any]]
+        corpus: str,
+        relevant_fact_numbers: list[int]
     ) -> Report:
         """
         Generate a focused response to a follow-up question.
@@ -167,22 +203,22 @@ class ReportGenerator:
         Args:
             original_question: The original research question
             follow_up: The follow-up question
-            relevant_facts: Facts relevant to the follow-up
+            corpus: Facts and sources block from build_corpus()
+            relevant_fact_numbers: 1-based numbers of corpus facts likely
+                relevant to the follow-up
             
         Returns:
             A focused Report
         """
-        facts_text = self._format_facts(relevant_facts, [])
-        
-        prompt = FOLLOW_UP_PROMPT.format(
+        prompt = render_follow_up_prompt(
             original_question=original_question,
             follow_up=follow_up,
-            relevant_facts=facts_text
+            relevant_facts=", ".join(map(str, relevant_fact_numbers)) or "(none identified)"
         )
         
         try:
             content = await self.llm.generate(
-                system="You respond to follow-up research questions concisely and accurately.",
+                system=FOLLOW_UP_SYSTEM + corpus,
                 user=prompt
             )
             
@@ -207,59 +243,34 @@ class ReportGenerator:
         # Create URL to citation number mapping
         url_to_num = {c.url: c.citation_number for c in citations if c.citation_number}
         
-        lines = []
-        for i, fact in enumerate(facts, 1):
-            content = fact.get("content", "")
-            source = fact.get("source_url", "Unknown")
-            fact_type = fact.get("type", "fact")
-            confidence = fact.get("confidence", "medium")
-            
-            # Add citation number if available
-            cite_num = url_to_num.get(source, "?")
-            
-            lines.append(f"{i}. [{fact_type}, {confidence}] {content} [Source {cite_num}]")
-        
-        return "\n".join(lines)
+        # One formatted line per fact, joined in a single pass
+        return "\n".join(
+            f"{i}. [{fact.get('type', 'fact')}, {fact.get('confidence', 'medium')}] "
+            f"{fact.get('content', '')} [Source {url_to_num.get(fact.get('source_url', 'Unknown'), '?')}]"
+            for i, fact in enumerate(facts, 1)
+        )
     
     def _format_sources(self, citations: list[Citation]) -> str:
         """Format citations for the synthesis prompt."""
         if not citations:
             return "(No sources available)"
         
-        lines = []
-        for citation in citations:
-            num = citation.citation_number or "?"
-            title = citation.title or "Untitled"
-            snippet = citation.snippet[:200] if citation.snippet else ""
-            
-            lines.append(f"[{num}] {title}")
-            lines.append(f"    URL: {citation.url}")
-            if snippet:
-                lines.append(f"    Summary: {snippet}...")
-            lines.append("")
-        
-        return "\n".join(lines)
+        # One block per citation (blank-line separated), built as a single string
+        return "\n".join(
+            f"[{c.citation_number or '?'}] {c.title or 'Untitled'}\n"
+            f"    URL: {c.url}\n"
+            + (f"    Summary: {c.snippet[:200]}...\n" if c.snippet else "")
+            for c in citations
+        )
     
     def _extract_knowledge_gaps(self, content: str) -> list[str]:
         """Extract knowledge gaps mentioned in the report."""
-        gaps = []
-        
-        # Look for a Knowledge Gaps section
-        lower_content = content.lower()
-        if "knowledge gap" in lower_content or "further research" in lower_content or "limitations" in lower_content:
-            lines = content.split("\n")
-            in_gaps_section = False
-            
-            for line in lines:
-                line_lower = line.lower()
-                if any(term in line_lower for term in ["knowledge gap", "limitation", "further research", "areas for"]):
-                    in_gaps_section = True
-                    continue
-                elif line.startswith("##") and in_gaps_section:
-                    break
-                elif in_gaps_section and line.strip().startswith("-"):
-                    gap = line.strip()[1:].strip()
-                    if gap:
-                        gaps.append(gap)
+        # Find the Knowledge Gaps heading and collect every bullet up to the
+        # next heading, scanning the report once with no lowercased copy
+        # or per-line loop
+        section = _GAP_HEADING_RE.search(content)
+        if not section:
+            return []
         
-        return gaps
+        end = _SECTION_HEADING_RE.search(content, section.end())
+        return _BULLET_RE.findall(content, section.end(), end.start() if end else len(content))
@@ -5,32 +5,108 @@ Uses LLM to extract structured information from document content,
 identifying key facts, statistics, and claims relevant to the research.
 """
 
+import asyncio
+import hashlib
 import json
+import math
+import re
+from collections import Counter, defaultdict
 from typing import Any
 
-from src.agent.prompts import FACT_EXTRACTION_PROMPT
+from src.agent.prompts import (
+    FACT_EXTRACTION_SYSTEM,
+    render_fact_extraction_context,
+    render_fact_extraction_prompt,
+)
 from src.tools.base import BaseTool, ToolResult
+from src.utils.cost_tracker import CostTracker
+from src.utils.llm import count_model_tokens
 from src.utils.logging import get_logger
+from src.utils.serialization import json_dumpb, json_loads
 
 logger = get_logger(__name__)
 
 # Maximum content length to analyze at once
 MAX_CHUNK_SIZE = 8000  # characters
 
+# Maximum chunk extractions in flight across all documents
+MAX_CONCURRENT_EXTRACTIONS = 8
+
+# Facts sharing at least this fraction of their words (Jaccard similarity)
+# are treated as near-duplicates
+_NEAR_DUPLICATE_JACCARD = 0.8
+
+_WORD_RE = re.compile(r"\w+")
+
+# Most chunks of one document sent for extraction; the rest are skipped
+# as least relevant to the question
+MAX_ANALYZE_CHUNKS = 8
+
+# Output tokens assumed for an extraction when checking the budget
+_EXPECTED_OUTPUT_TOKENS = 512
+
+
+def _bm25_scores(query: str, documents: list[str], k1: float = 1.5, b: float = 0.75) -> list[float]:
+    """Okapi BM25 score of each document for the query's words."""
+    terms = set(_WORD_RE.findall(query.lower()))
+    counts = [Counter(_WORD_RE.findall(document.lower())) for document in documents]
+    lengths = [sum(c.values()) for c in counts]
+    average_length = sum(lengths) / len(lengths) or 1
+    
+    scores = [0.0] * len(documents)
+    for term in terms:
+        frequency = sum(1 for c in counts if term in c)
+        if not frequency:
+            continue
+        idf = math.log((len(documents) - frequency + 0.5) / (frequency + 0.5) + 1)
+        for i, c in enumerate(counts):
+            tf = c.get(term)
+            if tf:
+                norm = k1 * (1 - b + b * lengths[i] / average_length)
+                scores[i] += idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
 
 class DocumentAnalyzer(BaseTool):
     """
     Analyzes document content to extract relevant facts.
     
     Uses the LLM to identify key information from fetched content,
-    categorizing facts by type and relevance.
+    categorizing facts by type and relevance. Chunks of every document
+    share one pool of extraction slots, so a slow chunk only holds its
+    own slot while the others keep being admitted as slots free up.
+    
+    With a cache, the facts extracted from each (prompt, chunk) pair are
+    stored under a hash of the exact request, so a chunk seen before
+    (in this session or, with a persistent cache, an earlier one) skips
+    the LLM call.
+    
+    With a cost tracker, each extraction is checked against the budget
+    before it is sent and its estimated usage recorded afterwards; once
+    the budget is exhausted, the document's remaining chunks are
+    cancelled.
     """
     
     name = "document_analyzer"
     description = "Extract key facts and information from document content"
     
-    def __init__(self, llm):
+    def __init__(
+        self,
+        llm,
+        max_concurrency: int = MAX_CONCURRENT_EXTRACTIONS,
+        cache=None,
+        cost_tracker: CostTracker | None = None,
+        provider: str = "",
+        model: str = "",
+        max_chunks: int = MAX_ANALYZE_CHUNKS
+    ):
         self.llm = llm
+        self.cache = cache
+        self.cost_tracker = cost_tracker
+        self.max_chunks = max_chunks
+        self.provider = provider
+        self.model = model
+        self._extraction_slots = asyncio.Semaphore(max_concurrency)
     
     async def execute(self, content: str, question: str, **kwargs) -> ToolResult:
         """
@@ -50,15 +126,19 @@ class DocumentAnalyzer(BaseTool):
             return ToolResult(success=False, error="Question is required for analysis")
         
         try:
-            # Chunk content if too long
-            chunks = self._chunk_content(content)
-            all_facts = []
+            # Chunk content if too long, keeping the chunks most relevant
+            # to the question
+            all_chunks = self._chunk_content(content)
+            chunks = self._select_chunks(all_chunks, question)
             
-            for i, chunk in enumerate(chunks):
-                logger.info(f"Analyzing chunk {i+1}/{len(chunks)}")
-                
-                facts = await self._analyze_chunk(chunk, question)
-                all_facts.extend(facts)
+            # Extract from all chunks concurrently; results keep chunk order.
+            # The task group cancels the remaining chunks if one fails.
+            async with asyncio.TaskGroup() as group:
+                tasks = [
+                    group.create_task(self._analyze_chunk_slot(i, len(chunks), chunk, question))
+                    for i, chunk in enumerate(chunks)
+                ]
+            all_facts = [fact for task in tasks for fact in task.result()]
             
             # Deduplicate similar facts
             unique_facts = self._deduplicate_facts(all_facts)
@@ -69,57 +149,140 @@ class DocumentAnalyzer(BaseTool):
                 success=True,
                 data={
                     "facts": unique_facts,
-                    "total_chunks": len(chunks),
+                    "total_chunks": len(all_chunks),
+                    "analyzed_chunks": len(chunks),
                     "facts_count": len(unique_facts)
                 }
             )
             
         except Exception as e:
+            # A task group wraps chunk failures in an ExceptionGroup
+            if isinstance(e, ExceptionGroup):
+                e = e.exceptions[0]
             logger.error(f"Document analysis failed: {e}")
             return ToolResult(success=False, error=str(e))
     
     def _chunk_content(self, content: str) -> list[str]:
-        """Split content into analyzable chunks."""
+        """
+        Split content into analyzable chunks.
+        
+        Chunks are sliced straight out of the content, breaking at the last
+        space or newline before the size limit, so no per-word strings are
+        created and the document's line breaks are kept.
+        """
         if len(content) <= MAX_CHUNK_SIZE:
             return [content]
         
         chunks = []
-        words = content.split()
-        current_chunk = []
-        current_length = 0
-        
-        for word in words:
-            word_length = len(word) + 1  # +1 for space
-            if current_length + word_length > MAX_CHUNK_SIZE:
-                chunks.append(" ".join(current_chunk))
-                current_chunk = [word]
-                current_length = word_length
-            else:
-                current_chunk.append(word)
-                current_length += word_length
-        
-        if current_chunk:
-            chunks.append(" ".join(current_chunk))
+        start = 0
+        
+        while start < len(content):
+            end = min(start + MAX_CHUNK_SIZE, len(content))
+            if end < len(content):
+                split = max(content.rfind(" ", start, end), content.rfind("\n", start, end))
+                if split > start:
+                    end = split
+            
+            chunk = content[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+            start = end
         
         return chunks
     
+    def _select_chunks(self, chunks: list[str], question: str) -> list[str]:
+        """
+        Pick the chunks worth sending to the LLM.
+        
+        Chunks are ranked by BM25 score against the question. Chunks that
+        share no words with it are dropped (unless none do), and at most
+        max_chunks of the best are kept, in document order.
+        """
+        if len(chunks) <= 1:
+            return chunks
+        
+        scores = _bm25_scores(question, chunks)
+        ranked = sorted(range(len(chunks)), key=scores.__getitem__, reverse=True)
+        if scores[ranked[0]] > 0:
+            ranked = [i for i in ranked if scores[i] > 0]
+        
+        keep = sorted(ranked[:self.max_chunks])
+        if len(keep) < len(chunks):
+            logger.info(f"Analyzing {len(keep)} of {len(chunks)} chunks")
+        return [chunks[i] for i in keep]
+    
+    async def _analyze_chunk_slot(
+        self,
+        index: int,
+        total: int,
+        content: str,
+        question: str
+    ) -> list[dict[str, Any]]:
+        """Analyze a chunk once an extraction slot is free."""
+        async with self._extraction_slots:
+            logger.info(f"Analyzing chunk {index+1}/{total}")
+            return await self._analyze_chunk(content, question)
+    
     async def _analyze_chunk(self, content: str, question: str) -> list[dict[str, Any]]:
-        """Analyze a single content chunk."""
-        prompt = FACT_EXTRACTION_PROMPT.format(
-            question=question,
-            content=content
-        )
+        """
+        Analyze a single content chunk.
+        
+        Facts are returned one JSON object per line; each line is parsed
+        as soon as it has been streamed.
+        """
+        # The question goes in the system prompt, so only the chunk content
+        # differs between a document's extraction calls
+        system = FACT_EXTRACTION_SYSTEM + render_fact_extraction_context(question=question)
+        prompt = render_fact_extraction_prompt(content=content)
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = hashlib.sha256(f"{system}\x00{prompt}".encode("utf-8")).hexdigest()
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return json_loads(cached)
+        
+        # Held against the cost limit while the call runs, so concurrent
+        # chunks can't all pass the budget check at once
+        reserved = 0.0
+        if self.cost_tracker is not None:
+            input_tokens = count_model_tokens(system, self.model) + count_model_tokens(prompt, self.model)
+            reserved = self.cost_tracker.reserve(self.cost_tracker.estimate_llm_cost(
+                self.provider, self.model, input_tokens, _EXPECTED_OUTPUT_TOKENS
+            ))
         
         try:
-            response = await self.llm.generate(
-                system="You are a fact extraction assistant. Extract structured facts from content.",
-                user=prompt,
-                response_format="json"
-            )
+            facts = []
+            parts = []
+            
+            pending = ""
+            async for chunk in self.llm.stream(system=system, user=prompt):
+                parts.append(chunk)
+                *lines, pending = (pending + chunk).split("\n")
+                for line in lines:
+                    facts.extend(self._parse_fact_line(line))
+            facts.extend(self._parse_fact_line(pending))
+            
+            if self.cost_tracker is not None:
+                self.cost_tracker.record_llm_usage(
+                    self.provider,
+                    self.model,
+                    input_tokens,
+                    count_model_tokens("".join(parts), self.model)
+                )
             
-            # Parse response
-            data = json.loads(response)
-            return data.get("facts", [])
+            if not facts:
+                # Fall back to a single (possibly pretty-printed) JSON document
+                response = "".join(parts).strip()
+                if response:
+                    data = json_loads(response)
+                    facts = data.get("facts", []) if isinstance(data, dict) else []
+            
+            # Only completed extractions are cached, never failures
+            if cache_key is not None:
+                self.cache.set(cache_key, json_dumpb(facts))
+            
+            return facts
             
         except json.JSONDecodeError:
             logger.warning("Failed to parse fact extraction response")
@@ -127,6 +290,25 @@ class DocumentAnalyzer(BaseTool):
         except Exception as e:
             logger.error(f"Chunk analysis failed: {e}")
             return []
+        finally:
+            if reserved:
+                self.cost_tracker.release(reserved)
+    
+    def _parse_fact_line(self, line: str) -> list[dict[str, Any]]:
+        """Parse one NDJSON line into facts, skipping anything that isn't one."""
+        line = line.strip()
+        if not line.startswith("{"):
+            return []
+        
+        try:
+            data = json_loads(line)
+        except json.JSONDecodeError:
+            return []
+        
+        # Tolerate the {"facts": [...]} wrapper on a single line
+        if isinstance(data.get("facts"), list):
+            return [fact for fact in data["facts"] if isinstance(fact, dict)]
+        return [data] if "content" in data else []
     
     def _deduplicate_facts(self, facts: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """Remove duplicate or very similar facts."""
@@ -135,15 +317,33 @@ class DocumentAnalyzer(BaseTool):
         
         unique = []
         seen_content = set()
+        kept_sizes: list[int] = []
+        # Word -> indices (into kept_sizes) of kept facts containing it
+        postings: defaultdict[str, list[int]] = defaultdict(list)
         
         for fact in facts:
             content = fact.get("content", "").lower().strip()
-            # Simple dedup: check if first 50 chars are seen
+            # Fast path: the first 50 chars were already seen
             key = content[:50]
+            if key in seen_content:
+                continue
+            
+            # Near-duplicates: the same claim in slightly different wording.
+            # Only kept facts sharing a word are candidates; the inverted
+            # index counts shared words, giving Jaccard without set algebra
+            words = frozenset(_WORD_RE.findall(content))
+            shared = Counter(i for word in words for i in postings.get(word, ()))
+            if any(
+                count >= _NEAR_DUPLICATE_JACCARD * (len(words) + kept_sizes[i] - count)
+                for i, count in shared.items()
+            ):
+                continue
             
-            if key not in seen_content:
-                seen_content.add(key)
-                unique.append(fact)
+            seen_content.add(key)
+            for word in words:
+                postings[word].append(len(kept_sizes))
+            kept_sizes.append(len(words))
+            unique.append(fact)
         
         return unique
     
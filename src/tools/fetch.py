@@ -6,13 +6,21 @@ Uses trafilatura for high-quality content extraction.
 """
 
 import asyncio
+import importlib.util
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from typing import Any
 from urllib.parse import urlparse
 
 import httpx
 
+from src.memory.kv_cache import KeyValueCache
 from src.tools.base import BaseTool, ToolResult
 from src.utils.logging import get_logger
+from src.utils.serialization import json_dumpb, json_loads
 
 logger = get_logger(__name__)
 
@@ -20,6 +28,108 @@ logger = get_logger(__name__)
 DEFAULT_TIMEOUT = 30.0
 MAX_CONTENT_SIZE = 5 * 1024 * 1024  # 5MB max
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+MAX_CONNECTIONS = 200
+MAX_KEEPALIVE_CONNECTIONS = 100
+
+
+def create_http_client(timeout: float = DEFAULT_TIMEOUT) -> httpx.AsyncClient:
+    """
+    Create a pooled HTTP client for fetching web pages.
+    
+    Keeps connections alive between requests and uses HTTP/2 when the
+    optional h2 package is installed, so repeated requests to the same
+    host skip the TCP/TLS handshake.
+    """
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    
+    return httpx.AsyncClient(
+        timeout=timeout,
+        follow_redirects=True,
+        headers={"User-Agent": USER_AGENT},
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+        )
+    )
+
+
+# Worker processes for trafilatura, created on first use. Extraction is
+# CPU-bound pure Python, so threads would serialize on the GIL.
+_extraction_pool: ProcessPoolExecutor | None = None
+
+
+@lru_cache
+def _has_trafilatura() -> bool:
+    """Whether trafilatura is installed (checked without importing it)."""
+    return importlib.util.find_spec("trafilatura") is not None
+
+
+def _preload_trafilatura() -> None:
+    """Import trafilatura once per worker process, ahead of the first page."""
+    import trafilatura  # noqa: F401
+
+
+def _get_extraction_pool() -> ProcessPoolExecutor:
+    """Get the shared extraction process pool."""
+    global _extraction_pool
+    if _extraction_pool is None:
+        # Spawned rather than forked: the parent runs threads (event loop
+        # executors, ChromaDB) that must not be duplicated mid-operation
+        _extraction_pool = ProcessPoolExecutor(
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_preload_trafilatura
+        )
+    return _extraction_pool
+
+
+def _extract_with_trafilatura(
+    html: str,
+    url: str,
+    include_links: bool,
+    include_tables: bool
+) -> dict[str, Any]:
+    """Extract content and metadata with trafilatura (runs in a worker process)."""
+    import trafilatura
+    from trafilatura.settings import use_config
+    from trafilatura.utils import load_html
+    
+    # Parse once and share the tree between metadata and content
+    # extraction. Metadata is read first, since content extraction prunes
+    # the tree.
+    tree = load_html(html)
+    if tree is None:
+        return {"content": "", "title": "", "author": None, "date": None}
+    
+    # Get metadata
+    metadata = trafilatura.extract_metadata(tree)
+    
+    # Configure extraction
+    config = use_config()
+    config.set("DEFAULT", "INCLUDE_LINKS", str(include_links))
+    config.set("DEFAULT", "INCLUDE_TABLES", str(include_tables))
+    
+    # Extract content
+    content = trafilatura.extract(
+        tree,
+        url=url,
+        include_links=include_links,
+        include_tables=include_tables,
+        include_comments=False,
+        output_format="txt",
+        config=config
+    )
+    
+    return {
+        "content": content or "",
+        "title": metadata.title if metadata else "",
+        "author": metadata.author if metadata else None,
+        "date": metadata.date if metadata else None,
+    }
 
 
 class ContentFetchTool(BaseTool):
@@ -34,18 +144,25 @@ class ContentFetchTool(BaseTool):
     name = "content_fetch"
     description = "Fetch and extract content from a web page"
     
-    def __init__(self, timeout: float = DEFAULT_TIMEOUT):
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        client: httpx.AsyncClient | None = None,
+        cache: KeyValueCache | None = None,
+        cache_ttl: float = 86400.0
+    ):
         self.timeout = timeout
-        self._client = None
+        self._client = client
+        # A client passed in is shared and closed by its owner
+        self._owns_client = client is None
+        # Extracted pages by URL, revalidated with conditional requests
+        self.cache = cache
+        self.cache_ttl = cache_ttl
     
     def _get_client(self) -> httpx.AsyncClient:
         """Lazy initialization of HTTP client."""
         if self._client is None:
-            self._client = httpx.AsyncClient(
-                timeout=self.timeout,
-                follow_redirects=True,
-                headers={"User-Agent": USER_AGENT}
-            )
+            self._client = create_http_client(self.timeout)
         return self._client
     
     async def execute(self, url: str, **kwargs) -> ToolResult:
@@ -74,22 +191,52 @@ class ContentFetchTool(BaseTool):
         include_links = kwargs.get("include_links", False)
         include_tables = kwargs.get("include_tables", True)
         
+        # A cached copy turns the request into a conditional GET; an
+        # unchanged page then skips the download and extraction
+        cache_key = f"{url}\x00{include_links}\x00{include_tables}"
+        cached = await self._cached_page(cache_key)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        
         try:
-            # Fetch the page
+            # Fetch the page, streaming so oversized bodies are abandoned
+            # as soon as they pass the limit instead of fully buffered
             client = self._get_client()
-            response = await client.get(url)
-            response.raise_for_status()
-            
-            # Check content size
-            content_length = len(response.content)
-            if content_length > MAX_CONTENT_SIZE:
-                return ToolResult(
-                    success=False, 
-                    error=f"Content too large: {content_length} bytes"
-                )
+            async with client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and cached:
+                    logger.info(f"Not modified, using cached copy of {url}")
+                    await self._store_page(cache_key, cached)
+                    return ToolResult(
+                        success=True,
+                        data=cached["data"],
+                        metadata={**cached["metadata"], "cached": True}
+                    )
+                
+                response.raise_for_status()
+                
+                declared_length = response.headers.get("content-length", "")
+                if declared_length.isdigit() and int(declared_length) > MAX_CONTENT_SIZE:
+                    return ToolResult(
+                        success=False, 
+                        error=f"Content too large: {declared_length} bytes"
+                    )
+                
+                body = bytearray()
+                async for chunk in response.aiter_bytes(65536):
+                    body.extend(chunk)
+                    if len(body) > MAX_CONTENT_SIZE:
+                        return ToolResult(
+                            success=False, 
+                            error=f"Content too large: over {MAX_CONTENT_SIZE} bytes"
+                        )
+                
+                html_content = body.decode(response.encoding or "utf-8", errors="replace")
             
             # Extract content using trafilatura
-            html_content = response.text
             extracted = await self._extract_content(
                 html_content,
                 url=url,
@@ -105,21 +252,30 @@ class ContentFetchTool(BaseTool):
             
             logger.info(f"Fetched {url}: {len(extracted['content'])} chars")
             
-            return ToolResult(
-                success=True,
-                data={
-                    "url": url,
-                    "title": extracted["title"],
-                    "content": extracted["content"],
-                    "author": extracted.get("author"),
-                    "date": extracted.get("date"),
-                    "word_count": len(extracted["content"].split())
-                },
-                metadata={
-                    "content_type": response.headers.get("content-type", ""),
-                    "status_code": response.status_code
-                }
-            )
+            data = {
+                "url": url,
+                "title": extracted["title"],
+                "content": extracted["content"],
+                "author": extracted.get("author"),
+                "date": extracted.get("date"),
+                "word_count": len(extracted["content"].split())
+            }
+            metadata = {
+                "content_type": response.headers.get("content-type", ""),
+                "status_code": response.status_code
+            }
+            
+            etag = response.headers.get("etag")
+            last_modified = response.headers.get("last-modified")
+            if etag or last_modified:
+                await self._store_page(cache_key, {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "data": data,
+                    "metadata": metadata
+                })
+            
+            return ToolResult(success=True, data=data, metadata=metadata)
             
         except httpx.TimeoutException:
             logger.warning(f"Timeout fetching {url}")
@@ -136,6 +292,33 @@ class ContentFetchTool(BaseTool):
             logger.error(f"Failed to fetch {url}: {e}")
             return ToolResult(success=False, error=str(e))
     
+    async def _cached_page(self, key: str) -> dict[str, Any] | None:
+        """Get a cached page that is still within the TTL."""
+        if self.cache is None:
+            return None
+        
+        # Pages can be large, so the store is read off the event loop
+        value = await asyncio.to_thread(self.cache.get, key)
+        if not value:
+            return None
+        
+        try:
+            page = json_loads(value)
+        except ValueError:
+            return None
+        
+        if time.time() - page.get("stored_at", 0) > self.cache_ttl:
+            return None
+        return page
+    
+    async def _store_page(self, key: str, page: dict[str, Any]) -> None:
+        """Cache a page with its validators, restarting its TTL."""
+        if self.cache is None:
+            return
+        
+        page["stored_at"] = time.time()
+        await asyncio.to_thread(self.cache.set, key, json_dumpb(page))
+    
     async def _extract_content(
         self, 
         html: str, 
@@ -146,49 +329,62 @@ class ContentFetchTool(BaseTool):
         """
         Extract clean content from HTML using trafilatura.
         
-        Runs in a thread pool to avoid blocking the event loop
-        since trafilatura is synchronous.
+        Runs in a shared process pool, so concurrent fetches extract on
+        separate cores without blocking the event loop.
         """
-        def _sync_extract():
-            try:
-                import trafilatura
-                from trafilatura.settings import use_config
-                
-                # Configure extraction
-                config = use_config()
-                config.set("DEFAULT", "INCLUDE_LINKS", str(include_links))
-                config.set("DEFAULT", "INCLUDE_TABLES", str(include_tables))
-                
-                # Extract content
-                content = trafilatura.extract(
-                    html,
-                    url=url,
-                    include_links=include_links,
-                    include_tables=include_tables,
-                    include_comments=False,
-                    output_format="txt",
-                    config=config
-                )
-                
-                # Get metadata
-                metadata = trafilatura.extract_metadata(html)
-                
-                return {
-                    "content": content or "",
-                    "title": metadata.title if metadata else "",
-                    "author": metadata.author if metadata else None,
-                    "date": metadata.date if metadata else None,
-                }
-                
-            except ImportError:
-                # Fallback to basic BeautifulSoup extraction
-                return self._fallback_extract(html)
+        if not _has_trafilatura():
+            # Fallback to basic HTML parsing
+            return await asyncio.to_thread(self._fallback_extract, html)
         
-        # Run synchronous extraction in thread pool
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _sync_extract)
+        args = (html, url, include_links, include_tables)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(_get_extraction_pool(), _extract_with_trafilatura, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); extract this page in a
+            # thread and start a fresh pool for the next one
+            global _extraction_pool
+            _extraction_pool = None
+            logger.warning("Extraction process pool is broken, extracting in a thread")
+            return await asyncio.to_thread(_extract_with_trafilatura, *args)
     
     def _fallback_extract(self, html: str) -> dict[str, Any]:
+        """
+        Fallback extraction when trafilatura is unavailable.
+        
+        Uses selectolax's C parser when it is installed, and BeautifulSoup
+        otherwise; selectolax avoids building a Python object per node.
+        """
+        try:
+            from selectolax.parser import HTMLParser
+        except ImportError:
+            return self._soup_extract(html)
+        
+        try:
+            tree = HTMLParser(html)
+            
+            # Remove script and style elements
+            for element in tree.css("script, style, nav, footer, header"):
+                element.decompose()
+            
+            # Extract title
+            title_node = tree.css_first("title")
+            title = title_node.text(strip=True) if title_node else ""
+            
+            # Extract text
+            text = tree.root.text(separator="\n", strip=True) if tree.root else ""
+            
+            return {
+                "content": text,
+                "title": title,
+                "author": None,
+                "date": None,
+            }
+            
+        except Exception:
+            return {"content": "", "title": "", "author": None, "date": None}
+    
+    def _soup_extract(self, html: str) -> dict[str, Any]:
         """Fallback extraction using BeautifulSoup."""
         try:
             from bs4 import BeautifulSoup
@@ -218,8 +414,8 @@ class ContentFetchTool(BaseTool):
             return {"content": "", "title": "", "author": None, "date": None}
     
     async def close(self):
-        """Close the HTTP client."""
-        if self._client:
+        """Close the HTTP client if this tool created it."""
+        if self._client and self._owns_client:
             await self._client.aclose()
             self._client = None
     
@@ -5,14 +5,20 @@ Provides web search capabilities using the Tavily API (or alternatives).
 Tavily is specifically designed for AI agents and returns clean, structured results.
 """
 
+import asyncio
 from typing import Any
 
 from src.tools.base import BaseTool, ToolResult
+from src.utils.async_cache import AsyncLRUCache
 from src.utils.config import Settings
+from src.utils.cost_tracker import SEARCH_COSTS, CostTracker
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Parsed results kept per tool for repeated searches within a session
+MAX_CACHED_SEARCHES = 256
+
 
 class WebSearchTool(BaseTool):
     """
@@ -25,20 +31,36 @@ class WebSearchTool(BaseTool):
     name = "web_search"
     description = "Search the web for information on a topic"
     
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, cost_tracker: CostTracker | None = None):
         self.settings = settings
+        # Paid searches are checked against and recorded in the tracker
+        self.cost_tracker = cost_tracker
         self.api_key = settings.tavily_api_key
         self.max_results = settings.max_search_results
         self._client = None
+        self._client_is_async = False
+        # Parsed results by normalized search; identical searches still
+        # running share one API call
+        self._result_cache = AsyncLRUCache(MAX_CACHED_SEARCHES)
     
     def _get_client(self):
-        """Lazy initialization of Tavily client."""
+        """
+        Lazy initialization of Tavily client.
+        
+        Prefers the SDK's async client; older tavily-python releases only
+        ship the blocking one, whose calls execute() runs in a thread.
+        """
         if self._client is None:
             try:
-                from tavily import TavilyClient
-                self._client = TavilyClient(api_key=self.api_key)
+                from tavily import AsyncTavilyClient
+                self._client = AsyncTavilyClient(api_key=self.api_key)
+                self._client_is_async = True
             except ImportError:
-                raise ImportError("tavily-python is required. Install with: pip install tavily-python")
+                try:
+                    from tavily import TavilyClient
+                    self._client = TavilyClient(api_key=self.api_key)
+                except ImportError:
+                    raise ImportError("tavily-python is required. Install with: pip install tavily-python")
         return self._client
     
     async def execute(self, query: str, **kwargs) -> ToolResult:
@@ -61,29 +83,22 @@ class WebSearchTool(BaseTool):
         include_domains = kwargs.get("include_domains", [])
         exclude_domains = kwargs.get("exclude_domains", [])
         
+        key = (
+            " ".join(query.lower().split()),
+            search_depth,
+            tuple(sorted(include_domains)),
+            tuple(sorted(exclude_domains)),
+            self.max_results
+        )
+        metadata = {"search_depth": search_depth, "api": "tavily"}
+        
         try:
-            client = self._get_client()
-            
-            # Execute search
-            response = client.search(
-                query=query,
-                search_depth=search_depth,
-                max_results=self.max_results,
-                include_domains=include_domains if include_domains else None,
-                exclude_domains=exclude_domains if exclude_domains else None,
+            results, cached = await self._result_cache.get_or_compute(
+                key,
+                lambda: self._search(query, search_depth, include_domains, exclude_domains)
             )
-            
-            # Parse results
-            results = []
-            for item in response.get("results", []):
-                results.append({
-                    "title": item.get("title", ""),
-                    "url": item.get("url", ""),
-                    "snippet": item.get("content", ""),
-                    "score": item.get("score", 0.0),
-                })
-            
-            logger.info(f"Search for '{query}' returned {len(results)} results")
+            if cached:
+                metadata["cached"] = True
             
             return ToolResult(
                 success=True,
@@ -92,10 +107,7 @@ class WebSearchTool(BaseTool):
                     "results": results,
                     "count": len(results)
                 },
-                metadata={
-                    "search_depth": search_depth,
-                    "api": "tavily"
-                }
+                metadata=metadata
             )
             
         except Exception as e:
@@ -106,6 +118,56 @@ class WebSearchTool(BaseTool):
                 metadata={"query": query}
             )
     
+    async def _search(
+        self,
+        query: str,
+        search_depth: str,
+        include_domains: list[str],
+        exclude_domains: list[str]
+    ) -> list[dict[str, Any]]:
+        """Run a search against the Tavily API and parse its results."""
+        # Held against the cost limit while the search runs, so concurrent
+        # searches can't all pass the budget check at once
+        reserved = 0.0
+        if self.cost_tracker is not None:
+            reserved = self.cost_tracker.reserve(SEARCH_COSTS["tavily"])
+        
+        client = self._get_client()
+        
+        # Execute search without blocking the event loop, so
+        # concurrent searches overlap
+        search_kwargs = {
+            "query": query,
+            "search_depth": search_depth,
+            "max_results": self.max_results,
+            "include_domains": include_domains if include_domains else None,
+            "exclude_domains": exclude_domains if exclude_domains else None,
+        }
+        try:
+            if self._client_is_async:
+                response = await client.search(**search_kwargs)
+            else:
+                response = await asyncio.to_thread(client.search, **search_kwargs)
+        finally:
+            if reserved:
+                self.cost_tracker.release(reserved)
+        
+        if self.cost_tracker is not None:
+            self.cost_tracker.record_search_usage("tavily", 1)
+        
+        # Parse results
+        results = []
+        for item in response.get("results", []):
+            results.append({
+                "title": item.get("title", ""),
+                "url": item.get("url", ""),
+                "snippet": item.get("content", ""),
+                "score": item.get("score", 0.0),
+            })
+        
+        logger.info(f"Search for '{query}' returned {len(results)} results")
+        return results
+    
     def get_schema(self) -> dict[str, Any]:
         """Return JSON schema for function calling."""
         return {
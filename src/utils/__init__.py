@@ -2,14 +2,14 @@
 
 from src.utils.config import Settings, get_settings
 from src.utils.logging import setup_logging, get_logger
-from src.utils.cost_tracker import CostTracker
+from src.utils.cost_tracker import BudgetExceeded, CostTracker
 from src.utils.llm import get_llm_client
-from src.utils.quality import QualityValidator, QualityReport, validate_research_quality
+from src.utils.quality import QualityValidator, QualityReport, QualityMetrics, validate_research_quality
 
 __all__ = [
     "Settings", "get_settings",
     "setup_logging", "get_logger",
-    "CostTracker",
+    "BudgetExceeded", "CostTracker",
     "get_llm_client",
-    "QualityValidator", "QualityReport", "validate_research_quality"
+    "QualityValidator", "QualityReport", "QualityMetrics", "validate_research_quality"
 ]
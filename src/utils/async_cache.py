@@ -0,0 +1,106 @@
+"""
+Async LRU Cache
+
+In-memory LRU cache for the results of async calls, with optional expiry
+and sharing of calls that are still running.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+# Marks a miss, so None can be cached like any other value
+_MISSING = object()
+
+
+class AsyncLRUCache:
+    """
+    Least-recently-used cache for async results, with an optional TTL.
+    
+    get_or_compute() answers from the cache when it can, and otherwise
+    awaits the given call and stores its result. Callers asking for a key
+    whose call is still running share that call instead of starting
+    another. Failed calls are never cached.
+    """
+    
+    def __init__(self, capacity: int, ttl: float | None = None):
+        self.capacity = capacity
+        self.ttl = ttl
+        # Values with their expiry time (monotonic clock)
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the unexpired value for key, or default."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        
+        expiry, value = entry
+        if expiry < time.monotonic():
+            del self._entries[key]
+            return default
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        # No lock needed: the event loop never switches tasks between
+        # these dict operations
+        expiry = time.monotonic() + self.ttl if self.ttl else float("inf")
+        self._entries[key] = (expiry, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove all cached values."""
+        self._entries.clear()
+    
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        """
+        Return the value for key, awaiting compute() to produce it on a miss.
+        
+        Args:
+            key: The cache key
+            compute: Makes the call whose result is cached under key
+        
+        Returns:
+            Tuple of (value, shared), where shared is True if the value came
+            from the cache or from another caller's call
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value, True
+        
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key]), True
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved, in case no other caller was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            self.set(key, value)
+        finally:
+            del self._inflight[key]
+        return value, False
@@ -31,10 +31,70 @@ class Settings(BaseSettings):
         description="Model name to use"
     )
     
+    llm_max_concurrency: int = Field(
+        default=16,
+        ge=1,
+        le=64,
+        description="Maximum requests in flight to the LLM provider at once"
+    )
+    
+    llm_max_retries: int = Field(
+        default=4,
+        ge=0,
+        le=10,
+        description="Retries of transient LLM API errors (rate limits, 5xx, timeouts)"
+    )
+    llm_tokens_per_minute: int = Field(
+        default=0,
+        ge=0,
+        description="Provider tokens-per-minute limit to pace LLM requests under (0 disables)"
+    )
+    
+    llm_cache_size: int = Field(
+        default=512,
+        ge=0,
+        description="Number of identical LLM requests to cache per session (0 disables)"
+    )
+    llm_cache_ttl: int = Field(
+        default=3600,
+        ge=0,
+        description="Seconds a cached LLM response stays valid (0 keeps it for the session)"
+    )
+    
     # Search Configuration
     tavily_api_key: str = Field(default="", description="Tavily API key for web search")
     search_provider: str = Field(default="tavily", description="Search provider to use")
     max_search_results: int = Field(default=10, ge=1, le=50)
+    search_concurrency: int = Field(
+        default=3,
+        ge=1,
+        le=10,
+        description="Maximum number of web searches in flight at once"
+    )
+    fetch_concurrency: int = Field(
+        default=5,
+        ge=1,
+        le=20,
+        description="Maximum number of page fetches in flight at once"
+    )
+    analyze_concurrency: int = Field(
+        default=3,
+        ge=1,
+        le=10,
+        description="Number of workers analyzing fetched content concurrently"
+    )
+    extraction_concurrency: int = Field(
+        default=8,
+        ge=1,
+        le=32,
+        description="Maximum fact-extraction LLM calls in flight at once, across all documents"
+    )
+    max_analyze_chunks: int = Field(
+        default=8,
+        ge=1,
+        le=50,
+        description="Most chunks of a document sent for fact extraction, ranked by relevance"
+    )
     
     # Agent Configuration
     max_iterations: int = Field(
@@ -57,6 +117,17 @@ class Settings(BaseSettings):
         description="Maximum cost per research request in USD"
     )
     
+    # Caching
+    cache_directory: str = Field(
+        default=".research_cache",
+        description="Directory for caches persisted across sessions; empty disables persistence"
+    )
+    fetch_cache_ttl: int = Field(
+        default=86400,
+        ge=0,
+        description="Seconds a fetched page is kept for revalidation with conditional requests"
+    )
+    
     # Logging
     log_level: str = Field(default="INFO", description="Logging level")
     
@@ -28,13 +28,26 @@ COST_PER_1K_TOKENS = {
     }
 }
 
+# Per-1K (input, output) costs flattened by (provider, model), so each
+# LLM call costs one lookup; unknown models are billed at DEFAULT_COSTS
+FLAT_COSTS = {
+    (provider, model): (costs["input"], costs["output"])
+    for provider, models in COST_PER_1K_TOKENS.items()
+    for model, costs in models.items()
+}
+DEFAULT_COSTS = (0.01, 0.03)
+
 # Search API costs
 SEARCH_COSTS = {
     "tavily": 0.01,  # Approximate per search
 }
 
 
-@dataclass
+class BudgetExceeded(Exception):
+    """Raised when a call would take spending past the cost limit."""
+
+
+@dataclass(slots=True)
 class UsageRecord:
     """Record of a single API call."""
     service: str
@@ -53,9 +66,16 @@ class CostTracker:
     to users about resource usage.
     """
     
-    def __init__(self):
+    def __init__(self, max_cost: float | None = None):
+        self.max_cost = max_cost
         self.records: list[UsageRecord] = []
         self.total_cost: float = 0.0
+        # Projected cost of calls in flight, held against max_cost
+        self._reserved: float = 0.0
+        # Running totals, so summaries don't rescan the records
+        self._cost_by_service: dict[str, float] = {}
+        self._total_input_tokens = 0
+        self._total_output_tokens = 0
     
     def record_llm_usage(
         self,
@@ -86,8 +106,7 @@ class CostTracker:
             cost=cost
         )
         
-        self.records.append(record)
-        self.total_cost += cost
+        self._add_record(record)
         
         return cost
     
@@ -111,11 +130,75 @@ class CostTracker:
             cost=cost
         )
         
-        self.records.append(record)
-        self.total_cost += cost
+        self._add_record(record)
         
         return cost
     
+    def check_budget(self, projected_cost: float) -> None:
+        """
+        Ensure a call can be made without going over the cost limit.
+        
+        Args:
+            projected_cost: Estimated cost of the call about to be made
+            
+        Raises:
+            BudgetExceeded: If the call would take spending past max_cost
+        """
+        if (
+            self.max_cost is not None
+            and self.total_cost + self._reserved + projected_cost > self.max_cost
+        ):
+            raise BudgetExceeded(
+                f"Cost limit of ${self.max_cost:.2f} reached "
+                f"(spent ${self.total_cost:.4f}, reserved ${self._reserved:.4f}, "
+                f"next call ~${projected_cost:.4f})"
+            )
+    
+    def reserve(self, projected_cost: float) -> float:
+        """
+        Check the budget and hold a call's projected cost against it.
+        
+        Concurrent calls each see the others' reservations, so together
+        they can't pass the check and then overspend. Release the
+        reservation once the call's actual usage is recorded.
+        
+        Args:
+            projected_cost: Estimated cost of the call about to be made
+            
+        Returns:
+            The reserved amount, to pass to release()
+            
+        Raises:
+            BudgetExceeded: If the call would take spending past max_cost
+        """
+        self.check_budget(projected_cost)
+        self._reserved += projected_cost
+        return projected_cost
+    
+    def release(self, reserved_cost: float) -> None:
+        """Release a reservation made by reserve()."""
+        self._reserved = max(0.0, self._reserved - reserved_cost)
+    
+    def estimate_llm_cost(
+        self,
+        provider: str,
+        model: str,
+        input_tokens: int,
+        output_tokens: int
+    ) -> float:
+        """Estimate the cost of an LLM call without recording it."""
+        return self._calculate_llm_cost(provider, model, input_tokens, output_tokens)
+    
+    def _add_record(self, record: UsageRecord) -> None:
+        """Store a usage record and fold it into the running totals."""
+        self.records.append(record)
+        self.total_cost += record.cost
+        self._cost_by_service[record.service] = (
+            self._cost_by_service.get(record.service, 0) + record.cost
+        )
+        self._total_input_tokens += record.input_tokens
+        self._total_output_tokens += record.output_tokens
+    
     def _calculate_llm_cost(
         self,
         provider: str,
@@ -124,34 +207,28 @@ class CostTracker:
         output_tokens: int
     ) -> float:
         """Calculate cost for LLM usage."""
-        provider_models = COST_PER_1K_TOKENS.get(provider, {})
-        model_costs = provider_models.get(model, {"input": 0.01, "output": 0.03})
+        input_rate, output_rate = FLAT_COSTS.get((provider, model), DEFAULT_COSTS)
         
-        input_cost = (input_tokens / 1000) * model_costs["input"]
-        output_cost = (output_tokens / 1000) * model_costs["output"]
+        input_cost = (input_tokens / 1000) * input_rate
+        output_cost = (output_tokens / 1000) * output_rate
         
         return input_cost + output_cost
     
     def get_summary(self) -> dict[str, Any]:
         """Get a summary of all costs."""
-        by_service: dict[str, float] = {}
-        total_input_tokens = 0
-        total_output_tokens = 0
-        
-        for record in self.records:
-            by_service[record.service] = by_service.get(record.service, 0) + record.cost
-            total_input_tokens += record.input_tokens
-            total_output_tokens += record.output_tokens
-        
         return {
             "total_cost": self.total_cost,
             "total_calls": len(self.records),
-            "total_input_tokens": total_input_tokens,
-            "total_output_tokens": total_output_tokens,
-            "by_service": by_service
+            "total_input_tokens": self._total_input_tokens,
+            "total_output_tokens": self._total_output_tokens,
+            "by_service": dict(self._cost_by_service)
         }
     
     def reset(self) -> None:
         """Reset the cost tracker."""
         self.records.clear()
         self.total_cost = 0.0
+        self._reserved = 0.0
+        self._cost_by_service.clear()
+        self._total_input_tokens = 0
+        self._total_output_tokens = 0
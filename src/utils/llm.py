@@ -4,14 +4,156 @@ LLM Client Abstraction
 Provides a unified interface for different LLM providers (Anthropic, OpenAI, Google).
 """
 
+import asyncio
+import hashlib
+import random
 from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import AsyncIterator
+from functools import lru_cache
 from typing import Any
 
+import httpx
+
+from src.utils.async_cache import AsyncLRUCache
 from src.utils.config import Settings
 from src.utils.logging import get_logger
+from src.utils.serialization import json_loads
 
 logger = get_logger(__name__)
 
+# Most tasks marshaled into one generate_many() request
+MAX_BATCHED_TASKS = 8
+
+# Output tokens reserved against the token budget for each request
+RESERVED_OUTPUT_TOKENS = 4096
+
+# Connection pool for provider API requests
+API_MAX_CONNECTIONS = 64
+API_MAX_KEEPALIVE_CONNECTIONS = 32
+
+# HTTP statuses of provider errors worth retrying (rate limits, overload)
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 503, 504})
+
+# Backoff before the first retry, doubled per attempt up to the cap (seconds)
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+
+def create_api_http_client() -> httpx.AsyncClient:
+    """
+    Create the HTTP client a provider SDK sends its requests through.
+    
+    Keeps connections alive between calls and uses HTTP/2 when the
+    optional h2 package is installed, so concurrent requests share a few
+    connections instead of each paying a TCP/TLS handshake. Timeouts
+    match the SDKs' own defaults.
+    """
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(600.0, connect=5.0),
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=API_MAX_CONNECTIONS,
+            max_keepalive_connections=API_MAX_KEEPALIVE_CONNECTIONS
+        )
+    )
+
+
+@lru_cache
+def _get_encoding(model: str) -> Any:
+    """
+    Get the tiktoken encoding for a model, or None without tiktoken.
+    
+    Models tiktoken doesn't know (Claude, Gemini) are counted with
+    cl100k_base, which is far closer to their tokenizers than a
+    characters-per-token ratio.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Falling back to estimated token counts: {e}")
+        return None
+
+
+def count_model_tokens(text: str, model: str) -> int:
+    """Count the tokens of text for a model, estimating without tiktoken."""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        # Rough estimate: ~4 chars per token
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+class TokenBudget:
+    """
+    Rolling tokens-per-minute allowance for an LLM provider.
+    
+    Each request reserves its estimated tokens, which are credited back
+    refund_time seconds later, matching the provider's rate-limit window.
+    Requests that don't fit wait in arrival order, so a stream of small
+    requests can't starve a large one.
+    """
+    
+    def __init__(self, tokens_per_minute: int, refund_time: float = 60.0):
+        self.capacity = tokens_per_minute
+        self.available = tokens_per_minute
+        self.refund_time = refund_time
+        self._waiters: deque[tuple[int, asyncio.Future]] = deque()
+    
+    async def reserve(self, tokens: int) -> None:
+        """Wait until the budget covers tokens, then take them."""
+        # A request larger than the whole budget waits for a full budget
+        tokens = min(tokens, self.capacity)
+        if not self._waiters and self.available >= tokens:
+            self._take(tokens)
+            return
+        
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((tokens, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Let the requests queued behind this one through
+            self._wake()
+            raise
+    
+    def _take(self, tokens: int) -> None:
+        self.available -= tokens
+        asyncio.get_running_loop().call_later(self.refund_time, self._refund, tokens)
+    
+    def _refund(self, tokens: int) -> None:
+        self.available += tokens
+        self._wake()
+    
+    def _wake(self) -> None:
+        """Admit queued requests, in order, while the budget covers them."""
+        while self._waiters:
+            tokens, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+            elif self.available >= tokens:
+                self._waiters.popleft()
+                self._take(tokens)
+                future.set_result(None)
+            else:
+                break
+
 
 class BaseLLMClient(ABC):
     """Abstract base class for LLM clients."""
@@ -27,10 +169,75 @@ class BaseLLMClient(ABC):
         """Generate a response from the LLM."""
         pass
     
+    async def stream(
+        self,
+        system: str,
+        user: str,
+        response_format: str | None = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response from the LLM as text chunks.
+        
+        Providers without streaming support yield the full response as a
+        single chunk. Callers may stop iterating early to abandon the rest
+        of the generation.
+        """
+        yield await self.generate(system, user, response_format, **kwargs)
+    
+    async def generate_many(self, system: str, users: list[str]) -> list[str]:
+        """
+        Generate responses to several independent prompts sharing a system prompt.
+        
+        Up to MAX_BATCHED_TASKS prompts are sent as numbered tasks in a
+        single request whose JSON answer holds one string per task, so a
+        burst of small prompts costs one round-trip instead of one each.
+        A batch whose answer can't be matched back to its tasks falls
+        back to individual calls.
+        """
+        batches = [
+            users[i:i + MAX_BATCHED_TASKS]
+            for i in range(0, len(users), MAX_BATCHED_TASKS)
+        ]
+        results = await asyncio.gather(*(self._generate_batch(system, batch) for batch in batches))
+        return [response for batch in results for response in batch]
+    
+    async def _generate_batch(self, system: str, users: list[str]) -> list[str]:
+        """Generate responses to one batch of prompts in a single request."""
+        if len(users) == 1:
+            return [await self.generate(system, users[0])]
+        
+        tasks = "\n\n".join(f"### TASK {i} ###\n{user}" for i, user in enumerate(users, 1))
+        prompt = (
+            f"Complete each of the {len(users)} tasks below independently.\n"
+            f'Respond with only a JSON object {{"answers": [...]}} holding one '
+            f"string per task, in task order.\n\n{tasks}"
+        )
+        
+        try:
+            answers = json_loads(await self.generate(system, prompt, response_format="json"))["answers"]
+            if isinstance(answers, list) and len(answers) == len(users):
+                return [str(answer) for answer in answers]
+        except (ValueError, TypeError, KeyError):
+            pass
+        
+        logger.warning("Batched response didn't match its tasks; generating individually")
+        return list(await asyncio.gather(*(self.generate(system, user) for user in users)))
+    
     @abstractmethod
     def count_tokens(self, text: str) -> int:
         """Count tokens in text."""
         pass
+    
+    async def aclose(self) -> None:
+        """Release network resources held by the client."""
+    
+    async def _reserve_tokens(self, system: str, user: str) -> None:
+        """Wait until the provider's token budget covers a request."""
+        if self._token_budget is not None:
+            await self._token_budget.reserve(
+                self.count_tokens(system) + self.count_tokens(user) + RESERVED_OUTPUT_TOKENS
+            )
 
 
 class AnthropicClient(BaseLLMClient):
@@ -39,16 +246,38 @@ class AnthropicClient(BaseLLMClient):
     def __init__(self, settings: Settings):
         self.settings = settings
         self._client = None
+        # Caps requests in flight to this provider across all callers
+        self._slots = asyncio.Semaphore(settings.llm_max_concurrency)
+        self._token_budget = (
+            TokenBudget(settings.llm_tokens_per_minute)
+            if settings.llm_tokens_per_minute else None
+        )
     
     def _get_client(self):
         if self._client is None:
             try:
                 from anthropic import AsyncAnthropic
-                self._client = AsyncAnthropic(api_key=self.settings.anthropic_api_key)
+                self._client = AsyncAnthropic(
+                    api_key=self.settings.anthropic_api_key,
+                    http_client=create_api_http_client(),
+                    # The SDK retries rate limits, 5xx, timeouts and
+                    # connection errors with jittered exponential backoff
+                    max_retries=self.settings.llm_max_retries
+                )
             except ImportError:
                 raise ImportError("anthropic is required. Install with: pip install anthropic")
         return self._client
     
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+    
+    @staticmethod
+    def _cached_system(system: str) -> list[dict[str, Any]]:
+        """Mark the static system prompt as a cacheable prompt prefix."""
+        return [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+    
     async def generate(
         self,
         system: str,
@@ -59,12 +288,14 @@ class AnthropicClient(BaseLLMClient):
         client = self._get_client()
         
         try:
-            response = await client.messages.create(
-                model=self.settings.llm_model,
-                max_tokens=12288,
-                system=system,
-                messages=[{"role": "user", "content": user}]
-            )
+            await self._reserve_tokens(system, user)
+            async with self._slots:
+                response = await client.messages.create(
+                    model=self.settings.llm_model,
+                    max_tokens=12288,
+                    system=self._cached_system(system),
+                    messages=[{"role": "user", "content": user}]
+                )
             
             return response.content[0].text
             
@@ -72,9 +303,32 @@ class AnthropicClient(BaseLLMClient):
             logger.error(f"Anthropic API error: {e}")
             raise
     
+    async def stream(
+        self,
+        system: str,
+        user: str,
+        response_format: str | None = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        client = self._get_client()
+        
+        try:
+            await self._reserve_tokens(system, user)
+            async with self._slots, client.messages.stream(
+                model=self.settings.llm_model,
+                max_tokens=12288,
+                system=self._cached_system(system),
+                messages=[{"role": "user", "content": user}]
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+                    
+        except Exception as e:
+            logger.error(f"Anthropic API error: {e}")
+            raise
+    
     def count_tokens(self, text: str) -> int:
-        # Rough estimate: ~4 chars per token
-        return len(text) // 4
+        return count_model_tokens(text, self.settings.llm_model)
 
 
 class OpenAIClient(BaseLLMClient):
@@ -83,16 +337,33 @@ class OpenAIClient(BaseLLMClient):
     def __init__(self, settings: Settings):
         self.settings = settings
         self._client = None
+        # Caps requests in flight to this provider across all callers
+        self._slots = asyncio.Semaphore(settings.llm_max_concurrency)
+        self._token_budget = (
+            TokenBudget(settings.llm_tokens_per_minute)
+            if settings.llm_tokens_per_minute else None
+        )
     
     def _get_client(self):
         if self._client is None:
             try:
                 from openai import AsyncOpenAI
-                self._client = AsyncOpenAI(api_key=self.settings.openai_api_key)
+                self._client = AsyncOpenAI(
+                    api_key=self.settings.openai_api_key,
+                    http_client=create_api_http_client(),
+                    # The SDK retries rate limits, 5xx, timeouts and
+                    # connection errors with jittered exponential backoff
+                    max_retries=self.settings.llm_max_retries
+                )
             except ImportError:
                 raise ImportError("openai is required. Install with: pip install openai")
         return self._client
     
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+    
     async def generate(
         self,
         system: str,
@@ -101,7 +372,47 @@ class OpenAIClient(BaseLLMClient):
         **kwargs
     ) -> str:
         client = self._get_client()
+        create_kwargs = self._build_request(system, user, response_format)
         
+        try:
+            await self._reserve_tokens(system, user)
+            async with self._slots:
+                response = await client.chat.completions.create(**create_kwargs)
+            return response.choices[0].message.content or ""
+            
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise
+    
+    async def stream(
+        self,
+        system: str,
+        user: str,
+        response_format: str | None = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        client = self._get_client()
+        create_kwargs = self._build_request(system, user, response_format)
+        
+        try:
+            await self._reserve_tokens(system, user)
+            async with self._slots:
+                response = await client.chat.completions.create(**create_kwargs, stream=True)
+                async for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+                    
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise
+    
+    def _build_request(
+        self,
+        system: str,
+        user: str,
+        response_format: str | None
+    ) -> dict[str, Any]:
+        """Build chat completion arguments."""
         messages = [
             {"role": "system", "content": system},
             {"role": "user", "content": user}
@@ -111,21 +422,17 @@ class OpenAIClient(BaseLLMClient):
             "model": self.settings.llm_model,
             "messages": messages,
             "max_tokens": 12288,
+            # Route requests sharing a system prompt to the same prefix cache
+            "extra_body": {"prompt_cache_key": hashlib.sha256(system.encode("utf-8")).hexdigest()[:16]},
         }
         
         if response_format == "json":
             create_kwargs["response_format"] = {"type": "json_object"}
         
-        try:
-            response = await client.chat.completions.create(**create_kwargs)
-            return response.choices[0].message.content or ""
-            
-        except Exception as e:
-            logger.error(f"OpenAI API error: {e}")
-            raise
+        return create_kwargs
     
     def count_tokens(self, text: str) -> int:
-        return len(text) // 4
+        return count_model_tokens(text, self.settings.llm_model)
 
 
 class GoogleClient(BaseLLMClient):
@@ -134,6 +441,12 @@ class GoogleClient(BaseLLMClient):
     def __init__(self, settings: Settings):
         self.settings = settings
         self._client = None
+        # Caps requests in flight to this provider across all callers
+        self._slots = asyncio.Semaphore(settings.llm_max_concurrency)
+        self._token_budget = (
+            TokenBudget(settings.llm_tokens_per_minute)
+            if settings.llm_tokens_per_minute else None
+        )
     
     def _get_client(self):
         if self._client is None:
@@ -145,6 +458,39 @@ class GoogleClient(BaseLLMClient):
                 raise ImportError("google-generativeai is required. Install with: pip install google-generativeai")
         return self._client
     
+    async def _with_retries(self, call, hold_slot: bool = False):
+        """
+        Await call() in a concurrency slot, retrying transient API errors.
+        
+        Unlike the Anthropic and OpenAI SDKs, the Gemini SDK doesn't retry
+        on its own. Errors carrying a retryable HTTP status are retried up
+        to llm_max_retries times with jittered backoff; anything else is
+        raised at once. Each attempt takes its own slot, released before
+        backing off so other calls can proceed meanwhile. With hold_slot,
+        the successful attempt's slot is kept for the caller to release.
+        """
+        for attempt in range(self.settings.llm_max_retries + 1):
+            await self._slots.acquire()
+            try:
+                result = await call()
+            except BaseException as e:
+                self._slots.release()
+                if (
+                    attempt == self.settings.llm_max_retries
+                    or getattr(e, "code", None) not in RETRYABLE_STATUS_CODES
+                ):
+                    raise
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+                # Jitter spreads out callers that were rate limited together
+                delay *= random.uniform(0.5, 1.0)
+                logger.warning(f"Google API error ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            
+            if not hold_slot:
+                self._slots.release()
+            return result
+    
     async def generate(
         self,
         system: str,
@@ -157,15 +503,115 @@ class GoogleClient(BaseLLMClient):
         prompt = f"{system}\n\n{user}"
         
         try:
-            response = await model.generate_content_async(prompt)
+            await self._reserve_tokens(system, user)
+            response = await self._with_retries(lambda: model.generate_content_async(prompt))
             return response.text
             
         except Exception as e:
             logger.error(f"Google API error: {e}")
             raise
     
+    async def stream(
+        self,
+        system: str,
+        user: str,
+        response_format: str | None = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        model = self._get_client()
+        
+        prompt = f"{system}\n\n{user}"
+        
+        try:
+            await self._reserve_tokens(system, user)
+            # Only opening the stream is retried; chunks already yielded
+            # can't be taken back. The slot is held until the stream ends
+            response = await self._with_retries(
+                lambda: model.generate_content_async(prompt, stream=True),
+                hold_slot=True
+            )
+            try:
+                async for chunk in response:
+                    yield chunk.text
+            finally:
+                self._slots.release()
+                
+        except Exception as e:
+            logger.error(f"Google API error: {e}")
+            raise
+    
     def count_tokens(self, text: str) -> int:
-        return len(text) // 4
+        return count_model_tokens(text, self.settings.llm_model)
+
+
+class LRUCachedLLM(BaseLLMClient):
+    """
+    Wraps an LLM client with an exact-match LRU response cache.
+    
+    Identical (system, user, response_format) requests within a session,
+    such as boilerplate chunks shared between pages, are answered from
+    memory instead of calling the provider again. Identical requests made
+    while the first is still running share its provider call. With a
+    ttl, responses older than ttl seconds are requested again.
+    """
+    
+    def __init__(self, inner: BaseLLMClient, capacity: int = 512, ttl: float | None = None):
+        self.inner = inner
+        # Responses by (system, user, response_format)
+        self._cache = AsyncLRUCache(capacity, ttl)
+    
+    async def generate(
+        self,
+        system: str,
+        user: str,
+        response_format: str | None = None,
+        **kwargs
+    ) -> str:
+        # Extra provider arguments may change the output; don't cache those
+        if kwargs:
+            return await self.inner.generate(system, user, response_format, **kwargs)
+        
+        response, _ = await self._cache.get_or_compute(
+            (system, user, response_format),
+            lambda: self.inner.generate(system, user, response_format)
+        )
+        return response
+    
+    async def stream(
+        self,
+        system: str,
+        user: str,
+        response_format: str | None = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        key = (system, user, response_format)
+        cached = None if kwargs else self._cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        # Only a fully consumed stream is cached; callers may stop early
+        parts = []
+        async for chunk in self.inner.stream(system, user, response_format, **kwargs):
+            parts.append(chunk)
+            yield chunk
+        
+        if not kwargs:
+            self._cache.set(key, "".join(parts))
+    
+    def count_tokens(self, text: str) -> int:
+        return self.inner.count_tokens(text)
+    
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+# Client class for each supported provider name
+_CLIENTS: dict[str, type[BaseLLMClient]] = {
+    "anthropic": AnthropicClient,
+    "openai": OpenAIClient,
+    "google": GoogleClient,
+}
 
 
 def get_llm_client(settings: Settings) -> BaseLLMClient:
@@ -176,18 +622,20 @@ def get_llm_client(settings: Settings) -> BaseLLMClient:
         settings: Application settings
         
     Returns:
-        An LLM client instance
+        An LLM client instance, wrapped in an LRU response cache unless
+        llm_cache_size is 0
     """
     provider = settings.llm_provider.lower()
     
-    clients = {
-        "anthropic": AnthropicClient,
-        "openai": OpenAIClient,
-        "google": GoogleClient,
-    }
-    
-    client_class = clients.get(provider)
+    client_class = _CLIENTS.get(provider)
     if not client_class:
         raise ValueError(f"Unknown LLM provider: {provider}")
     
-    return client_class(settings)
+    client = client_class(settings)
+    if settings.llm_cache_size > 0:
+        return LRUCachedLLM(
+            client,
+            capacity=settings.llm_cache_size,
+            ttl=settings.llm_cache_ttl or None
+        )
+    return client
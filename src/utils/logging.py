@@ -4,13 +4,49 @@ Logging Configuration
 Provides structured logging with rich formatting for the CLI.
 """
 
+import atexit
+import copy
 import logging
+import queue
 import sys
-from typing import Any
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
 
 from rich.logging import RichHandler
 
 
+class _RecordQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves rendering to the handler on the other side.
+    
+    The stock prepare() formats the record and drops exc_info, which
+    would turn RichHandler's tracebacks into plain text. Only the message
+    is merged here, so the arguments can't change before the listener
+    thread gets to the record.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# Thread that drains the log queue into RichHandler
+_listener: Optional[QueueListener] = None
+
+
+def _stop_listener() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def setup_logging(level: str = "INFO") -> None:
     """
     Configure logging for the application.
@@ -27,18 +63,27 @@ def setup_logging(level: str = "INFO") -> None:
     }
     log_level = level_map.get(level.upper(), logging.INFO)
     
-    # Configure root logger
+    # Rich rendering is slow enough to stall the event loop, so records
+    # are only enqueued where they are logged and a listener thread
+    # renders them
+    global _listener
+    _stop_listener()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    rich_handler = RichHandler(
+        rich_tracebacks=True,
+        show_path=False,
+        markup=True,
+    )
+    rich_handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))
+    _listener = QueueListener(log_queue, rich_handler)
+    _listener.start()
+    
+    # Configure root logger, replacing the queue handler of any earlier
+    # call (it would keep feeding the stopped listener's queue)
     logging.basicConfig(
         level=log_level,
-        format="%(message)s",
-        datefmt="[%X]",
-        handlers=[
-            RichHandler(
-                rich_tracebacks=True,
-                show_path=False,
-                markup=True,
-            )
-        ],
+        handlers=[_RecordQueueHandler(log_queue)],
+        force=True,
     )
     
     # Reduce noise from third-party libraries
@@ -47,6 +92,9 @@ def setup_logging(level: str = "INFO") -> None:
     logging.getLogger("chromadb").setLevel(logging.WARNING)
 
 
+atexit.register(_stop_listener)
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance for a module.
@@ -60,44 +108,70 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
+# Context included in StructuredLogger records. Held in a ContextVar, so
+# each asyncio task sees the context bound where it was created plus its
+# own bindings, and nothing accumulates beyond the scope that bound it.
+_log_context: ContextVar[dict[str, Any]] = ContextVar("log_context", default={})
+
+
 class StructuredLogger:
     """
     A structured logger that captures context for debugging.
     
-    Useful for tracking agent actions with full context.
+    Useful for tracking agent actions with full context. Context is
+    scoped to the current task: use bind() for a block, or set_context()
+    for the rest of the task.
     """
     
     def __init__(self, name: str):
         self.logger = logging.getLogger(name)
-        self.context: dict[str, Any] = {}
+    
+    @property
+    def context(self) -> dict[str, Any]:
+        """Context bound in the current task."""
+        return _log_context.get()
+    
+    @contextmanager
+    def bind(self, **kwargs: Any) -> Iterator[None]:
+        """Add context to every message logged within the block."""
+        token = _log_context.set({**_log_context.get(), **kwargs})
+        try:
+            yield
+        finally:
+            _log_context.reset(token)
     
     def set_context(self, **kwargs: Any) -> None:
         """Set context that will be included in all log messages."""
-        self.context.update(kwargs)
+        _log_context.set({**_log_context.get(), **kwargs})
     
     def clear_context(self) -> None:
         """Clear all context."""
-        self.context.clear()
+        _log_context.set({})
     
-    def _format_message(self, message: str) -> str:
-        """Format message with context."""
-        if not self.context:
+    def _format_message(self, message: str, extra: dict[str, Any]) -> str:
+        """Format message with the persistent context and per-call extras."""
+        context = _log_context.get()
+        if extra:
+            context = {**context, **extra}
+        if not context:
             return message
-        context_str = " ".join(f"{k}={v}" for k, v in self.context.items())
+        context_str = " ".join(f"{k}={v}" for k, v in context.items())
         return f"{message} [{context_str}]"
     
+    def _log(self, level: int, message: str, extra: dict[str, Any]) -> None:
+        # Skip formatting entirely for records the level would discard;
+        # per-call kwargs apply to this record only
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, self._format_message(message, extra), stacklevel=3)
+    
     def debug(self, message: str, **kwargs: Any) -> None:
-        self.context.update(kwargs)
-        self.logger.debug(self._format_message(message))
+        self._log(logging.DEBUG, message, kwargs)
     
     def info(self, message: str, **kwargs: Any) -> None:
-        self.context.update(kwargs)
-        self.logger.info(self._format_message(message))
+        self._log(logging.INFO, message, kwargs)
     
     def warning(self, message: str, **kwargs: Any) -> None:
-        self.context.update(kwargs)
-        self.logger.warning(self._format_message(message))
+        self._log(logging.WARNING, message, kwargs)
     
     def error(self, message: str, **kwargs: Any) -> None:
-        self.context.update(kwargs)
-        self.logger.error(self._format_message(message))
+        self._log(logging.ERROR, message, kwargs)
@@ -5,7 +5,9 @@ Validates research quality and identifies issues with citations,
 source diversity, and coverage.
 """
 
-from dataclasses import dataclass, field
+import re
+from collections.abc import Iterator, Mapping
+from dataclasses import asdict, dataclass, field, fields
 from typing import Any
 from enum import Enum
 
@@ -14,6 +16,12 @@ from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Phrases showing a report acknowledges what it couldn't establish
+_GAP_TERMS_RE = re.compile(
+    r"knowledge gap|limitation|further research|not clear|uncertain|more research",
+    re.IGNORECASE
+)
+
 
 class QualityLevel(Enum):
     """Quality assessment levels."""
@@ -24,7 +32,7 @@ class QualityLevel(Enum):
     POOR = "poor"
 
 
-@dataclass
+@dataclass(slots=True)
 class QualityIssue:
     """An identified quality issue."""
     category: str
@@ -33,25 +41,49 @@ class QualityIssue:
     suggestion: str
 
 
-@dataclass
+@dataclass(slots=True)
+class QualityMetrics(Mapping[str, Any]):
+    """
+    Scores per quality dimension, and the totals they were based on.
+    
+    Also reads like the metrics dict it replaced: metrics["total_facts"],
+    metrics.get(...), keys() and items() work on the field names.
+    """
+    source_diversity_score: float = 0.0
+    fact_density_score: float = 0.0
+    citation_coverage_score: float = 0.0
+    knowledge_gap_score: float = 0.0
+    total_sources: int = 0
+    total_facts: int = 0
+    unique_domains: int = 0
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in _METRIC_NAMES:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(_METRIC_NAMES)
+    
+    def __len__(self) -> int:
+        return len(_METRIC_NAMES)
+
+
+_METRIC_NAMES = tuple(f.name for f in fields(QualityMetrics))
+
+
+@dataclass(slots=True)
 class QualityReport:
     """Complete quality assessment report."""
     overall_score: float  # 0.0 to 1.0
     overall_level: QualityLevel
     issues: list[QualityIssue] = field(default_factory=list)
-    metrics: dict[str, Any] = field(default_factory=dict)
+    metrics: QualityMetrics = field(default_factory=QualityMetrics)
     
     def to_dict(self) -> dict[str, Any]:
-        return {
-            "overall_score": self.overall_score,
-            "overall_level": self.overall_level.value,
-            "issues": [
-                {"category": i.category, "severity": i.severity, 
-                 "description": i.description, "suggestion": i.suggestion}
-                for i in self.issues
-            ],
-            "metrics": self.metrics
-        }
+        data = asdict(self)
+        data["overall_level"] = self.overall_level.value
+        return data
 
 
 class QualityValidator:
@@ -74,8 +106,16 @@ class QualityValidator:
     MIN_FACTS = 5
     TARGET_FACTS = 10
     
-    def __init__(self):
-        self.issues: list[QualityIssue] = []
+    # Weight of each check in the overall score
+    WEIGHTS = {
+        "source_diversity": 0.3,
+        "fact_density": 0.25,
+        "citation_coverage": 0.25,
+        "knowledge_gaps": 0.2
+    }
+    
+    # Score of a check with nothing to judge yet
+    NEUTRAL_SCORE = 0.5
     
     def validate(
         self,
@@ -94,61 +134,115 @@ class QualityValidator:
         Returns:
             QualityReport with scores and issues
         """
-        self.issues = []
+        # Nothing gathered yet (early iterations): skip the checks and the
+        # citation manager lookups; this is the report they would produce
+        if not facts and not report_content and not citation_manager.citations:
+            overall_score = self._overall_score(0.0, 0.0, self.NEUTRAL_SCORE, self.NEUTRAL_SCORE)
+            return QualityReport(
+                overall_score=overall_score,
+                overall_level=self._quality_level(overall_score),
+                issues=[self._no_sources_issue(), self._no_facts_issue()],
+                metrics=QualityMetrics(
+                    citation_coverage_score=self.NEUTRAL_SCORE,
+                    knowledge_gap_score=self.NEUTRAL_SCORE
+                )
+            )
         
-        # Run all checks
-        source_score = self._check_source_diversity(citation_manager)
-        fact_score = self._check_fact_density(facts)
-        citation_score = self._check_citation_coverage(facts, citation_manager)
-        gap_score = self._check_knowledge_gaps(facts, report_content)
+        # Tally the fact statistics the checks need in a single pass
+        fact_count = len(facts)
+        high_confidence = 0
+        with_source = 0
+        for fact in facts:
+            if fact.get("confidence") == "high":
+                high_confidence += 1
+            if fact.get("source_url"):
+                with_source += 1
         
-        # Calculate overall score (weighted average)
-        weights = {
-            "source_diversity": 0.3,
-            "fact_density": 0.25,
-            "citation_coverage": 0.25,
-            "knowledge_gaps": 0.2
-        }
+        # One pass over the used citations serves every check and the metrics
+        diversity = citation_manager.get_source_diversity()
+        total_sources = diversity.get("total_sources", 0)
         
-        overall_score = (
-            source_score * weights["source_diversity"] +
-            fact_score * weights["fact_density"] +
-            citation_score * weights["citation_coverage"] +
-            gap_score * weights["knowledge_gaps"]
+        # Run all checks; each returns its score and the issues it found
+        source_score, source_issues = self._check_source_diversity(diversity)
+        fact_score, fact_issues = self._check_fact_density(fact_count, high_confidence)
+        citation_score, citation_issues = self._check_citation_coverage(
+            fact_count, with_source, total_sources
         )
+        gap_score, gap_issues = self._check_knowledge_gaps(facts, report_content)
         
-        # Determine quality level
-        if overall_score >= 0.85:
-            level = QualityLevel.EXCELLENT
-        elif overall_score >= 0.7:
-            level = QualityLevel.GOOD
-        elif overall_score >= 0.5:
-            level = QualityLevel.ACCEPTABLE
-        elif overall_score >= 0.3:
-            level = QualityLevel.NEEDS_IMPROVEMENT
-        else:
-            level = QualityLevel.POOR
+        overall_score = self._overall_score(source_score, fact_score, citation_score, gap_score)
+        level = self._quality_level(overall_score)
         
-        metrics = {
-            "source_diversity_score": source_score,
-            "fact_density_score": fact_score,
-            "citation_coverage_score": citation_score,
-            "knowledge_gap_score": gap_score,
-            "total_sources": len(citation_manager.get_used_citations()),
-            "total_facts": len(facts),
-            "unique_domains": len(citation_manager.get_source_diversity().get("domains", []))
-        }
+        metrics = QualityMetrics(
+            source_diversity_score=source_score,
+            fact_density_score=fact_score,
+            citation_coverage_score=citation_score,
+            knowledge_gap_score=gap_score,
+            total_sources=total_sources,
+            total_facts=fact_count,
+            unique_domains=diversity.get("unique_domains", 0)
+        )
         
         return QualityReport(
             overall_score=overall_score,
             overall_level=level,
-            issues=self.issues,
+            issues=[*source_issues, *fact_issues, *citation_issues, *gap_issues],
             metrics=metrics
         )
     
-    def _check_source_diversity(self, citation_manager: CitationManager) -> float:
+    def _overall_score(
+        self,
+        source_score: float,
+        fact_score: float,
+        citation_score: float,
+        gap_score: float
+    ) -> float:
+        """Calculate overall score (weighted average)."""
+        return (
+            source_score * self.WEIGHTS["source_diversity"] +
+            fact_score * self.WEIGHTS["fact_density"] +
+            citation_score * self.WEIGHTS["citation_coverage"] +
+            gap_score * self.WEIGHTS["knowledge_gaps"]
+        )
+    
+    @staticmethod
+    def _quality_level(overall_score: float) -> QualityLevel:
+        """Determine quality level."""
+        if overall_score >= 0.85:
+            return QualityLevel.EXCELLENT
+        elif overall_score >= 0.7:
+            return QualityLevel.GOOD
+        elif overall_score >= 0.5:
+            return QualityLevel.ACCEPTABLE
+        elif overall_score >= 0.3:
+            return QualityLevel.NEEDS_IMPROVEMENT
+        return QualityLevel.POOR
+    
+    @staticmethod
+    def _no_sources_issue() -> QualityIssue:
+        return QualityIssue(
+            category="source_diversity",
+            severity="high",
+            description="No sources were used in the research",
+            suggestion="Conduct additional searches to gather sources"
+        )
+    
+    @staticmethod
+    def _no_facts_issue() -> QualityIssue:
+        return QualityIssue(
+            category="fact_density",
+            severity="high",
+            description="No facts were extracted",
+            suggestion="Review source quality and analysis process"
+        )
+    
+    def _check_source_diversity(
+        self,
+        diversity: dict[str, Any]
+    ) -> tuple[float, list[QualityIssue]]:
         """Check for diverse sources from different domains."""
-        diversity = citation_manager.get_source_diversity()
+        issues: list[QualityIssue] = []
+        
         total_sources = diversity.get("total_sources", 0)
         unique_domains = diversity.get("unique_domains", 0)
         
@@ -163,19 +257,14 @@ class QualityValidator:
             source_score = 0.3
         else:
             source_score = 0.0
-            self.issues.append(QualityIssue(
-                category="source_diversity",
-                severity="high",
-                description="No sources were used in the research",
-                suggestion="Conduct additional searches to gather sources"
-            ))
+            issues.append(self._no_sources_issue())
         
         # Adjust for domain diversity
         if total_sources > 0:
             diversity_ratio = unique_domains / total_sources
             if diversity_ratio < 0.5:
                 source_score *= 0.8
-                self.issues.append(QualityIssue(
+                issues.append(QualityIssue(
                     category="source_diversity",
                     severity="medium",
                     description=f"Limited domain diversity: {unique_domains} unique domains from {total_sources} sources",
@@ -184,18 +273,22 @@ class QualityValidator:
         
         # Check for minimum domains
         if unique_domains < self.MIN_DOMAINS and total_sources >= self.MIN_SOURCES:
-            self.issues.append(QualityIssue(
+            issues.append(QualityIssue(
                 category="source_diversity",
                 severity="medium",
                 description=f"Only {unique_domains} unique domain(s) - consider diversifying",
                 suggestion="Search for information from different types of sources (news, academic, industry)"
             ))
         
-        return source_score
+        return source_score, issues
     
-    def _check_fact_density(self, facts: list[dict[str, Any]]) -> float:
+    def _check_fact_density(
+        self,
+        fact_count: int,
+        high_confidence: int
+    ) -> tuple[float, list[QualityIssue]]:
         """Check if enough facts were extracted."""
-        fact_count = len(facts)
+        issues: list[QualityIssue] = []
         
         if fact_count >= self.TARGET_FACTS:
             score = 1.0
@@ -205,7 +298,7 @@ class QualityValidator:
             score = 0.3 + (fact_count - 2) / (self.MIN_FACTS - 2) * 0.3
         elif fact_count >= 1:
             score = 0.2
-            self.issues.append(QualityIssue(
+            issues.append(QualityIssue(
                 category="fact_density",
                 severity="high",
                 description="Very few facts extracted from sources",
@@ -213,85 +306,79 @@ class QualityValidator:
             ))
         else:
             score = 0.0
-            self.issues.append(QualityIssue(
-                category="fact_density",
-                severity="high",
-                description="No facts were extracted",
-                suggestion="Review source quality and analysis process"
-            ))
+            issues.append(self._no_facts_issue())
         
         # Check fact confidence distribution
-        high_confidence = sum(1 for f in facts if f.get("confidence") == "high")
         if fact_count > 0 and high_confidence / fact_count < 0.3:
-            self.issues.append(QualityIssue(
+            issues.append(QualityIssue(
                 category="fact_density",
                 severity="low",
                 description="Most extracted facts have medium or low confidence",
                 suggestion="Seek more authoritative sources for key claims"
             ))
         
-        return score
+        return score, issues
     
     def _check_citation_coverage(
         self, 
-        facts: list[dict[str, Any]], 
-        citation_manager: CitationManager
-    ) -> float:
+        fact_count: int,
+        facts_with_sources: int,
+        used_sources: int
+    ) -> tuple[float, list[QualityIssue]]:
         """Check that facts are properly attributed to sources."""
-        if not facts:
-            return 0.5  # Neutral if no facts
+        if not fact_count:
+            return self.NEUTRAL_SCORE, []  # Neutral if no facts
         
-        facts_with_sources = sum(1 for f in facts if f.get("source_url"))
-        coverage = facts_with_sources / len(facts)
+        issues: list[QualityIssue] = []
+        
+        coverage = facts_with_sources / fact_count
         
         if coverage < 0.8:
-            self.issues.append(QualityIssue(
+            issues.append(QualityIssue(
                 category="citation_coverage",
                 severity="medium",
-                description=f"Only {facts_with_sources}/{len(facts)} facts have source URLs",
+                description=f"Only {facts_with_sources}/{fact_count} facts have source URLs",
                 suggestion="Ensure all extracted facts are linked to their sources"
             ))
         
         # Check if sources are marked as used
-        used_citations = citation_manager.get_used_citations()
-        if len(used_citations) == 0 and facts_with_sources > 0:
-            self.issues.append(QualityIssue(
+        if used_sources == 0 and facts_with_sources > 0:
+            issues.append(QualityIssue(
                 category="citation_coverage",
                 severity="high",
                 description="No sources marked as used despite having facts",
                 suggestion="Mark sources as used when extracting facts from them"
             ))
-            return 0.3
+            return 0.3, issues
         
-        return min(coverage, 1.0)
+        return min(coverage, 1.0), issues
     
     def _check_knowledge_gaps(
         self, 
         facts: list[dict[str, Any]], 
         report_content: str
-    ) -> float:
+    ) -> tuple[float, list[QualityIssue]]:
         """Check if knowledge gaps are properly identified."""
+        issues: list[QualityIssue] = []
+        
         # Score based on whether gaps are mentioned
-        has_gaps_section = any(term in report_content.lower() for term in [
-            "knowledge gap", "limitation", "further research", 
-            "not clear", "uncertain", "more research"
-        ])
+        has_gaps_section = _GAP_TERMS_RE.search(report_content) is not None
         
         if has_gaps_section:
             score = 1.0
         elif report_content:
             # Penalize slightly if no gaps mentioned in a completed report
             score = 0.7
-            self.issues.append(QualityIssue(
+            issues.append(QualityIssue(
                 category="knowledge_gaps",
                 severity="low",
                 description="Report doesn't explicitly identify knowledge gaps",
                 suggestion="Add a section noting areas where information is incomplete or uncertain"
             ))
         else:
-            score = 0.5  # Neutral if no report yet
+            score = self.NEUTRAL_SCORE  # Neutral if no report yet
         
-        return score
+        return score, issues
     
     def get_improvement_suggestions(self, quality_report: QualityReport) -> list[str]:
         """Get prioritized suggestions for improving research quality."""
@@ -310,10 +397,10 @@ class QualityValidator:
         # Add general suggestions based on scores
         metrics = quality_report.metrics
         
-        if metrics.get("source_diversity_score", 1.0) < 0.6:
+        if metrics.source_diversity_score < 0.6:
             suggestions.append("Search for sources from academic, news, and industry perspectives")
         
-        if metrics.get("fact_density_score", 1.0) < 0.6:
+        if metrics.fact_density_score < 0.6:
             suggestions.append("Fetch and analyze more source documents")
         
         return suggestions
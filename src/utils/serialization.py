@@ -0,0 +1,46 @@
+"""
+JSON Serialization
+
+Fast JSON helpers that use orjson when it is installed and fall back
+to the standard library otherwise.
+"""
+
+import json
+from datetime import datetime
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on optional dependency
+    orjson = None
+
+
+def json_loads(data: str | bytes) -> Any:
+    """
+    Parse a JSON document.
+    
+    Raises json.JSONDecodeError on invalid input with either backend
+    (orjson.JSONDecodeError subclasses it).
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _default(value: Any) -> Any:
+    """Serialize types the standard library json module doesn't handle."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def json_dumpb(data: Any, indent: bool = False) -> bytes:
+    """
+    Serialize to UTF-8 encoded JSON, optionally indented by two spaces.
+    
+    Datetimes are written in ISO 8601 format with either backend.
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, indent=2 if indent else None, default=_default).encode("utf-8")
@@ -98,3 +98,12 @@ class TestCitationManager:
         manager.update_source_content("https://example.com", "Full content here")
         
         assert manager.citations["https://example.com"].content == "Full content here"
+    
+    def test_validate_claim(self):
+        manager = CitationManager()
+        manager.add_potential_source("https://example.com", "Test")
+        manager.update_source_content("https://example.com", "Global EV sales grew 50% in 2023")
+        
+        assert manager.validate_claim("EV sales grew in 2023", "https://example.com") is True
+        assert manager.validate_claim("Solar panel prices fell sharply", "https://example.com") is False
+        assert manager.validate_claim("EV sales grew", "https://unknown.com") is False
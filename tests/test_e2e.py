@@ -7,26 +7,47 @@ without requiring actual API keys.
 
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, MagicMock, patch
-from dataclasses import dataclass
+from unittest.mock import AsyncMock, patch
+from dataclasses import dataclass, field
 
+from src.agent import orchestrator as orchestrator_module
 from src.agent.orchestrator import ResearchOrchestrator, ResearchState
 from src.agent.planner import ResearchPlanner, ActionType, AgentAction
 from src.synthesis.report import Report, ReportGenerator
 from src.synthesis.citations import CitationManager, Citation
 from src.memory.session import SessionMemory
-from src.utils.config import Settings
 
 
-class MockLLMClient:
-    """Mock LLM client for testing."""
-    
-    async def generate(self, system: str, user: str, response_format: str = None) -> str:
-        """Return mock LLM responses based on context."""
-        if "plan" in system.lower() or "next action" in user.lower():
-            return '{"action": "complete", "parameters": {}, "reasoning": "Testing complete"}'
-        elif "synthesis" in system.lower() or "report" in system.lower():
-            return """## Summary
+@dataclass(frozen=True, slots=True)
+class StubSettings:
+    """Plain stand-in for the Settings fields the orchestrator reads."""
+    max_iterations: int = 3
+    max_cost_per_request: float = 1.0
+    llm_provider: str = "anthropic"
+    llm_model: str = "claude-3-5-sonnet-20241022"
+    tavily_api_key: str = "mock_key"
+    max_search_results: int = 5
+    search_concurrency: int = 3
+    fetch_concurrency: int = 5
+    analyze_concurrency: int = 3
+    extraction_concurrency: int = 8
+    max_analyze_chunks: int = 8
+    fetch_cache_ttl: float = 86400
+    cache_directory: str = ""
+    search_depth: str = "basic"
+
+
+@dataclass(slots=True)
+class MockResult:
+    """Tool result returned by the mock tools."""
+    success: bool = True
+    data: dict | None = None
+    metadata: dict = field(default_factory=dict)
+
+
+_PLAN_JSON = '{"action": "complete", "parameters": {}, "reasoning": "Testing complete"}'
+
+_REPORT_MD = """## Summary
             
 This is a mock research report for testing purposes.
 
@@ -39,23 +60,45 @@ This is a mock research report for testing purposes.
 
 - More research needed on testing
 """
-        elif "fact" in system.lower() or "extract" in user.lower():
-            return '{"facts": [{"content": "Mock fact for testing", "type": "fact", "confidence": "high"}]}'
-        elif "queries" in system.lower():
-            return '{"queries": ["test query 1", "test query 2"]}'
-        else:
-            return "Mock response"
+
+_FACTS_JSON = '{"facts": [{"content": "Mock fact for testing", "type": "fact", "confidence": "high"}]}'
+
+_QUERIES_JSON = '{"queries": ["test query 1", "test query 2"]}'
+
+# (substring of the system prompt, substring of the user prompt, response),
+# checked in order against the lowercased prompts; None never matches
+_RESPONSES = (
+    ("plan", "next action", _PLAN_JSON),
+    ("synthesis", None, _REPORT_MD),
+    ("report", None, _REPORT_MD),
+    ("fact", "extract", _FACTS_JSON),
+    ("queries", None, _QUERIES_JSON),
+)
+
+
+class MockLLMClient:
+    """Mock LLM client for testing."""
+    
+    async def generate(self, system: str, user: str, response_format: str = None) -> str:
+        """Return mock LLM responses based on context."""
+        system = system.lower()
+        user = user.lower()
+        for system_needle, user_needle, response in _RESPONSES:
+            if system_needle in system or (user_needle is not None and user_needle in user):
+                return response
+        return "Mock response"
+    
+    async def stream(self, system: str, user: str, response_format: str = None):
+        """Stream the mock response a line at a time."""
+        response = await self.generate(system, user, response_format)
+        for line in response.splitlines(keepends=True):
+            yield line
 
 
 class MockSearchTool:
     """Mock search tool."""
     
     async def execute(self, query: str = "", **kwargs):
-        @dataclass
-        class MockResult:
-            success: bool = True
-            data: dict = None
-            
         return MockResult(
             success=True,
             data={
@@ -71,11 +114,6 @@ class MockFetchTool:
     """Mock fetch tool."""
     
     async def execute(self, url: str = "", **kwargs):
-        @dataclass
-        class MockResult:
-            success: bool = True
-            data: dict = None
-            
         return MockResult(
             success=True,
             data={
@@ -89,11 +127,6 @@ class MockAnalyzer:
     """Mock document analyzer."""
     
     async def execute(self, content: str = "", question: str = "", **kwargs):
-        @dataclass
-        class MockResult:
-            success: bool = True
-            data: dict = None
-            
         return MockResult(
             success=True,
             data={
@@ -107,23 +140,15 @@ class MockAnalyzer:
 class TestEndToEndResearch:
     """End-to-end tests with mocked dependencies."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def mock_settings(self):
         """Create mock settings."""
-        settings = MagicMock(spec=Settings)
-        settings.max_iterations = 3
-        settings.max_cost_per_request = 1.0
-        settings.llm_provider = "anthropic"
-        settings.tavily_api_key = "mock_key"
-        settings.max_search_results = 5
-        settings.search_depth = "basic"
-        return settings
+        return StubSettings()
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def mock_orchestrator(self, mock_settings):
-        """Create orchestrator with mocked components."""
-        with patch('src.agent.orchestrator.get_llm_client') as mock_llm:
-            mock_llm.return_value = MockLLMClient()
+        """Create orchestrator with mocked components, once per session."""
+        with patch.object(orchestrator_module, "get_llm_client", lambda settings: MockLLMClient()):
             orchestrator = ResearchOrchestrator(mock_settings)
             
             # Replace tools with mocks
@@ -134,12 +159,37 @@ class TestEndToEndResearch:
             orchestrator.planner.llm = MockLLMClient()
             orchestrator.report_generator.llm = MockLLMClient()
             
-            return orchestrator
+            yield orchestrator
+    
+    @pytest.fixture
+    def fresh_orchestrator(self, mock_orchestrator):
+        """Shared orchestrator with the state and caches a previous test left reset."""
+        mock_orchestrator.state = ResearchState(question="")
+        mock_orchestrator.citation_manager = CitationManager()
+        mock_orchestrator.cost_tracker.reset()
+        
+        # Cached plans and indexed content would otherwise leak between tests
+        mock_orchestrator.plan_cache.clear()
+        mock_orchestrator.query_cache.clear()
+        mock_orchestrator.vector_store.clear()
+        mock_orchestrator.session_memory.start_session("")
+        mock_orchestrator._pending_documents = []
+        return mock_orchestrator
+    
+    def test_orchestrators_have_separate_query_indexes(self, mock_settings, mock_orchestrator):
+        """Test that each orchestrator indexes its queries in its own collection."""
+        with patch.object(orchestrator_module, "get_llm_client", lambda settings: MockLLMClient()):
+            other = ResearchOrchestrator(mock_settings)
+        
+        assert (
+            other.session_memory.query_index.collection_name
+            != mock_orchestrator.session_memory.query_index.collection_name
+        )
     
     @pytest.mark.asyncio
-    async def test_research_pipeline(self, mock_orchestrator):
+    async def test_research_pipeline(self, fresh_orchestrator):
         """Test the full research pipeline with mocks."""
-        report = await mock_orchestrator.research("What is machine learning?")
+        report = await fresh_orchestrator.research("What is machine learning?")
         
         assert report is not None
         assert report.question == "What is machine learning?"
@@ -147,20 +197,42 @@ class TestEndToEndResearch:
         assert report.quality_score >= 0
     
     @pytest.mark.asyncio
-    async def test_research_extracts_facts(self, mock_orchestrator):
+    async def test_research_extracts_facts(self, fresh_orchestrator):
         """Test that research extracts facts."""
-        await mock_orchestrator.research("Test question")
+        await fresh_orchestrator.research("Test question")
         
         # Should have extracted some facts
-        assert len(mock_orchestrator.state.facts_extracted) > 0
+        assert len(fresh_orchestrator.state.facts_extracted) > 0
+        
+        # Planner context tracks facts incrementally
+        context = fresh_orchestrator._build_context()
+        assert context["facts_count"] == len(fresh_orchestrator.state.facts_extracted)
+        assert "Extracted fact from content" in context["facts_summary"]
     
     @pytest.mark.asyncio
-    async def test_research_records_searches(self, mock_orchestrator):
+    async def test_research_records_searches(self, fresh_orchestrator):
         """Test that searches are recorded."""
-        await mock_orchestrator.research("Test question")
+        await fresh_orchestrator.research("Test question")
         
         # Should have performed searches
-        assert len(mock_orchestrator.state.searches_performed) > 0
+        assert len(fresh_orchestrator.state.searches_performed) > 0
+    
+    @pytest.mark.asyncio
+    async def test_follow_up_after_research(self, fresh_orchestrator):
+        """Test that follow-ups reuse facts from the session."""
+        await fresh_orchestrator.research("Test question")
+        
+        response = await fresh_orchestrator.follow_up("Which extracted fact came from content?")
+        
+        assert response.question == "Which extracted fact came from content?"
+        assert len(fresh_orchestrator.state.fact_tokens) == len(fresh_orchestrator.state.facts_extracted)
+        assert len(fresh_orchestrator.state.fact_blooms) == len(fresh_orchestrator.state.facts_extracted)
+        
+        # The corpus block is built once and reused while facts are unchanged
+        corpus = fresh_orchestrator._corpus
+        assert "Extracted fact from content" in corpus
+        await fresh_orchestrator.follow_up("Which extracted fact came from content?")
+        assert fresh_orchestrator._corpus is corpus
 
 
 class TestResearchState:
@@ -175,6 +247,24 @@ class TestResearchState:
         assert len(state.searches_performed) == 0
         assert len(state.urls_fetched) == 0
         assert len(state.facts_extracted) == 0
+    
+    def test_membership_helpers(self):
+        """Test set-backed membership helpers stay in sync with lists."""
+        state = ResearchState(question="Test")
+        
+        state.add_search("EV Batteries")
+        state.add_pending_url("https://example.com/a")
+        state.add_pending_url("https://example.com/b")
+        state.remove_pending_url("https://example.com/a")
+        state.add_fetched_url("https://example.com/a")
+        
+        assert state.has_searched("ev batteries")
+        assert state.pending_urls == ["https://example.com/b"]
+        assert state.urls_fetched == ["https://example.com/a"]
+        assert state.is_known_url("https://example.com/a")
+        assert state.is_known_url("https://example.com/b")
+        assert not state.is_known_url("https://example.com/c")
+        assert state.is_known_url("https://www.example.com/a/?utm_source=feed")
 
 
 class TestSessionMemoryIntegration:
@@ -201,15 +291,15 @@ class TestSessionMemoryIntegration:
         
         # Get summary (returns string)
         summary = memory.get_context_summary()
-        assert isinstance(summary, str)
-        assert len(summary) > 0
+        assert type(summary) is str and summary
 
 
 class TestReportExport:
     """Tests for report export functionality."""
     
-    def test_markdown_export(self):
-        """Test Markdown export."""
+    @pytest.fixture(scope="module")
+    def sample_markdown(self):
+        """Markdown export of a small report, rendered once for the module."""
         citation = Citation(
             url="https://example.com",
             title="Example",
@@ -226,11 +316,12 @@ class TestReportExport:
             quality_level="good"
         )
         
-        md = report.to_markdown()
-        
-        assert "# Research Report" in md
-        assert "Test question?" in md
-        assert "## References" in md
+        return report.to_markdown()
+    
+    @pytest.mark.parametrize("needle", ["# Research Report", "Test question?", "## References"])
+    def test_markdown_export(self, sample_markdown, needle):
+        """Test Markdown export."""
+        assert needle in sample_markdown
     
     def test_report_with_quality(self):
         """Test report includes quality metrics."""
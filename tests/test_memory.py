@@ -3,12 +3,24 @@ Unit tests for the memory module.
 """
 
 import pytest
+from datetime import timedelta
+from unittest.mock import MagicMock
 from src.memory.session import SessionMemory
+from src.memory.kv_cache import KeyValueCache
+from src.memory.semantic_cache import SemanticCache
+from src.memory.vector_store import VectorStore, _cosine_topk
 
 
 class TestSessionMemory:
     """Tests for SessionMemory class."""
     
+    @pytest.fixture
+    def memory(self):
+        """A fresh session memory with a session started."""
+        memory = SessionMemory()
+        memory.start_session("Test question")
+        return memory
+    
     def test_start_session(self):
         memory = SessionMemory()
         memory.start_session("What are EV battery trends?")
@@ -17,28 +29,32 @@ class TestSessionMemory:
         assert memory.started_at is not None
         assert len(memory.searches) == 0
     
-    def test_add_search(self):
-        memory = SessionMemory()
-        memory.start_session("Test question")
+    def test_record_timestamps(self, memory):
+        memory.add_search("test query", [])
         
+        recorded = memory.to_datetime(memory.searches[0].timestamp_ns)
+        
+        assert recorded >= memory.started_at
+        assert abs(memory.searches[0].timestamp - recorded) < timedelta(seconds=1)
+        assert memory._get_duration() == "0m 0s"
+    
+    def test_add_search(self, memory):
         memory.add_search("test query", [{"title": "Result 1"}])
         
         assert len(memory.searches) == 1
         assert memory.searches[0].query == "test query"
     
-    def test_has_searched(self):
-        memory = SessionMemory()
-        memory.start_session("Test question")
+    @pytest.mark.parametrize("query,expected", [
+        ("EV batteries", True),
+        ("ev batteries", True),  # Case insensitive
+        ("solar panels", False),
+    ])
+    def test_has_searched(self, memory, query, expected):
         memory.add_search("EV batteries", [])
         
-        assert memory.has_searched("EV batteries") is True
-        assert memory.has_searched("ev batteries") is True  # Case insensitive
-        assert memory.has_searched("solar panels") is False
+        assert memory.has_searched(query) is expected
     
-    def test_add_fetch(self):
-        memory = SessionMemory()
-        memory.start_session("Test")
-        
+    def test_add_fetch(self, memory):
         memory.add_fetch(
             url="https://example.com",
             title="Example",
@@ -48,18 +64,34 @@ class TestSessionMemory:
         assert len(memory.fetches) == 1
         assert memory.fetches[0].url == "https://example.com"
     
-    def test_has_fetched(self):
-        memory = SessionMemory()
-        memory.start_session("Test")
+    def test_has_fetched(self, memory):
         memory.add_fetch("https://example.com", "Example", "Content")
         
         assert memory.has_fetched("https://example.com") is True
         assert memory.has_fetched("https://other.com") is False
     
-    def test_add_fact(self):
-        memory = SessionMemory()
+    def test_has_fetched_equivalent_url(self, memory):
+        memory.add_fetch("https://www.Example.com/page/", "Example", "Content")
+        
+        assert memory.has_fetched("https://example.com/page#section") is True
+        assert memory.has_fetched("https://example.com/page?utm_source=x&fbclid=1") is True
+        assert memory.has_fetched("https://example.com/page?id=2") is False
+        assert memory.has_fetched("https://example.com/other") is False
+    
+    def test_find_similar_search(self):
+        index = MagicMock(spec=SemanticCache)
+        index.nearest.return_value = ("EV battery trends", 0.95)
+        memory = SessionMemory(query_index=index)
         memory.start_session("Test")
         
+        assert memory.find_similar_search("trends in EV batteries") is None
+        
+        memory.add_search("EV battery trends", [])
+        
+        index.insert.assert_called_once_with("EV battery trends", "EV battery trends")
+        assert memory.find_similar_search("trends in EV batteries") == ("EV battery trends", 0.95)
+    
+    def test_add_fact(self, memory):
         memory.add_fact({
             "content": "EV sales grew 50% in 2023",
             "source_url": "https://example.com",
@@ -71,6 +103,22 @@ class TestSessionMemory:
         assert memory.facts[0].content == "EV sales grew 50% in 2023"
         assert memory.facts[0].confidence == "high"
     
+    def test_add_facts(self, memory):
+        memory.add_facts([
+            {"content": "EV sales grew 50% in 2023", "type": "statistic", "confidence": "high"},
+            {"content": "Battery costs are falling"}
+        ])
+        
+        assert len(memory.facts) == 2
+        assert memory.facts[0].fact_type == "statistic"
+        assert memory.facts[1].confidence == "medium"
+    
+    def test_facts_are_read_only(self, memory):
+        memory.add_facts([{"content": "First"}, {"content": "Second"}])
+        
+        assert [fact.content for fact in memory.facts[-2:]] == ["First", "Second"]
+        assert not hasattr(memory.facts, "append")
+    
     def test_get_context_summary(self):
         memory = SessionMemory()
         memory.start_session("What are EV trends?")
@@ -81,3 +129,180 @@ class TestSessionMemory:
         
         assert "What are EV trends?" in summary
         assert "1" in summary  # 1 search
+
+
+class TestKeyValueCache:
+    """Tests for KeyValueCache class."""
+    
+    def test_persists_across_instances(self, tmp_path):
+        cache = KeyValueCache(name="test_kv", persist_directory=str(tmp_path))
+        assert cache.get("key") is None
+        
+        cache.set("key", b"value")
+        cache.close()
+        
+        reopened = KeyValueCache(name="test_kv", persist_directory=str(tmp_path))
+        assert reopened.get("key") == b"value"
+        reopened.close()
+    
+    def test_memory_entries_are_bounded(self):
+        cache = KeyValueCache(max_memory_entries=2)
+        
+        for key in ("a", "b", "c"):
+            cache.set(key, key.encode())
+        
+        assert cache.get("a") is None
+        assert cache.get("c") == b"c"
+
+
+class TestSemanticCache:
+    """Tests for SemanticCache class."""
+    
+    def test_miss_then_hit(self):
+        cache = SemanticCache(collection_name="test_cache_hit")
+        
+        assert cache.lookup("What are EV battery trends?") is None
+        
+        cache.insert("What are EV battery trends?", '{"action": "complete"}')
+        
+        assert cache.lookup("What are EV battery trends?") == '{"action": "complete"}'
+        assert cache.hits == 1
+        assert cache.misses == 1
+    
+    def test_exact_entries_are_bounded(self):
+        cache = SemanticCache(collection_name="test_cache_lru", max_exact_entries=2)
+        
+        cache.insert("first", "1")
+        cache.insert("second", "2")
+        cache.insert("third", "3")
+        
+        assert len(cache._exact) == 2
+        assert "first" not in cache._exact
+
+
+class TestVectorStore:
+    """Tests for VectorStore class."""
+    
+    def test_add_documents_skips_short_content(self):
+        store = VectorStore(collection_name="test_add_documents")
+        
+        doc_ids = store.add_documents(
+            ["too short", ""],
+            [{"url": "https://example.com/a"}, {"url": "https://example.com/b"}]
+        )
+        
+        assert doc_ids == ["", ""]
+        assert store.get_stats()["documents_added"] == 0
+    
+    def test_collection_uses_tuned_hnsw_params(self):
+        store = VectorStore(collection_name="test_hnsw_params")
+        
+        metadata = store._get_collection().metadata
+        
+        assert metadata["hnsw:space"] == "cosine"
+        assert metadata["hnsw:search_ef"] > 10
+        assert metadata["hnsw:construction_ef"] >= 100
+    
+    def test_search_reuses_results_for_similar_queries(self):
+        store = VectorStore(collection_name="test_search_cache")
+        store._collection = MagicMock()
+        store._collection.query.return_value = {
+            "documents": [["EV sales grew 50%"]],
+            "metadatas": [[{"url": "https://example.com"}]],
+            "distances": [[0.2]]
+        }
+        store._embed = lambda texts: [[1.0, 0.0] if "EV" in t else [0.0, 1.0] for t in texts]
+        
+        first = store.search("EV sales growth")
+        second = store.search("EV sales growth rate")
+        store.search("solar panels")
+        
+        assert [c.content for c in first] == [c.content for c in second] == ["EV sales grew 50%"]
+        assert store._collection.query.call_count == 2
+        assert store.get_stats()["search_cache_hits"] == 1
+    
+    def test_fact_queries_are_not_served_question_results(self):
+        store = VectorStore(collection_name="test_related_content")
+        
+        def query(query_embeddings, **kwargs):
+            # The fact-extended query leans towards a different chunk
+            documents = [["Fact-specific chunk" if e[1] > 0.1 else "Question chunk"] for e in query_embeddings]
+            return {
+                "documents": documents,
+                "metadatas": [[{"url": f"https://example.com/{i}"}] for i in range(len(documents))],
+                "distances": [[0.2] for _ in documents]
+            }
+        
+        store._collection = MagicMock()
+        store._collection.query.side_effect = query
+        # Cosine similarity 0.95, above the cache threshold
+        store._embed = lambda texts: [[0.95, 0.3122] if "battery" in t else [1.0, 0.0] for t in texts]
+        
+        store.search("EV trends")
+        related = store.find_related_content("EV trends", [{"content": "battery costs fell"}])
+        
+        assert "Fact-specific chunk" in [c.content for c in related]
+    
+    def test_search_cache_reuses_evicted_slots(self):
+        store = VectorStore(collection_name="test_cache_slots", max_cached_queries=2)
+        store._collection = MagicMock()
+        store._collection.query.side_effect = lambda query_embeddings, **kwargs: {
+            "documents": [[f"chunk {e.index(1.0)}"] for e in query_embeddings],
+            "metadatas": [[{}] for _ in query_embeddings],
+            "distances": [[0.2] for _ in query_embeddings]
+        }
+        vectors = {"a": [1.0, 0.0, 0.0], "b": [0.0, 1.0, 0.0], "c": [0.0, 0.0, 1.0]}
+        store._embed = lambda texts: [vectors[t] for t in texts]
+        
+        for query in ("a", "b", "c"):
+            store._multi_search([query], top_k=1)
+        
+        assert list(store._result_cache) == [("b", "None"), ("c", "None")]
+        assert store._cached_results(vectors["a"], 1, "None") is None
+        assert [c.content for c in store._cached_results(vectors["c"], 1, "None")] == ["chunk 2"]
+    
+    def test_repeated_search_skips_embedding(self):
+        store = VectorStore(collection_name="test_last_search")
+        store._collection = MagicMock()
+        store._collection.query.return_value = {
+            "documents": [["EV sales grew 50%"]],
+            "metadatas": [[{}]],
+            "distances": [[0.2]]
+        }
+        store._embed = MagicMock(return_value=[[1.0, 0.0]])
+        
+        store.search("EV sales growth")
+        store.search("EV sales growth")
+        
+        assert store._embed.call_count == 1
+        
+        store._invalidate_search_cache()
+        store.search("EV sales growth")
+        
+        assert store._embed.call_count == 2
+    
+    def test_search_uses_in_process_index(self):
+        store = VectorStore(collection_name="test_index_search")
+        vectors = {"battery": [1.0, 0.0, 0.0], "solar": [0.0, 1.0, 0.0], "wind": [0.0, 0.0, 1.0]}
+        store._embed = lambda texts: [next(v for k, v in vectors.items() if k in t) for t in texts]
+        store.add_documents(
+            [f"{topic} " + "market analysis " * 10 for topic in ("battery", "solar")],
+            [{"url": "https://example.com/battery"}, {"url": "https://example.com/solar"}]
+        )
+        
+        results = store.search("solar", top_k=2)
+        
+        assert [c.url for c in results] == ["https://example.com/solar", "https://example.com/battery"]
+        assert results[0].similarity_score == pytest.approx(1.0)
+        assert store.search("wind", top_k=1, filter_metadata={"url": "https://example.com/battery"})[0].url == "https://example.com/battery"
+    
+    def test_cosine_topk(self):
+        import numpy as np
+        
+        matrix = np.eye(4, dtype=np.float32)
+        queries = [[0.0, 0.6, 0.8, 0.0], [1.0, 0.0, 0.0, 0.0]]
+        
+        indices, similarities = _cosine_topk(queries, matrix, 2)
+        
+        assert indices.tolist() == [[2, 1], [0, indices[1, 1]]]
+        assert similarities[0].tolist() == pytest.approx([0.8, 0.6])
@@ -8,39 +8,55 @@ from src.utils.quality import (
     QualityReport, 
     QualityLevel,
     QualityIssue,
+    QualityMetrics,
     validate_research_quality
 )
 from src.synthesis.citations import CitationManager
 
 
+# Well-sourced, high-confidence facts; validate() only reads them
+_GOOD_FACTS = tuple(
+    {"content": f"Fact {i}", "source_url": f"https://example{i}.com", 
+     "type": "fact", "confidence": "high"}
+    for i in range(10)
+)
+
+
+# Used sources from five different domains
+_GOOD_SOURCES = (
+    ("https://news.example.com/article1", "News Article"),
+    ("https://academic.example.org/paper", "Academic Paper"),
+    ("https://industry.example.net/report", "Industry Report"),
+    ("https://blog.example.io/post", "Blog Post"),
+    ("https://gov.example.gov/data", "Government Data"),
+)
+
+
+def make_citations(sources) -> CitationManager:
+    """Build a citation manager with every (url, title) source marked used."""
+    cm = CitationManager()
+    for url, title in sources:
+        cm.add_potential_source(url, title)
+    for url, _ in sources:
+        cm.mark_used(url)
+    return cm
+
+
 class TestQualityValidator:
     """Tests for QualityValidator class."""
     
-    def test_validate_with_good_data(self):
+    @pytest.fixture(scope="session")
+    def good_citations(self):
+        """A diverse citation manager, built once (validate doesn't mutate it)."""
+        return make_citations(_GOOD_SOURCES)
+    
+    def test_validate_with_good_data(self, good_citations):
         """Test validation with adequate sources and facts."""
         validator = QualityValidator()
         
-        # Create citation manager with good diversity
-        cm = CitationManager()
-        cm.add_potential_source("https://news.example.com/article1", "News Article")
-        cm.add_potential_source("https://academic.example.org/paper", "Academic Paper")
-        cm.add_potential_source("https://industry.example.net/report", "Industry Report")
-        cm.add_potential_source("https://blog.example.io/post", "Blog Post")
-        cm.add_potential_source("https://gov.example.gov/data", "Government Data")
-        
-        for url in ["https://news.example.com/article1", "https://academic.example.org/paper",
-                    "https://industry.example.net/report", "https://blog.example.io/post",
-                    "https://gov.example.gov/data"]:
-            cm.mark_used(url)
-        
-        # Create facts
-        facts = [
-            {"content": f"Fact {i}", "source_url": f"https://example{i}.com", 
-             "type": "fact", "confidence": "high"}
-            for i in range(10)
-        ]
-        
-        report = validator.validate(facts, cm, "Sample report with knowledge gaps mentioned.")
+        report = validator.validate(
+            list(_GOOD_FACTS), good_citations, "Sample report with knowledge gaps mentioned."
+        )
         
         assert report.overall_score >= 0.5
         assert report.overall_level in [QualityLevel.GOOD, QualityLevel.ACCEPTABLE, QualityLevel.EXCELLENT]
@@ -58,6 +74,19 @@ class TestQualityValidator:
         assert len(report.issues) > 0
         assert any(i.severity == "high" for i in report.issues)
     
+    def test_empty_validation_matches_full_checks(self):
+        """Test the empty-input shortcut reports what the full checks would."""
+        validator = QualityValidator()
+        
+        empty = validator.validate([], CitationManager(), "")
+        
+        # An unused potential source forces the full path with no used sources
+        cm = CitationManager()
+        cm.add_potential_source("https://example.com/page1", "Page 1")
+        full = validator.validate([], cm, "")
+        
+        assert empty.to_dict() == full.to_dict()
+    
     def test_source_diversity_check(self):
         """Test source diversity checking."""
         validator = QualityValidator()
@@ -71,7 +100,7 @@ class TestQualityValidator:
         cm.mark_used("https://example.com/page2")
         cm.mark_used("https://example.com/page3")
         
-        score = validator._check_source_diversity(cm)
+        score, _ = validator._check_source_diversity(cm.get_source_diversity())
         
         # Should be penalized for low domain diversity
         assert score < 1.0
@@ -80,12 +109,11 @@ class TestQualityValidator:
         """Test fact density checking."""
         validator = QualityValidator()
         
-        # Few facts
-        facts = [{"content": "Single fact", "confidence": "medium"}]
-        score = validator._check_fact_density(facts)
+        # A single medium-confidence fact
+        score, issues = validator._check_fact_density(fact_count=1, high_confidence=0)
         
         assert score < 0.5
-        assert any(i.category == "fact_density" for i in validator.issues)
+        assert any(i.category == "fact_density" for i in issues)
     
     def test_knowledge_gap_detection(self):
         """Test knowledge gap detection in report."""
@@ -101,14 +129,15 @@ class TestQualityValidator:
         - Limited data on regional variations
         """
         
-        score = validator._check_knowledge_gaps([], report_with_gaps)
+        score, issues = validator._check_knowledge_gaps([], report_with_gaps)
         assert score == 1.0
+        assert issues == []
         
         # Report without gaps
-        validator.issues = []
         report_no_gaps = "Simple report with no gaps mentioned."
-        score = validator._check_knowledge_gaps([], report_no_gaps)
+        score, issues = validator._check_knowledge_gaps([], report_no_gaps)
         assert score < 1.0
+        assert [i.category for i in issues] == ["knowledge_gaps"]
 
 
 class TestQualityReport:
@@ -127,7 +156,7 @@ class TestQualityReport:
                     suggestion="Fix it"
                 )
             ],
-            metrics={"test_metric": 0.8}
+            metrics=QualityMetrics(source_diversity_score=0.8, total_sources=4)
         )
         
         d = report.to_dict()
@@ -135,7 +164,18 @@ class TestQualityReport:
         assert d["overall_score"] == 0.75
         assert d["overall_level"] == "good"
         assert len(d["issues"]) == 1
-        assert d["metrics"]["test_metric"] == 0.8
+        assert d["metrics"]["source_diversity_score"] == 0.8
+        assert d["metrics"]["total_sources"] == 4
+    
+    def test_metrics_read_like_a_dict(self):
+        """Test the metrics keep the dict interface."""
+        metrics = QualityMetrics(source_diversity_score=0.8, total_sources=4)
+        
+        assert metrics["total_sources"] == 4
+        assert metrics.get("unique_domains") == 0
+        assert metrics.get("missing", "default") == "default"
+        assert dict(metrics.items())["source_diversity_score"] == 0.8
+        assert "total_facts" in metrics
 
 
 class TestValidateResearchQuality:
@@ -2,8 +2,17 @@
 Unit tests for the tools module.
 """
 
+import asyncio
+import httpx
 import pytest
+from unittest.mock import AsyncMock, MagicMock
+from src.memory.kv_cache import KeyValueCache
+from src.tools.analyze import DocumentAnalyzer
 from src.tools.base import BaseTool, ToolResult
+from src.tools.fetch import MAX_CONTENT_SIZE, ContentFetchTool
+from src.tools.search import WebSearchTool
+from src.utils.cost_tracker import CostTracker
+from src.utils.llm import BaseLLMClient
 
 
 class TestToolResult:
@@ -41,20 +50,276 @@ class MockTool(BaseTool):
 class TestBaseTool:
     """Tests for BaseTool base class."""
     
-    def test_tool_repr(self):
-        tool = MockTool()
+    @pytest.fixture(scope="module")
+    def tool(self):
+        """One MockTool shared by these read-only tests."""
+        return MockTool()
+    
+    def test_tool_repr(self, tool):
         assert "MockTool" in repr(tool)
         assert "mock_tool" in repr(tool)
     
-    def test_get_schema(self):
-        tool = MockTool()
+    def test_get_schema(self, tool):
         schema = tool.get_schema()
         assert schema["name"] == "mock_tool"
         assert schema["description"] == "A mock tool for testing"
     
     @pytest.mark.asyncio
-    async def test_execute(self):
-        tool = MockTool()
+    async def test_execute(self, tool):
         result = await tool.execute(param1="value1")
         assert result.success is True
         assert result.data == {"param1": "value1"}
+
+
+class StreamingStub(BaseLLMClient):
+    """LLM stub that streams each response a line at a time."""
+    
+    def __init__(self, respond):
+        # Awaited with system= and user= for each request's full response
+        self.respond = respond
+    
+    async def generate(self, system, user, response_format=None, **kwargs):
+        return await self.respond(system=system, user=user)
+    
+    async def stream(self, system, user, response_format=None, **kwargs):
+        response = await self.generate(system, user, response_format)
+        for line in response.splitlines(keepends=True):
+            yield line
+    
+    def count_tokens(self, text):
+        return len(text) // 4
+
+
+class TestDocumentAnalyzer:
+    """Tests for DocumentAnalyzer response parsing."""
+    
+    @pytest.mark.asyncio
+    async def test_parses_ndjson_facts(self):
+        llm = StreamingStub(AsyncMock(return_value=(
+            '{"content": "EV sales grew 50%", "type": "statistic", "confidence": "high"}\n'
+            'not a fact\n'
+            '{"content": "Battery costs fell", "type": "trend", "confidence": "medium"}'
+        )))
+        analyzer = DocumentAnalyzer(llm)
+        
+        facts = await analyzer._analyze_chunk("content", "EV trends?")
+        
+        assert [f["content"] for f in facts] == ["EV sales grew 50%", "Battery costs fell"]
+    
+    @pytest.mark.asyncio
+    async def test_parses_wrapped_facts(self):
+        llm = StreamingStub(AsyncMock(return_value='{\n  "facts": [{"content": "EV sales grew 50%"}]\n}'))
+        analyzer = DocumentAnalyzer(llm)
+        
+        facts = await analyzer._analyze_chunk("content", "EV trends?")
+        
+        assert facts == [{"content": "EV sales grew 50%"}]
+    
+    @pytest.mark.asyncio
+    async def test_question_in_system_prompt(self):
+        llm = StreamingStub(AsyncMock(return_value=""))
+        analyzer = DocumentAnalyzer(llm)
+        
+        await analyzer._analyze_chunk("chunk one", "EV trends?")
+        await analyzer._analyze_chunk("chunk two", "EV trends?")
+        
+        first, second = (call.kwargs for call in llm.respond.call_args_list)
+        assert first["system"] == second["system"]
+        assert first["system"].endswith("EV trends?\n")
+        assert first["user"] == "chunk one\n"
+    
+    @pytest.mark.asyncio
+    async def test_cached_extraction_skips_llm(self):
+        llm = StreamingStub(AsyncMock(return_value='{"content": "EV sales grew 50%"}'))
+        analyzer = DocumentAnalyzer(llm, cache=KeyValueCache(name="test_extraction_cache"))
+        
+        facts = await analyzer._analyze_chunk("content", "EV trends?")
+        cached_facts = await analyzer._analyze_chunk("content", "EV trends?")
+        
+        assert cached_facts == facts == [{"content": "EV sales grew 50%"}]
+        assert llm.respond.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_chunks_extracted_concurrently(self):
+        in_flight = 0
+        peak = 0
+        
+        async def respond(system, user):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return '{"content": "%s"}' % user[-10:].strip()
+        
+        analyzer = DocumentAnalyzer(StreamingStub(respond), max_concurrency=2)
+        
+        result = await analyzer.execute(content="word " * 6000, question="EV trends?")
+        
+        assert result.success is True
+        assert result.data["total_chunks"] == 4
+        assert peak == 2
+    
+    @pytest.mark.asyncio
+    async def test_stops_extracting_when_budget_exhausted(self):
+        llm = StreamingStub(AsyncMock(return_value='{"content": "EV sales grew 50%"}'))
+        tracker = CostTracker(max_cost=0.03)
+        analyzer = DocumentAnalyzer(llm, max_concurrency=1, cost_tracker=tracker, provider="openai", model="gpt-4o")
+        
+        result = await analyzer.execute(content="word " * 6000, question="EV trends?")
+        
+        assert result.success is False
+        assert "Cost limit" in result.error
+        assert 0 < llm.respond.await_count < 4
+        assert tracker.total_cost <= 0.03
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_chunks_reserve_budget(self):
+        async def respond(system, user):
+            await asyncio.sleep(0.01)
+            return '{"content": "EV sales grew 50%"}'
+        
+        llm = StreamingStub(respond)
+        tracker = CostTracker(max_cost=0.03)
+        analyzer = DocumentAnalyzer(llm, max_concurrency=4, cost_tracker=tracker, provider="openai", model="gpt-4o")
+        
+        result = await analyzer.execute(content="word " * 6000, question="EV trends?")
+        
+        # Chunks started together each see the others' reservations
+        assert result.success is False
+        assert tracker.total_cost <= 0.03
+        assert tracker.get_summary()["total_calls"] < 4
+    
+    def test_selects_relevant_chunks(self):
+        analyzer = DocumentAnalyzer(MagicMock(), max_chunks=2)
+        chunks = [
+            "Subscribe to our newsletter for updates.",
+            "Battery prices fell as EV sales grew in Europe.",
+            "Cookie policy and terms of service.",
+            "EV sales in China doubled.",
+            "EV charging networks expanded.",
+        ]
+        
+        selected = analyzer._select_chunks(chunks, "How fast are EV sales growing?")
+        
+        assert selected == [chunks[1], chunks[3]]
+    
+    def test_deduplicates_reworded_facts(self):
+        analyzer = DocumentAnalyzer(MagicMock())
+        facts = [
+            {"content": "According to the IEA, global EV sales grew 35% in 2023 to 14 million units."},
+            {"content": "Per the IEA, global EV sales grew 35% in 2023 to 14 million units."},
+            {"content": "Battery pack prices fell 14% in 2023."},
+            {"content": "Battery pack prices fell 20% in 2022."},
+        ]
+        
+        unique = analyzer._deduplicate_facts(facts)
+        
+        assert [f["content"] for f in unique] == [facts[0]["content"], facts[2]["content"], facts[3]["content"]]
+
+
+class TestContentFetchTool:
+    """Tests for ContentFetchTool downloads."""
+    
+    @pytest.mark.asyncio
+    async def test_oversized_body_rejected_while_streaming(self):
+        # No Content-Length header, so the cap is enforced mid-stream
+        def handler(request):
+            return httpx.Response(200, stream=httpx.ByteStream(b"x" * (MAX_CONTENT_SIZE + 1)))
+        
+        tool = ContentFetchTool(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        
+        result = await tool.execute("https://example.com/huge")
+        
+        assert result.success is False
+        assert "too large" in result.error
+    
+    @pytest.mark.asyncio
+    async def test_body_decoded_with_declared_charset(self):
+        def handler(request):
+            return httpx.Response(
+                200,
+                content="Café".encode("latin-1"),
+                headers={"content-type": "text/html; charset=latin-1"}
+            )
+        
+        tool = ContentFetchTool(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        tool._extract_content = AsyncMock(return_value={"content": "Café", "title": ""})
+        
+        result = await tool.execute("https://example.com/page")
+        
+        assert result.success is True
+        assert tool._extract_content.call_args.args[0] == "Café"
+    
+    @pytest.mark.asyncio
+    async def test_unchanged_page_served_from_cache(self):
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, content=b"<p>Hello</p>", headers={"etag": '"v1"'})
+        
+        tool = ContentFetchTool(
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            cache=KeyValueCache(name="test_page_cache")
+        )
+        tool._extract_content = AsyncMock(return_value={"content": "Hello", "title": ""})
+        
+        first = await tool.execute("https://example.com/page")
+        second = await tool.execute("https://example.com/page")
+        
+        assert second.success is True
+        assert second.data == first.data
+        assert second.metadata["cached"] is True
+        assert requests[1].headers["if-none-match"] == '"v1"'
+        assert tool._extract_content.await_count == 1
+
+
+class TestWebSearchTool:
+    """Tests for WebSearchTool."""
+    
+    @pytest.mark.asyncio
+    async def test_blocking_client_runs_in_thread(self):
+        """Searches with the blocking client should overlap, not serialize."""
+        import threading
+        
+        barrier = threading.Barrier(2, timeout=2)
+        
+        def search(**kwargs):
+            # Only returns once both searches are running at the same time
+            barrier.wait()
+            return {"results": [{"title": kwargs["query"], "url": "https://example.com"}]}
+        
+        settings = MagicMock(tavily_api_key="key", max_search_results=5)
+        tool = WebSearchTool(settings)
+        tool._client = MagicMock(search=search)
+        
+        first, second = await asyncio.gather(tool.execute("EV sales"), tool.execute("EV prices"))
+        
+        assert first.success and second.success
+        assert second.data["results"][0]["title"] == "EV prices"
+    
+    @pytest.mark.asyncio
+    async def test_repeated_searches_call_api_once(self):
+        """Identical and concurrent duplicate searches should share one call."""
+        calls = []
+        
+        async def search(**kwargs):
+            calls.append(kwargs["query"])
+            await asyncio.sleep(0.01)
+            return {"results": [{"title": "EV", "url": "https://example.com"}]}
+        
+        settings = MagicMock(tavily_api_key="key", max_search_results=5)
+        tool = WebSearchTool(settings)
+        tool._client = MagicMock(search=search)
+        tool._client_is_async = True
+        
+        first, second = await asyncio.gather(tool.execute("EV sales"), tool.execute("ev  Sales "))
+        third = await tool.execute("EV sales")
+        
+        assert calls == ["EV sales"]
+        assert first.data["results"] == second.data["results"] == third.data["results"]
+        assert "cached" not in first.metadata
+        assert second.metadata["cached"] and third.metadata["cached"]